@@ -3,6 +3,8 @@ import multer from 'multer';
 import path from 'path';
 import fs from 'fs';
 
+import { storage as contentStorage } from '../services/scriptStore.js';
+
 // Ensure the uploads directories exist
 const ensureDir = (dir) => {
   if (!fs.existsSync(dir)) {
@@ -10,21 +12,10 @@ const ensureDir = (dir) => {
   }
 };
 
-// Storage for script files
-const scriptStorage = multer.diskStorage({
-  destination: (req, file, cb) => {
-    const dir = 'uploads/scripts/';
-    ensureDir(dir);
-    cb(null, dir);
-  },
-  filename: (req, file, cb) => {
-    const ext = file.originalname.split('.').pop();
-    cb(null, `script-${Date.now()}-${Math.round(Math.random() * 1e9)}.${ext}`);
-  }
-});
-
+// Script files are stored once per content hash; the route commits the
+// upload after saving its Script (see services/scriptStore.js)
 export const scriptUpload = multer({
-  storage: scriptStorage,
+  storage: contentStorage(),
   fileFilter: (req, file, cb) => {
     if (file.originalname.match(/\.(py|js|java|c|cpp|rb|go|rs|php)$/)) {
       cb(null, true);
@@ -51,10 +42,10 @@ const excelStorage = multer.diskStorage({
 export const excelUpload = multer({
   storage: excelStorage,
   fileFilter: (req, file, cb) => {
-    if (file.originalname.match(/\.(xlsx|xls)$/)) {
+    if (file.originalname.match(/\.(xlsx|xls|csv)$/i)) {
       cb(null, true);
     } else {
-      cb(new Error('Only Excel files are allowed!'), false);
+      cb(new Error('Only Excel or CSV files are allowed!'), false);
     }
   }
 });
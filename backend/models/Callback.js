@@ -0,0 +1,53 @@
+import mongoose from 'mongoose';
+
+// Outbox entry for a challenge-solve callback. There is one per
+// (execution, challenge, user): every target row of that team in the round
+// shares the single delivery and gets its response once it lands.
+const CallbackSchema = new mongoose.Schema({
+  execution: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Execution',
+    required: true
+  },
+  challenge: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Challenge',
+    required: true
+  },
+  user: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'User',
+    required: true
+  },
+  // Execution.targets row ids waiting for this callback's response
+  targets: [mongoose.Schema.Types.ObjectId],
+  status: {
+    type: String,
+    enum: ['pending', 'delivering', 'delivered', 'failed'],
+    default: 'pending'
+  },
+  attempts: {
+    type: Number,
+    default: 0
+  },
+  nextAttemptAt: {
+    type: Date,
+    default: Date.now
+  },
+  // Dispatcher delivering it; once the lease runs out another may take over
+  leaseOwner: String,
+  leaseExpiresAt: Date,
+  lastError: String,
+  response: {
+    statusCode: Number,
+    message: String,
+    success: Boolean
+  },
+  deliveredAt: Date
+}, { timestamps: true });
+
+CallbackSchema.index({ execution: 1, challenge: 1, user: 1 }, { unique: true });
+CallbackSchema.index({ status: 1, nextAttemptAt: 1 });
+CallbackSchema.index({ status: 1, leaseExpiresAt: 1 });
+
+export default mongoose.model('Callback', CallbackSchema);
@@ -1,4 +1,36 @@
 import mongoose from 'mongoose';
+import { CHECK_OUTCOMES, RESULT_STATUSES } from '../services/scriptResult.js';
+
+// Typed outcome of one run: the script's own report (runner/automation_result.py)
+// or, without one, what its exit told us
+const ResultSchema = new mongoose.Schema({
+  status: {
+    type: String,
+    enum: RESULT_STATUSES
+  },
+  source: {
+    type: String,
+    enum: ['script', 'exit-code']
+  },
+  message: String,
+  exitCode: Number,
+  durationMs: Number,
+  checks: [{
+    name: String,
+    outcome: {
+      type: String,
+      enum: CHECK_OUTCOMES
+    },
+    durationMs: Number,
+    details: String
+  }],
+  flags: [{
+    name: String,
+    value: String,
+    source: String
+  }],
+  data: mongoose.Schema.Types.Mixed
+}, { _id: false });
 
 const ExecutionSchema = new mongoose.Schema({
   script: {
@@ -17,11 +49,18 @@ const ExecutionSchema = new mongoose.Schema({
     },
     name: String
   },
+  // Set when the run was started by a recurring schedule
+  schedule: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Schedule'
+  },
   status: {
     type: String,
-    enum: ['pending', 'running', 'completed', 'failed'],
+    enum: ['pending', 'running', 'completed', 'failed', 'cancelled'],
     default: 'pending'
   },
+  // Per-run wall-clock budget requested by the caller (seconds)
+  timeoutSeconds: Number,
   targets: [
     {
       user: {
@@ -29,17 +68,48 @@ const ExecutionSchema = new mongoose.Schema({
         ref: 'User'
       },
       email: String,
+      ip: String, // Set for per-ip rows; all-ips rows only carry `ips`
       ips: [String], 
       status: {
         type: String,
-        enum: ['pending', 'completed', 'failed'],
+        enum: ['pending', 'completed', 'failed', 'timeout', 'cancelled'],
         default: 'pending'
       },
-      output: String,
+      output: String, // head + tail only; see outputLog for the full log
       error: String,
+      outputLog: {
+        file: mongoose.Schema.Types.ObjectId, // GridFS id when spilled
+        bytes: Number,
+        truncated: Boolean
+      },
+      errorLog: {
+        file: mongoose.Schema.Types.ObjectId,
+        bytes: Number,
+        truncated: Boolean
+      },
        challengeResponse: {
         statusCode: Number,  // 'success', 'already_solved', 'error'
         message: String // The response message from the API
+      },
+      result: ResultSchema,
+      // Set when the row was served from the result cache instead of run:
+      // the run it was copied from (services/resultCache.js)
+      cached: {
+        execution: {
+          type: mongoose.Schema.Types.ObjectId,
+          ref: 'Execution'
+        },
+        target: mongoose.Schema.Types.ObjectId,
+        finishedAt: Date
+      },
+      // Set when the row attached to an identical run already in progress
+      // instead of starting its own: that run's row (services/sharedRuns.js)
+      shared: {
+        execution: {
+          type: mongoose.Schema.Types.ObjectId,
+          ref: 'Execution'
+        },
+        target: mongoose.Schema.Types.ObjectId
       }
     }
   ],
@@ -48,7 +118,20 @@ const ExecutionSchema = new mongoose.Schema({
     type: Date,
     default: Date.now
   },
-  completedAt: Date
+  completedAt: Date,
+  cancelledAt: Date
 }, { timestamps: true });
 
+// Listing: newest first with a stable tie-breaker for cursor pagination,
+// optionally narrowed by status, script, challenge or team
+ExecutionSchema.index({ createdAt: -1, _id: -1 });
+ExecutionSchema.index({ status: 1, createdAt: -1, _id: -1 });
+ExecutionSchema.index({ script: 1, createdAt: -1, _id: -1 });
+ExecutionSchema.index({ 'challenge.id': 1, createdAt: -1, _id: -1 });
+ExecutionSchema.index({ 'targets.user': 1, createdAt: -1, _id: -1 });
+
+// Outcome breakdowns per script or challenge without scanning output text
+ExecutionSchema.index({ script: 1, 'targets.result.status': 1, createdAt: -1 });
+ExecutionSchema.index({ 'challenge.id': 1, 'targets.result.status': 1, createdAt: -1 });
+
 export default mongoose.model('Execution', ExecutionSchema);
@@ -0,0 +1,86 @@
+import mongoose from 'mongoose';
+
+// A single queued target-run. The worker pool claims these one at a time,
+// so the HTTP request that created them never waits for a child process.
+const JobSchema = new mongoose.Schema({
+  execution: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Execution',
+    required: true
+  },
+  script: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Script',
+    required: true
+  },
+  // _id of the Execution.targets row this job reports into
+  target: {
+    type: mongoose.Schema.Types.ObjectId,
+    required: true
+  },
+  // Batch jobs ('batch' scripts) report into one row per IP; `target` is the first
+  batch: [{
+    _id: false,
+    target: mongoose.Schema.Types.ObjectId,
+    ip: String
+  }],
+  user: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'User'
+  },
+  // Fair-share key is (user, challenge); weight is the script's share
+  challenge: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Challenge'
+  },
+  weight: {
+    type: Number,
+    default: 1
+  },
+  ip: String,
+  args: [String],
+  // Script.maxConcurrency at enqueue time. The cap counts running jobs of the
+  // script across all workers (services/workerPool.js).
+  scriptLimit: Number,
+  timeoutMs: Number,
+  // Run even if the result cache has an answer (enqueueExecution's `force`)
+  force: Boolean,
+  // Identical runs share a key (services/sharedRuns.js); a queued job whose
+  // key is running is attached to that run instead of starting its own
+  flightKey: String,
+  // The running job whose process this one shares
+  attachedTo: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Job'
+  },
+  // Not claimed before this time; scheduled rounds stagger their targets
+  runAfter: {
+    type: Date,
+    default: Date.now
+  },
+  status: {
+    type: String,
+    enum: ['queued', 'running', 'completed', 'failed', 'timeout', 'cancelled'],
+    default: 'queued'
+  },
+  attempts: {
+    type: Number,
+    default: 0
+  },
+  // Worker holding the job while it runs; the lease must be renewed by
+  // heartbeats or the job is handed to another worker
+  leaseOwner: String,
+  leaseExpiresAt: Date,
+  startedAt: Date,
+  finishedAt: Date
+}, { timestamps: true });
+
+// Claim order for the pool, the per-execution "anything left?" check, the
+// scheduler's "still in flight?" check and expired-lease reclaiming
+JobSchema.index({ status: 1, runAfter: 1 });
+JobSchema.index({ execution: 1, status: 1 });
+JobSchema.index({ script: 1, status: 1 });
+JobSchema.index({ status: 1, leaseExpiresAt: 1 });
+JobSchema.index({ flightKey: 1, status: 1 });
+
+export default mongoose.model('Job', JobSchema);
@@ -0,0 +1,20 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+const RELAY_BYTES = parseInt(process.env.OUTPUT_RELAY_BYTES, 10) || 64 * 1024 * 1024;
+
+// Capped log of live output events published by worker processes. The API
+// tails it and replays the events on its own output bus, so SSE clients see
+// runs that execute on other processes or hosts.
+const OutputEventSchema = new mongoose.Schema({
+  execution: {
+    type: mongoose.Schema.Types.ObjectId,
+    required: true
+  },
+  origin: String,  // workerId of the publishing process
+  event: mongoose.Schema.Types.Mixed
+}, { capped: { size: RELAY_BYTES }, versionKey: false });
+
+export default mongoose.model('OutputEvent', OutputEventSchema);
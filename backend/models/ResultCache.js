@@ -0,0 +1,37 @@
+import mongoose from 'mongoose';
+
+// A finished target result kept for scripts that opt into result caching
+// (Script.resultCacheSeconds). Keyed by the script's content hash and the
+// run's arguments; a new run with the same key within the TTL reuses
+// `fields` instead of starting a process. See services/resultCache.js.
+const ResultCacheSchema = new mongoose.Schema({
+  // sha256 of [contentHash, args]
+  key: {
+    type: String,
+    required: true,
+    unique: true
+  },
+  script: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Script'
+  },
+  args: [String],
+  // The run the result came from
+  execution: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Execution'
+  },
+  target: mongoose.Schema.Types.ObjectId,
+  // Execution.targets row fields: status, output, error, logs, result
+  fields: mongoose.Schema.Types.Mixed,
+  finishedAt: Date,
+  expiresAt: {
+    type: Date,
+    required: true
+  }
+}, { timestamps: true });
+
+// Lookups ignore expired entries; MongoDB's TTL monitor removes them later
+ResultCacheSchema.index({ expiresAt: 1 }, { expireAfterSeconds: 0 });
+
+export default mongoose.model('ResultCache', ResultCacheSchema);
@@ -0,0 +1,63 @@
+import mongoose from 'mongoose';
+
+// A recurring round: every `intervalSeconds` the scheduler runs one script,
+// or every script of one challenge, against all UserIpMapping targets.
+const ScheduleSchema = new mongoose.Schema({
+  name: {
+    type: String,
+    required: true,
+    trim: true
+  },
+  // Exactly one of script / challenge is set
+  script: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Script'
+  },
+  challenge: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Challenge'
+  },
+  intervalSeconds: {
+    type: Number,
+    required: true,
+    min: 10
+  },
+  // Each round starts up to this many seconds late, picked at random
+  jitterSeconds: {
+    type: Number,
+    default: 0,
+    min: 0
+  },
+  // A round's target runs are staggered across this window; defaults to a
+  // quarter of the interval, capped at one minute
+  spreadSeconds: {
+    type: Number,
+    min: 0
+  },
+  // Passed on to every execution the schedule creates
+  timeoutSeconds: {
+    type: Number,
+    min: 1
+  },
+  startAt: Date,
+  endAt: Date,
+  enabled: {
+    type: Boolean,
+    default: true
+  },
+  nextRunAt: Date,
+  lastRunAt: Date,
+  lastRound: {
+    executions: [{ type: mongoose.Schema.Types.ObjectId, ref: 'Execution' }],
+    queuedTargets: Number,
+    skippedTargets: Number  // previous run for that target still in flight
+  },
+  createdBy: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'User'
+  }
+}, { timestamps: true });
+
+ScheduleSchema.index({ enabled: 1, nextRunAt: 1 });
+
+export default mongoose.model('Schedule', ScheduleSchema);
@@ -1,5 +1,48 @@
 import mongoose from 'mongoose';
 
+// Upload-time checks (services/preflight.js, runner/preflight.py)
+const PreflightSchema = new mongoose.Schema({
+  // 'pending' while the check runs in the background; 'passed' / 'failed'
+  // as checked; 'skipped' for non-Python scripts; 'error' when the check
+  // itself could not run
+  status: {
+    type: String,
+    enum: ['pending', 'passed', 'failed', 'skipped', 'error']
+  },
+  checkedAt: Date,
+  python: String,
+  cacheTag: String,
+  // Virtualenv the imports were resolved in (services/venvCache.js)
+  environment: String,
+  // Compiled bytecode under uploads/cache/<contentHash>/, run by the fork-server
+  bytecodePath: String,
+  syntaxError: {
+    message: String,
+    line: Number,
+    offset: Number
+  },
+  imports: [{
+    _id: false,
+    name: String,
+    found: Boolean,
+    optional: Boolean,
+    kind: {
+      type: String,
+      enum: ['stdlib', 'local', 'third-party']
+    }
+  }],
+  // Command-line arguments the script accepts; max null = no upper bound
+  argv: {
+    convention: {
+      type: String,
+      enum: ['single', 'multi', 'harness', 'unknown']
+    },
+    min: Number,
+    max: Number
+  },
+  problems: [String]
+}, { _id: false });
+
 const scriptSchema = new mongoose.Schema({
   name: {
     type: String,
@@ -15,13 +58,78 @@ const scriptSchema = new mongoose.Schema({
     ref: 'Challenge',
     required: true
   },
+  // uploads/scripts/<contentHash>.<ext>, shared by Scripts with the same
+  // content (see services/scriptStore.js)
   filePath: {
     type: String,
-    required: true
+    required: true,
+    index: true
+  },
+  // sha256 of the file; absent on Scripts uploaded before content addressing
+  contentHash: {
+    type: String,
+    index: true
   },
   language: {
     type: String,
     default: 'Python'
+  },
+  // 'per-ip' runs one process per target IP (`script <ip>`);
+  // 'all-ips' runs one process per team with every IP (`script <ip1> <ip2> ...`);
+  // 'batch' runs up to EXECUTOR_BATCH_SIZE of a team's IPs per process, like
+  // all-ips, but with one result per IP (scripts built on automation_harness)
+  argMode: {
+    type: String,
+    enum: ['per-ip', 'all-ips', 'batch'],
+    default: 'per-ip'
+  },
+  // Wall-clock budget per run; falls back to EXECUTOR_DEFAULT_TIMEOUT_SECONDS
+  timeoutSeconds: {
+    type: Number,
+    min: 1
+  },
+  // Max concurrent processes for this script; falls back to EXECUTOR_MAX_PER_SCRIPT
+  maxConcurrency: {
+    type: Number,
+    min: 1
+  },
+  // Reuse a target's result for this many seconds when the same content is
+  // run against the same arguments again (services/resultCache.js); unset: off
+  resultCacheSeconds: {
+    type: Number,
+    min: 1
+  },
+  // Relative share of executor time for this script's (team, challenge) queues
+  weight: {
+    type: Number,
+    min: 0.1,
+    default: 1
+  },
+  // Requirement specifiers ('impacket==0.11.0') installed into the script's
+  // own virtualenv. 'declared' at upload (an isolated environment), or
+  // 'inferred' from imports the shared interpreter lacks (an environment
+  // that also sees the shared site-packages). Empty: the shared interpreter.
+  dependencies: [String],
+  dependencySource: {
+    type: String,
+    enum: ['declared', 'inferred']
+  },
+  preflight: PreflightSchema,
+  // Run with `python -X importtime` (cold) and keep the latest import cost
+  // (services/importProfile.js)
+  profileImports: {
+    type: Boolean,
+    default: false
+  },
+  importProfile: {
+    sampledAt: Date,
+    samples: Number,
+    // Interpreter start-up and imports, and the rest of the run
+    importMs: Number,
+    checkMs: Number,
+    imports: Number,
+    // Slowest top-level imports, cumulative
+    modules: [{ _id: false, name: String, ms: Number }]
   }
 }, { timestamps: true });
 
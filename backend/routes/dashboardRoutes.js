@@ -0,0 +1,19 @@
+import express from 'express';
+import fetchuser from '../middleware/fetchuser.js';
+import dashboardSummary from '../services/dashboardSummary.js';
+
+const router = express.Router();
+
+// GET /summary - Counts, success rates per challenge and team, recent
+// executions and script start-up times; cached until an execution finishes
+router.get('/summary', fetchuser, async (req, res) => {
+  try {
+    const summary = await dashboardSummary.get();
+    res.json({ success: true, ...summary });
+  } catch (error) {
+    console.error('Error building dashboard summary:', error);
+    res.status(500).json({ success: false, message: 'Failed to load dashboard summary' });
+  }
+});
+
+export default router;
@@ -2,13 +2,12 @@ import express from 'express';
 import { exec } from 'child_process';
 import path from 'path';
 import fs from 'fs';
+import { Readable } from 'stream';
 import { fileURLToPath } from 'url';
 import mongoose from 'mongoose';
-import axios from 'axios'
 import dotenv from 'dotenv';
 import fetchuser from '../middleware/fetchuser.js';
 import multer from 'multer';
-import xlsx from 'xlsx';
 
 // Configure multer for file uploads
 
@@ -16,8 +15,14 @@ import xlsx from 'xlsx';
 // Load environment variables from the .env file
 dotenv.config();
 
-import Script from '../models/Script.js';
 import Execution from '../models/Execution.js';
+import User from '../models/User.js';
+import Challenge from '../models/challenge.js';
+import { cancelExecution, ExecutionRequestError, submitExecution, workerPool } from '../services/executionService.js';
+import { importTargets, readTargetRows, TargetFileError } from '../services/targetImport.js';
+import outputBus from '../services/outputBus.js';
+import { outputBucket } from '../services/outputCapture.js';
+import { openEventStream } from '../services/sseStream.js';
 
 const router = express.Router();
 
@@ -25,9 +30,6 @@ const router = express.Router();
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
-import { spawn } from 'child_process';
-
-
 import { excelUpload } from '../middleware/multerConfig.js';
 
 // router.post('/execute-from-excel', fetchuser, excelUpload.single('excelFile'), async (req, res) => {
@@ -281,298 +283,106 @@ import { excelUpload } from '../middleware/multerConfig.js';
 // });
 
 
+const sendRequestError = (res, err) => res.status(err.statusCode).json({
+  success: false,
+  message: err.message,
+  ...err.details
+});
+
 router.post('/execute-from-excel', fetchuser, excelUpload.single('excelFile'), async (req, res) => {
   try {
-    const { scriptId } = req.body;
+    const { scriptId, timeoutSeconds, force } = req.body;
     
     if (!req.file) {
       return res.status(400).json({ success: false, message: 'No file uploaded' });
     }
 
-    // Validate script exists
-    const script = await Script.findById(scriptId);
-    if (!script) {
-      fs.unlinkSync(req.file.path);
-      return res.status(404).json({ success: false, message: 'Script not found' });
-    }
-
-    // Read the Excel file
-    let workbook;
+    // Rows are read one at a time (CSV is streamed straight off disk)
+    let imported;
     try {
-      workbook = xlsx.readFile(req.file.path);
+      imported = await importTargets(readTargetRows(req.file.path, req.file.originalname));
     } catch (err) {
-      fs.unlinkSync(req.file.path);
+      if (!(err instanceof TargetFileError)) throw err;
+      console.error('Excel parse error:', err.cause?.message || err.message);
       return res.status(400).json({ 
         success: false, 
-        message: 'Invalid Excel file format' 
+        message: err.message 
       });
     }
-
-    const sheetName = workbook.SheetNames[0];
-    const worksheet = workbook.Sheets[sheetName];
-    const data = xlsx.utils.sheet_to_json(worksheet);
+    const { targets, errors, errorCount, totalRows } = imported;
 
     // Validate data format - must have UserEmail and at least one IP column
-    if (!data.length || !data[0].UserEmail || !Object.keys(data[0]).some(k => k.startsWith('IP'))) {
-      fs.unlinkSync(req.file.path);
+    if (totalRows === 0) {
       return res.status(400).json({ 
         success: false, 
         message: 'Invalid Excel format. Required columns: UserEmail and at least one IP column (IP1, IP2, etc.)' 
       });
     }
 
-    // Get user IDs for the emails
-    const User = mongoose.model('User');
-    const users = await User.find({ email: { $in: data.map(row => row.UserEmail) } });
-    
-    // Prepare targets
-    const targets = [];
-    const errors = [];
-    
-    data.forEach((row, rowIndex) => {
-      const user = users.find(u => u.email === row.UserEmail);
-      if (!user) {
-        errors.push(`Row ${rowIndex + 2}: User not found - ${row.UserEmail}`);
-        return;
-      }
-
-      // Extract all IP columns (IP1, IP2, IP3...)
-      const ips = Object.keys(row)
-        .filter(key => key.match(/^IP\d*$/)) // Match IP, IP1, IP2, etc.
-        .sort() // Sort to maintain IP order
-        .map(key => row[key])
-        .filter(ip => ip && typeof ip === 'string' && ip.trim() !== '');
-
-      if (ips.length === 0) {
-        errors.push(`Row ${rowIndex + 2}: No valid IPs found for user - ${row.UserEmail}`);
-        return;
-      }
-
-      // Validate IP format for each IP
-      const invalidIPs = ips.filter(ip => !/^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$/.test(ip));
-      if (invalidIPs.length > 0) {
-        errors.push(`Row ${rowIndex + 2}: Invalid IP format(s) - ${invalidIPs.join(', ')}`);
-        return;
-      }
-
-      targets.push({
-        userId: user._id,
-        userEmail: row.UserEmail,
-        ips,
-        description: row.Description || `IPs: ${ips.join(', ')}`
-      });
-    });
-
-    if (errors.length > 0) {
-      fs.unlinkSync(req.file.path);
+    if (errorCount > 0) {
       return res.status(400).json({ 
         success: false, 
         message: 'Errors found in Excel file',
         errors,
-        errorCount: errors.length,
+        errorCount,
         validTargets: targets.length
       });
     }
 
-    // Clean up uploaded file
-    fs.unlinkSync(req.file.path);
-
-    // Prepare execution data
-    const executionData = {
-      scriptId,
-      targets
-    };
-
-    // Call the execute endpoint
-    const response = await axios.post(`${process.env.BACKEND_URL}/api/executions/execute`, executionData, {
-      headers: {
-        'Content-Type': 'application/json',
-        'Auth-token': req.header('Auth-token')
-      }
-    });
+    const { execution, details } = await submitExecution({ scriptId, targets, timeoutSeconds, force });
 
-    res.json({
-      ...response.data,
+    res.status(202).json({
+      success: true,
+      executionId: execution._id,
+      execution,
+      message: 'Execution queued',
+      details,
       fileProcessing: {
-        totalRows: data.length,
+        totalRows,
         successfulTargets: targets.length,
-        errorCount: errors.length
+        errorCount
       }
     });
 
   } catch (err) {
-    console.error('Excel execution error:', err);
-    if (req.file && fs.existsSync(req.file.path)) {
-      fs.unlinkSync(req.file.path);
+    if (err instanceof ExecutionRequestError) {
+      return sendRequestError(res, err);
     }
+    console.error('Excel execution error:', err);
     res.status(500).json({ 
       success: false, 
       message: 'Failed to process Excel file',
       error: process.env.NODE_ENV === 'development' ? err.message : undefined,
       stack: process.env.NODE_ENV === 'development' ? err.stack : undefined
     });
+  } finally {
+    if (req.file) {
+      fs.promises.unlink(req.file.path).catch(() => {});
+    }
   }
 });
 
 
 router.post('/execute', fetchuser, async (req, res) => {
   try {
-    const { scriptId, targets } = req.body;
-
-    // Validate script exists
-    const script = await Script.findById(scriptId);
-    if (!script) {
-      return res.status(404).json({ success: false, message: 'Script not found' });
-    }
-
-    // Validate script file exists
-    const filePath = path.resolve(__dirname, '../', script.filePath);
-    if (!fs.existsSync(filePath)) {
-      return res.status(404).json({ 
-        success: false, 
-        message: 'Script file not found',
-        path: filePath
-      });
-    }
+    const { scriptId, targets, timeoutSeconds, force } = req.body;
 
-    // Create execution record with multiple IPs per target
-    const execution = new Execution({ 
-      script: script._id,
-      scriptName: script.name,
-      status: 'running',
-      targets: targets.map(target => ({
-        user: target.userId,
-        email: target.userEmail,
-        ips: target.ips,  // Store array of IPs
-        description: target.description,
-        status: 'pending'
-      })),
-      startedAt: new Date()
-    });
+    // Queue one job per target row; the worker pool picks them up.
+    // `force` runs every row even when the script caches results.
+    const { execution, details } = await submitExecution({ scriptId, targets, timeoutSeconds, force });
 
-    await execution.save();
-
-    // Process all targets and their IPs
-    const results = await Promise.all(targets.flatMap(target => {
-      // Create a single process for all IPs of this target
-      return target.ips.map(async (ip) => {
-        try {
-          console.log(`\n[Running script for user ${target.userEmail} with IPs: ${target.ips.join(', ')}]`);
-
-          // Spawn process with all IPs as arguments
-          const cmd = script.language.toLowerCase() === 'python' ? 'python' : 'bash';
-          const args = [filePath, ...target.ips];  // Pass all IPs as arguments
-
-          const child = spawn(cmd, args);
-
-          let stdout = '';
-          let stderr = '';
-          
-          child.stdout.on('data', (data) => stdout += data.toString());
-          child.stderr.on('data', (data) => stderr += data.toString());
-
-          const exitCode = await new Promise((resolve) => {
-            child.on('close', resolve);
-          });
-
-          console.log(`[IPs: ${target.ips.join(', ')}] Exit code: ${exitCode}`);
-          console.log(`[IPs: ${target.ips.join(', ')}] Script output:`, stdout);
-           console.log(`[IPs: ${target.ips.join(', ')}] Script error:`, stderr);
-
-          // Prepare update data for this IP
-          const updateData = {
-            'targets.$.output': stdout.trim(),
-            'targets.$.error': stderr.trim() || null,
-            'targets.$.status': exitCode === 0 ? 'completed' : 'failed'
-          };
-
-          // Handle API callback if script was successful
-          if (exitCode === 0) {
-            try {
-              const challengeId = script.challenge?.toString();
-              const userId = target.userId;
-              
-              if (challengeId && userId) {
-                const challengeUrl = `${process.env.CHALLENGE_BASE_URL}/${challengeId}/${userId}`;
-                const response = await axios.get(challengeUrl);
-                console.log(`[IPs: ${target.ips.join(', ')}] Challenge API Response:`, response.data);
-
-                updateData['targets.$.challengeResponse'] = {
-                  statusCode: response.status,
-                  message: response.data.message || 'Challenge completed successfully',
-                  success: true
-                };
-              }
-            } catch (apiError) {
-              console.error(`[IPs: ${target.ips.join(', ')}] Challenge API Error:`, apiError.message);
-              updateData['targets.$.challengeResponse'] = {
-                statusCode: apiError.response?.status || 500,
-                message: apiError.message || 'Challenge API failed',
-                success: false
-              };
-            }
-          }
-
-          return {
-            ip,
-            userId: target.userId,
-            updateData
-          };
-
-        } catch (err) {
-          console.error(`Error processing IP ${ip}:`, err);
-          return {
-            ip,
-            userId: target.userId,
-            updateData: {
-              'targets.$.error': err.message,
-              'targets.$.status': 'failed'
-            }
-          };
-        }
-      });
-    }));
-
-    // Apply all updates
-    const bulkOps = results.map(result => ({
-      updateOne: {
-        filter: { 
-          _id: execution._id, 
-          'targets.user': result.userId,
-          'targets.ips': result.ip
-        },
-        update: { $set: result.updateData }
-      }
-    }));
-
-    await Execution.bulkWrite(bulkOps);
-
-    // Finalize execution
-    const updatedExecution = await Execution.findByIdAndUpdate(
-      execution._id,
-      {
-        $set: {
-          status: results.some(result => 
-            result.updateData['targets.$.status'] === 'completed'
-          ) ? 'completed' : 'failed',
-          completedAt: new Date(),
-          duration: `${Math.floor((Date.now() - execution.startedAt) / 60000)}m ${Math.floor(((Date.now() - execution.startedAt) % 60000) / 1000)}s`
-        }
-      },
-      { new: true }
-    );
-
-    res.json({ 
+    res.status(202).json({ 
       success: true, 
-      execution: updatedExecution, 
-      message: 'Execution completed',
-      details: {
-        totalTargets: targets.length,
-        totalIPs: targets.reduce((sum, target) => sum + target.ips.length, 0)
-      }
+      executionId: execution._id,
+      execution, 
+      message: 'Execution queued',
+      details
     });
 
   } catch (err) {
+    if (err instanceof ExecutionRequestError) {
+      return sendRequestError(res, err);
+    }
     console.error('Execution error!', err);
     res.status(500).json({ 
       success: false, 
@@ -582,14 +392,78 @@ router.post('/execute', fetchuser, async (req, res) => {
   }
 });
 
+// Listing never carries output/error blobs; fetch those per target via /log
+const SUMMARY_PROJECTION = {
+  'targets.output': 0,
+  'targets.error': 0,
+  'targets.result.checks': 0,
+  'targets.result.data': 0
+};
+const MAX_PAGE_SIZE = 100;
+
+const encodeCursor = (execution) =>
+  Buffer.from(`${execution.createdAt.toISOString()}_${execution._id}`).toString('base64url');
+
+const decodeCursor = (cursor) => {
+  const [createdAt, id] = Buffer.from(cursor, 'base64url').toString().split('_');
+  if (!id || !mongoose.isValidObjectId(id) || isNaN(Date.parse(createdAt))) return null;
+  return { createdAt: new Date(createdAt), id: new mongoose.Types.ObjectId(id) };
+};
+
+// GET /?limit=25&cursor=...&status=&script=&challenge=&team=&from=&to=
 router.get('/',fetchuser, async (req, res) => {
   try {
-    const executions = await Execution.find()
-      .sort({ createdAt: -1 })
+    const { cursor, status, script, challenge, team, from, to } = req.query;
+    const limit = Math.max(1, Math.min(parseInt(req.query.limit, 10) || 25, MAX_PAGE_SIZE));
+
+    const ids = { script, challenge, team };
+    const invalid = Object.keys(ids).filter(key => ids[key] && !mongoose.isValidObjectId(ids[key]));
+    if (invalid.length > 0) {
+      return res.status(400).json({ success: false, message: `Invalid id for: ${invalid.join(', ')}` });
+    }
+
+    if ([from, to].some(value => value && isNaN(Date.parse(value)))) {
+      return res.status(400).json({ success: false, message: 'Invalid from/to date' });
+    }
+
+    const filter = {};
+    if (status) filter.status = status;
+    if (script) filter.script = script;
+    if (challenge) filter['challenge.id'] = challenge;
+    if (team) filter['targets.user'] = team;
+    if (from || to) {
+      filter.createdAt = {};
+      if (from) filter.createdAt.$gte = new Date(from);
+      if (to) filter.createdAt.$lte = new Date(to);
+    }
+
+    if (cursor) {
+      const position = decodeCursor(cursor);
+      if (!position) {
+        return res.status(400).json({ success: false, message: 'Invalid cursor' });
+      }
+      filter.$or = [
+        { createdAt: { $lt: position.createdAt } },
+        { createdAt: position.createdAt, _id: { $lt: position.id } }
+      ];
+    }
+
+    // Fetch one extra row to know whether another page exists
+    const executions = await Execution.find(filter, SUMMARY_PROJECTION)
+      .sort({ createdAt: -1, _id: -1 })
+      .limit(limit + 1)
       .populate('script', 'name language')
-      .populate('targets.user', 'email');
+      .populate('targets.user', 'email')
+      .lean();
 
-    res.json({ success: true, executions });
+    const hasMore = executions.length > limit;
+    if (hasMore) executions.pop();
+
+    res.json({
+      success: true,
+      executions,
+      nextCursor: hasMore ? encodeCursor(executions[executions.length - 1]) : null
+    });
   } catch (err) {
     console.error(err);
     res.status(500).json({ success: false, message: 'Server error' });
@@ -611,11 +485,12 @@ router.get('/count/executions', fetchuser, async (req, res) => {
 // Updated executions route to return only recent executions
 router.get('/recent', fetchuser, async (req, res) => {
   try {
-    const executions = await Execution.find()
-      .sort({ createdAt: -1 })
+    const executions = await Execution.find({}, SUMMARY_PROJECTION)
+      .sort({ createdAt: -1, _id: -1 })
       .limit(4) // Only get the 4 most recent
       .populate('script', 'name language')
-      .populate('targets.user', 'email');
+      .populate('targets.user', 'email')
+      .lean();
 
     res.json({ success: true, executions });
   } catch (err) {
@@ -624,4 +499,238 @@ router.get('/recent', fetchuser, async (req, res) => {
   }
 });
 
+// GET /results/summary?script=&challenge=&from=&to= - Target outcomes by
+// result status, and pass/fail counts per check, from the typed results
+router.get('/results/summary', fetchuser, async (req, res) => {
+  try {
+    const { script, challenge, from, to } = req.query;
+
+    const ids = { script, challenge };
+    const invalid = Object.keys(ids).filter(key => ids[key] && !mongoose.isValidObjectId(ids[key]));
+    if (invalid.length > 0) {
+      return res.status(400).json({ success: false, message: `Invalid id for: ${invalid.join(', ')}` });
+    }
+    if ([from, to].some(value => value && isNaN(Date.parse(value)))) {
+      return res.status(400).json({ success: false, message: 'Invalid from/to date' });
+    }
+
+    const match = { 'targets.result.status': { $exists: true } };
+    if (script) match.script = new mongoose.Types.ObjectId(script);
+    if (challenge) match['challenge.id'] = new mongoose.Types.ObjectId(challenge);
+    if (from || to) {
+      match.createdAt = {};
+      if (from) match.createdAt.$gte = new Date(from);
+      if (to) match.createdAt.$lte = new Date(to);
+    }
+
+    const [summary] = await Execution.aggregate([
+      { $match: match },
+      { $project: { 'targets.result.status': 1, 'targets.result.checks.name': 1, 'targets.result.checks.outcome': 1 } },
+      { $unwind: '$targets' },
+      { $match: { 'targets.result.status': { $exists: true } } },
+      {
+        $facet: {
+          statuses: [
+            { $group: { _id: '$targets.result.status', count: { $sum: 1 } } },
+            { $sort: { count: -1 } }
+          ],
+          checks: [
+            { $unwind: '$targets.result.checks' },
+            {
+              $group: {
+                _id: { name: '$targets.result.checks.name', outcome: '$targets.result.checks.outcome' },
+                count: { $sum: 1 }
+              }
+            },
+            {
+              $group: {
+                _id: '$_id.name',
+                outcomes: { $push: { k: '$_id.outcome', v: '$count' } },
+                total: { $sum: '$count' }
+              }
+            },
+            { $project: { _id: 0, name: '$_id', total: 1, outcomes: { $arrayToObject: '$outcomes' } } },
+            { $sort: { name: 1 } }
+          ]
+        }
+      }
+    ]);
+
+    res.json({
+      success: true,
+      statuses: Object.fromEntries(summary.statuses.map(entry => [entry._id, entry.count])),
+      checks: summary.checks
+    });
+  } catch (err) {
+    console.error('Error summarizing results:', err);
+    res.status(500).json({ success: false, message: 'Failed to summarize results' });
+  }
+});
+
+// GET /queue - Fair-share view: depth, wait and running count per (team, challenge)
+router.get('/queue', fetchuser, async (req, res) => {
+  try {
+    const keys = await workerPool.queueStats();
+
+    const [users, challenges] = await Promise.all([
+      User.find({ _id: { $in: keys.map(entry => entry.user).filter(Boolean) } }).select('email').lean(),
+      Challenge.find({ _id: { $in: keys.map(entry => entry.challenge).filter(Boolean) } }).select('name').lean()
+    ]);
+    const emails = new Map(users.map(user => [user._id.toString(), user.email]));
+    const names = new Map(challenges.map(challenge => [challenge._id.toString(), challenge.name]));
+
+    res.json({
+      success: true,
+      running: workerPool.running.size,
+      maxConcurrency: workerPool.maxConcurrency,
+      keys: keys
+        .map(entry => ({
+          ...entry,
+          userEmail: emails.get(entry.user?.toString()) || null,
+          challengeName: names.get(entry.challenge?.toString()) || null
+        }))
+        .sort((a, b) => b.oldestWaitMs - a.oldestWaitMs)
+    });
+  } catch (err) {
+    console.error('Error fetching queue stats:', err);
+    res.status(500).json({ success: false, message: 'Failed to fetch queue stats' });
+  }
+});
+
+// Cancel a running execution: queued targets are dropped, running ones are
+// terminated (SIGTERM, then SIGKILL) and recorded as cancelled
+router.post('/:id/cancel', fetchuser, async (req, res) => {
+  try {
+    const result = await cancelExecution(req.params.id);
+    if (!result) {
+      return res.status(404).json({ success: false, message: 'No running execution found' });
+    }
+
+    res.json({ success: true, message: 'Execution cancelled', ...result });
+  } catch (err) {
+    console.error('Cancel execution error:', err);
+    res.status(500).json({ success: false, message: 'Server error' });
+  }
+});
+
+// Full stdout/stderr of one target. Spilled logs are read from GridFS, short
+// ones from the document. Supports single byte ranges (Range: bytes=a-b).
+router.get('/:id/targets/:targetId/log', fetchuser, async (req, res) => {
+  try {
+    const stream = req.query.stream === 'stderr' ? 'stderr' : 'stdout';
+    const [inlineField, logField] = stream === 'stderr' ? ['error', 'errorLog'] : ['output', 'outputLog'];
+
+    const execution = await Execution.findOne(
+      { _id: req.params.id, 'targets._id': req.params.targetId },
+      { 'targets.$': 1 }
+    ).lean();
+    if (!execution) {
+      return res.status(404).json({ success: false, message: 'Target not found' });
+    }
+
+    const target = execution.targets[0];
+    const fileId = target[logField]?.file;
+    let size;
+    let open;
+
+    if (fileId) {
+      const [file] = await outputBucket().find({ _id: fileId }).toArray();
+      if (!file) {
+        return res.status(404).json({ success: false, message: 'Log file not found' });
+      }
+      size = file.length;
+      // GridFS `end` is exclusive
+      open = (start, end) => outputBucket().openDownloadStream(fileId, { start, end: end + 1 });
+    } else {
+      const body = Buffer.from(target[inlineField] || '');
+      size = body.length;
+      open = (start, end) => Readable.from([body.subarray(start, end + 1)]);
+    }
+
+    res.set({
+      'Content-Type': 'text/plain; charset=utf-8',
+      'Accept-Ranges': 'bytes',
+      'Content-Disposition': `inline; filename="${req.params.targetId}-${stream}.log"`
+    });
+
+    let start = 0;
+    let end = size - 1;
+    const ranges = req.headers.range ? req.range(size) : null;
+
+    if (ranges === -1) {
+      res.set('Content-Range', `bytes */${size}`);
+      return res.status(416).end();
+    }
+    if (Array.isArray(ranges) && ranges.type === 'bytes') {
+      ({ start, end } = ranges[0]);
+      res.status(206).set('Content-Range', `bytes ${start}-${end}/${size}`);
+    }
+
+    res.set('Content-Length', String(Math.max(0, end - start + 1)));
+    if (size === 0) {
+      return res.end();
+    }
+
+    open(start, end)
+      .on('error', (err) => {
+        console.error('Log download error:', err);
+        res.destroy(err);
+      })
+      .pipe(res);
+  } catch (err) {
+    console.error('Log download error:', err);
+    res.status(500).json({ success: false, message: 'Server error' });
+  }
+});
+
+// Live output for an execution as Server-Sent Events. Optional ?target=<id>
+// narrows chunk events to one target row; status events are always sent.
+router.get('/:id/stream', fetchuser, async (req, res) => {
+  try {
+    const execution = await Execution.findById(req.params.id)
+      .select('status targets._id targets.status')
+      .lean();
+
+    if (!execution) {
+      return res.status(404).json({ success: false, message: 'Execution not found' });
+    }
+
+    const targetFilter = req.query.target;
+    const stream = openEventStream(res);
+
+    stream.send('snapshot', {
+      status: execution.status,
+      targets: execution.targets.map(target => ({
+        target: target._id.toString(),
+        status: target.status,
+        ...outputBus.tail(target._id)
+      }))
+    });
+
+    if (execution.status !== 'running') {
+      stream.send('done', { status: execution.status });
+      return stream.close();
+    }
+
+    const unsubscribe = outputBus.subscribe(execution._id, (event) => {
+      if (event.type === 'chunk' && targetFilter && event.target !== targetFilter) return;
+      stream.send(event.type, event);
+      if (event.type === 'done') stream.close();
+    });
+    stream.onClose(unsubscribe);
+
+    // The run may have finished while the snapshot was being read
+    if (!(await Execution.exists({ _id: execution._id, status: 'running' }))) {
+      const { status } = await Execution.findById(execution._id).select('status').lean();
+      stream.send('done', { status });
+      stream.close();
+    }
+  } catch (err) {
+    console.error('Execution stream error:', err);
+    if (!res.headersSent) {
+      res.status(500).json({ success: false, message: 'Server error' });
+    }
+  }
+});
+
 export default router;
\ No newline at end of file
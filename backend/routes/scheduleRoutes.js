@@ -0,0 +1,136 @@
+import express from 'express';
+import mongoose from 'mongoose';
+import Schedule from '../models/Schedule.js';
+import Script from '../models/Script.js';
+import Challenge from '../models/challenge.js';
+import fetchuser from '../middleware/fetchuser.js';
+import { nextRunAfter, runRound } from '../services/roundScheduler.js';
+
+const router = express.Router();
+
+const EDITABLE_FIELDS = [
+  'name', 'script', 'challenge', 'intervalSeconds', 'jitterSeconds',
+  'spreadSeconds', 'timeoutSeconds', 'startAt', 'endAt', 'enabled'
+];
+
+const pickFields = (body) => Object.fromEntries(
+  EDITABLE_FIELDS.filter(field => body[field] !== undefined).map(field => [field, body[field] === '' ? null : body[field]])
+);
+
+// Returns an error message, or null when the schedule can be saved
+const validateSchedule = async (schedule) => {
+  if (!schedule.script === !schedule.challenge) {
+    return 'Exactly one of script or challenge is required';
+  }
+  if (schedule.script && !(mongoose.isValidObjectId(schedule.script) && await Script.exists({ _id: schedule.script }))) {
+    return 'Script not found';
+  }
+  if (schedule.challenge && !(mongoose.isValidObjectId(schedule.challenge) && await Challenge.exists({ _id: schedule.challenge }))) {
+    return 'Challenge not found';
+  }
+  if (schedule.startAt && schedule.endAt && schedule.endAt <= schedule.startAt) {
+    return 'endAt must be after startAt';
+  }
+  return null;
+};
+
+// GET / - All schedules with their script / challenge names
+router.get('/', fetchuser, async (req, res) => {
+  try {
+    const schedules = await Schedule.find()
+      .populate('script', 'name')
+      .populate('challenge', 'name')
+      .sort({ createdAt: -1 })
+      .lean();
+
+    res.json({ success: true, schedules });
+  } catch (err) {
+    console.error('Error fetching schedules:', err);
+    res.status(500).json({ success: false, message: 'Failed to fetch schedules' });
+  }
+});
+
+// POST / - Create a schedule; its first round is planned right away
+router.post('/', fetchuser, async (req, res) => {
+  try {
+    const schedule = new Schedule({ ...pickFields(req.body), createdBy: req.user?.id });
+
+    const problem = await validateSchedule(schedule);
+    if (problem) {
+      return res.status(400).json({ success: false, message: problem });
+    }
+
+    await schedule.validate();
+    schedule.nextRunAt = schedule.enabled ? nextRunAfter(schedule) : null;
+    await schedule.save();
+
+    res.status(201).json({ success: true, message: 'Schedule created', schedule });
+  } catch (err) {
+    if (err instanceof mongoose.Error.ValidationError) {
+      return res.status(400).json({ success: false, message: err.message });
+    }
+    console.error('Error creating schedule:', err);
+    res.status(500).json({ success: false, message: 'Failed to create schedule' });
+  }
+});
+
+// PATCH /:id - Change timing, target or enable/disable; replans the next round
+router.patch('/:id', fetchuser, async (req, res) => {
+  try {
+    const schedule = await Schedule.findById(req.params.id);
+    if (!schedule) {
+      return res.status(404).json({ success: false, message: 'Schedule not found' });
+    }
+
+    schedule.set(pickFields(req.body));
+    const problem = await validateSchedule(schedule);
+    if (problem) {
+      return res.status(400).json({ success: false, message: problem });
+    }
+
+    await schedule.validate();
+    schedule.nextRunAt = schedule.enabled ? nextRunAfter(schedule) : null;
+    await schedule.save();
+
+    res.json({ success: true, message: 'Schedule updated', schedule });
+  } catch (err) {
+    if (err instanceof mongoose.Error.ValidationError || err instanceof mongoose.Error.CastError) {
+      return res.status(400).json({ success: false, message: err.message });
+    }
+    console.error('Error updating schedule:', err);
+    res.status(500).json({ success: false, message: 'Failed to update schedule' });
+  }
+});
+
+router.delete('/:id', fetchuser, async (req, res) => {
+  try {
+    const deleted = await Schedule.findByIdAndDelete(req.params.id);
+    if (!deleted) {
+      return res.status(404).json({ success: false, message: 'Schedule not found' });
+    }
+    res.json({ success: true, message: 'Schedule deleted' });
+  } catch (err) {
+    console.error('Error deleting schedule:', err);
+    res.status(500).json({ success: false, message: 'Failed to delete schedule' });
+  }
+});
+
+// POST /:id/run - Run a round now, outside the schedule's own timing
+router.post('/:id/run', fetchuser, async (req, res) => {
+  try {
+    const schedule = await Schedule.findById(req.params.id);
+    if (!schedule) {
+      return res.status(404).json({ success: false, message: 'Schedule not found' });
+    }
+
+    const round = await runRound(schedule);
+    await Schedule.updateOne({ _id: schedule._id }, { $set: { lastRound: round, lastRunAt: new Date() } });
+
+    res.status(202).json({ success: true, message: 'Round queued', round });
+  } catch (err) {
+    console.error('Error running schedule:', err);
+    res.status(500).json({ success: false, message: 'Failed to run schedule' });
+  }
+});
+
+export default router;
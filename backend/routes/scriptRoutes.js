@@ -1,39 +1,44 @@
 import express from 'express';
-import multer from 'multer';
 import Script from '../models/Script.js';
 import Challenge from '../models/challenge.js';
 import fetchuser from '../middleware/fetchuser.js';
+import { scriptUpload } from '../middleware/multerConfig.js';
+import * as scriptStore from '../services/scriptStore.js';
+import { queuePreflight } from '../services/preflight.js';
+import { DependencyError, normalizeDependencies } from '../services/venvCache.js';
+import { importProfiles } from '../services/importProfile.js';
 
 const router = express.Router();
 
-// Configure multer for file uploads
-const storage = multer.diskStorage({
-  destination: (req, file, cb) => {
-    cb(null, 'uploads/scripts/');
-  },
-  filename: (req, file, cb) => {
-    const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
-    const fileExtension = file.originalname.split('.').pop();
-    cb(null, `script-${uniqueSuffix}.${fileExtension}`);
-  }
-});
+// Numeric Script settings accepted from a request, with their schema bounds
+const NUMERIC_SETTINGS = {
+  timeoutSeconds: { min: 1 },
+  weight: { min: 0.1, integer: false },
+  maxConcurrency: { min: 1 },
+  resultCacheSeconds: { min: 1 }
+};
 
-const upload = multer({ 
-  storage: storage,
-  fileFilter: (req, file, cb) => {
-    // Accept only .py, .js, .java files etc.
-    if (file.originalname.match(/\.(py|js|java|c|cpp|rb|go|rs|php)$/)) {
-      cb(null, true);
-    } else {
-      cb(new Error('Only script files are allowed!'), false);
-    }
-  }
-});
+// A numeric setting from a request: undefined when blank, NaN when not a
+// number (or not a whole one, where required) or below its minimum
+const parseSetting = (name, value) => {
+  if (value === undefined || value === null || value === '') return undefined;
+  const { min, integer = true } = NUMERIC_SETTINGS[name];
+  const number = Number(value);
+  const valid = (integer ? Number.isInteger(number) : Number.isFinite(number)) && number >= min;
+  return valid ? number : NaN;
+};
+
+const settingError = (name) => {
+  const { min, integer = true } = NUMERIC_SETTINGS[name];
+  return `${name} must be ${integer ? 'a whole number' : 'a number'} of at least ${min}`;
+};
 
 // POST / - Add a new script with file upload
-router.post('/',fetchuser, upload.single('file'), async (req, res) => {
+router.post('/',fetchuser, scriptUpload.single('file'), async (req, res) => {
+  let savedScript;
+  let committed = false;
   try {
-    const { name, description, challenge, language } = req.body;
+    const { name, description, challenge, language, argMode, timeoutSeconds, weight, maxConcurrency, resultCacheSeconds, dependencies } = req.body;
 
     // Validate required fields
     if (!name || !description || !challenge || !language || !req.file) {
@@ -62,16 +67,57 @@ router.post('/',fetchuser, upload.single('file'), async (req, res) => {
       });
     }
 
+    const argModes = Script.schema.path('argMode').enumValues;
+    if (argMode && !argModes.includes(argMode)) {
+      return res.status(400).json({
+        success: false,
+        message: 'Unsupported argument mode',
+        argModes
+      });
+    }
+
+    const settings = {};
+    for (const [name, value] of Object.entries({ timeoutSeconds, weight, maxConcurrency, resultCacheSeconds })) {
+      settings[name] = parseSetting(name, value);
+      if (Number.isNaN(settings[name])) {
+        return res.status(400).json({ success: false, message: settingError(name) });
+      }
+    }
+
+    // One requirement per line; none means inferred from the imports
+    let declared;
+    try {
+      declared = normalizeDependencies(
+        Array.isArray(dependencies) ? dependencies : String(dependencies || '').split('\n')
+      );
+    } catch (error) {
+      if (!(error instanceof DependencyError)) throw error;
+      return res.status(400).json({ success: false, message: error.message });
+    }
+
     // Create new script
     const newScript = new Script({
       name,
       description,
       challenge,
       filePath: req.file.path,
-      language // Taken from frontend
+      contentHash: req.file.contentHash,
+      language, // Taken from frontend
+      argMode,
+      ...settings,
+      dependencies: declared,
+      dependencySource: declared.length ? 'declared' : undefined,
+      preflight: { status: 'pending' }
     });
 
-    const savedScript = await newScript.save();
+    savedScript = await newScript.save();
+    await scriptStore.commit(req.file);
+    committed = true;
+
+    // Checked in the background (the script's environment may need building).
+    // A failing preflight is stored rather than rejected: the runner may be
+    // fixed (a module installed) and the script checked again
+    queuePreflight(savedScript._id);
 
     res.status(201).json({
       success: true,
@@ -81,17 +127,29 @@ router.post('/',fetchuser, upload.single('file'), async (req, res) => {
         name: savedScript.name,
         challenge: savedScript.challenge,
         language: savedScript.language,
-        filePath: savedScript.filePath
+        argMode: savedScript.argMode,
+        timeoutSeconds: savedScript.timeoutSeconds,
+        weight: savedScript.weight,
+        maxConcurrency: savedScript.maxConcurrency,
+        resultCacheSeconds: savedScript.resultCacheSeconds,
+        filePath: savedScript.filePath,
+        contentHash: savedScript.contentHash,
+        dependencies: savedScript.dependencies,
+        preflight: savedScript.preflight
       }
     });
 
   } catch (error) {
     console.error('Error adding script:', error);
+    // Saved but its file never made it into place
+    if (savedScript && !committed) await Script.deleteOne({ _id: savedScript._id }).catch(() => {});
     res.status(500).json({
       success: false,
       message: error.message || 'Failed to add script',
       error: error.message
     });
+  } finally {
+    if (req.file) await scriptStore.discard(req.file).catch(() => {});
   }
 });
 
@@ -142,11 +200,21 @@ router.get('/', fetchuser, async (req, res) => {
       name: script.name,
       description: script.description,
       language: script.language,
+      argMode: script.argMode,
+      timeoutSeconds: script.timeoutSeconds,
+      weight: script.weight,
+      maxConcurrency: script.maxConcurrency,
+      resultCacheSeconds: script.resultCacheSeconds,
       challenge: script.challenge ? {
         id: script.challenge._id,
         name: script.challenge.name
       } : null, // Handle null challenge case
       filePath: script.filePath,
+      contentHash: script.contentHash,
+      dependencies: script.dependencies,
+      preflight: script.preflight,
+      profileImports: script.profileImports,
+      importProfile: script.importProfile,
       createdAt: script.createdAt,
       updatedAt: script.updatedAt
     }));
@@ -166,6 +234,79 @@ router.get('/', fetchuser, async (req, res) => {
   }
 });
 
+// POST /:id/preflight - Check a script again, e.g. after installing its modules
+router.post('/:id/preflight', fetchuser, async (req, res) => {
+  try {
+    const script = await Script.findById(req.params.id);
+    if (!script) {
+      return res.status(404).json({ success: false, message: 'Script not found.' });
+    }
+
+    script.preflight = { status: 'pending' };
+    await script.save();
+    queuePreflight(script._id);
+
+    res.status(202).json({ success: true, dependencies: script.dependencies, preflight: script.preflight });
+  } catch (error) {
+    console.error('Error checking script:', error);
+    res.status(500).json({ success: false, message: 'Failed to check script', error: error.message });
+  }
+});
+
+// POST /:id/import-profile - Turn import-time profiling on or off ({ enabled })
+router.post('/:id/import-profile', fetchuser, async (req, res) => {
+  try {
+    const script = await Script.findByIdAndUpdate(
+      req.params.id,
+      { $set: { profileImports: Boolean(req.body.enabled) } },
+      { new: true }
+    );
+    if (!script) {
+      return res.status(404).json({ success: false, message: 'Script not found.' });
+    }
+
+    res.json({ success: true, profileImports: script.profileImports, importProfile: script.importProfile });
+  } catch (error) {
+    console.error('Error updating import profiling:', error);
+    res.status(500).json({ success: false, message: 'Failed to update import profiling', error: error.message });
+  }
+});
+
+// PUT /:id/concurrency - Cap concurrent runs of the script ({ maxConcurrency });
+// blank falls back to EXECUTOR_MAX_PER_SCRIPT. Applies to jobs queued from now on.
+router.put('/:id/concurrency', fetchuser, async (req, res) => {
+  try {
+    const concurrency = parseSetting('maxConcurrency', req.body.maxConcurrency);
+    if (Number.isNaN(concurrency)) {
+      return res.status(400).json({ success: false, message: settingError('maxConcurrency') });
+    }
+
+    const script = await Script.findByIdAndUpdate(
+      req.params.id,
+      concurrency === undefined ? { $unset: { maxConcurrency: 1 } } : { $set: { maxConcurrency: concurrency } },
+      { new: true }
+    );
+    if (!script) {
+      return res.status(404).json({ success: false, message: 'Script not found' });
+    }
+
+    res.json({ success: true, maxConcurrency: script.maxConcurrency });
+  } catch (error) {
+    console.error('Error updating script concurrency:', error);
+    res.status(500).json({ success: false, message: 'Failed to update script concurrency', error: error.message });
+  }
+});
+
+// GET /import-profiles - Import cost against check cost, per profiled script
+router.get('/import-profiles', fetchuser, async (req, res) => {
+  try {
+    res.json({ success: true, ...(await importProfiles()) });
+  } catch (error) {
+    console.error('Error fetching import profiles:', error);
+    res.status(500).json({ success: false, message: 'Failed to fetch import profiles', error: error.message });
+  }
+});
+
 router.delete('/delete-script/:id', fetchuser, async (req, res) => {
   const { id } = req.params;
 
@@ -180,6 +321,11 @@ router.delete('/delete-script/:id', fetchuser, async (req, res) => {
       return res.status(404).json({ success: false, message: 'Script not found.' });
     }
 
+    // The file may be shared with other Scripts of the same content
+    await scriptStore.release(deletedScript.filePath).catch(error => {
+      console.warn(`[scripts] could not remove ${deletedScript.filePath}: ${error.message}`);
+    });
+
     res.json({ success: true, message: 'Script deleted successfully.' });
   } catch (err) {
     console.error('Error deleting script:', err);
@@ -1,10 +1,10 @@
 
 import express from 'express';
-import bcrypt from 'bcryptjs';
 import jwt from 'jsonwebtoken';
 
 import User from '../models/User.js';
 import fetchuser from '../middleware/fetchuser.js';
+import threadPool from '../services/threadPool.js';
 
 const router = express.Router();
 
@@ -29,7 +29,8 @@ router.post('/login', async (req, res) => {
         return res.status(403).json({ error: "Bad Request" });
       }
 
-      const comparePass = bcrypt.compareSync(req.body.password, user.password);
+      // bcrypt is CPU-bound; compare on a worker thread, not the event loop
+      const comparePass = await threadPool.run('comparePassword', req.body.password, user.password);
 
       if (comparePass) {
         const data = {
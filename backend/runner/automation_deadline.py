@@ -0,0 +1,65 @@
+"""
+Time budget for a check run.
+
+The executor tells a script how long it has (AUTOMATION_DEADLINE_SECONDS,
+a little under the run's timeout) so the script can still report a result
+before it is killed. Every blocking step asks the deadline for its timeout
+instead of hard-coding one:
+
+    from automation_deadline import Deadline
+
+    deadline = Deadline.from_env()
+    sock.settimeout(deadline.timeout(5))     # 5 s, or less if time is short
+    requests.get(url, timeout=deadline.timeout(10))
+    deadline.pace()                          # only sleeps if pacing was declared
+
+timeout() raises DeadlineExceeded once the budget is spent, so remaining
+steps fail fast instead of each waiting out its own timeout. Scripts that
+must not hammer a target declare it: Deadline.from_env(pacing=1.0).
+"""
+
+import os
+import time
+
+MIN_TIMEOUT = 0.05
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds=None, pacing=0.0):
+        self.ends = time.monotonic() + seconds if seconds is not None else None
+        self.pacing = pacing
+
+    @classmethod
+    def from_env(cls, pacing=0.0):
+        seconds = os.environ.get("AUTOMATION_DEADLINE_SECONDS")
+        return cls(float(seconds) if seconds else None, pacing)
+
+    def remaining(self):
+        """Seconds left, or None without a deadline."""
+        if self.ends is None:
+            return None
+        return max(0.0, self.ends - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.ends is not None and time.monotonic() >= self.ends
+
+    def timeout(self, cap=None):
+        """Timeout for the next blocking call: `cap`, cut to what is left."""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        if remaining < MIN_TIMEOUT:
+            raise DeadlineExceeded("deadline reached")
+        return remaining if cap is None else min(cap, remaining)
+
+    def pace(self):
+        """Sleep for the declared pacing interval, never past the deadline."""
+        if self.pacing <= 0:
+            return
+        remaining = self.remaining()
+        time.sleep(self.pacing if remaining is None else min(self.pacing, remaining))
@@ -0,0 +1,154 @@
+"""
+Run a checker against many targets in one interpreter.
+
+A script writes its check for a single target and hands it to run():
+
+    from automation_harness import run
+
+    def check(target, result):
+        with result.check("nosql_login") as step:
+            ...
+            step.passed("token issued")
+        return "success"            # a status, or True / False
+
+    if __name__ == "__main__":
+        run(check)                  # targets come from sys.argv[1:]
+
+The check receives the target and an automation_result.Result for it, and
+returns a status (see automation_result), True for success or False for
+hardened. An exception ends that target as 'error'; the others carry on.
+
+Targets run concurrently on a bounded thread pool (--concurrency N, or
+AUTOMATION_CONCURRENCY, default 16); checks are network-bound, so threads
+overlap their waits. Every line a target prints, including its result line,
+is prefixed with "[<target>] " when there is more than one target, which
+lets the executor split a batch run (Script argMode 'batch') back into one
+row per IP. Output of threads the check starts itself is not prefixed.
+
+All targets share the run's deadline (result.deadline, from
+AUTOMATION_DEADLINE_SECONDS or --deadline); a target that runs out of it
+reports 'timeout'. Pass pacing=<seconds> to run() only if the script must
+wait between steps, and call result.deadline.pace() there.
+
+Exit code: 0 when every target succeeded, 1 otherwise.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from automation_deadline import Deadline, DeadlineExceeded
+from automation_result import STATUSES, Result
+
+DEFAULT_CONCURRENCY = int(os.environ.get("AUTOMATION_CONCURRENCY") or 16)
+
+_local = threading.local()
+
+
+class _PrefixedStream:
+    """Stands in for sys.stdout / sys.stderr and tags each line with the
+    target of the thread that wrote it."""
+
+    def __init__(self, stream, lock):
+        self.stream = stream
+        self.lock = lock
+        self.partial = {}  # thread id -> unfinished line
+
+    def write(self, text):
+        prefix = getattr(_local, "prefix", None)
+        if prefix is None:
+            with self.lock:
+                return self.stream.write(text)
+
+        key = threading.get_ident()
+        lines = (self.partial.pop(key, "") + text).split("\n")
+        if lines[-1]:
+            self.partial[key] = lines[-1]
+        if len(lines) > 1:
+            with self.lock:
+                self.stream.write("".join(prefix + line + "\n" for line in lines[:-1]))
+                self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        prefix = getattr(_local, "prefix", None)
+        if prefix is not None:
+            rest = self.partial.pop(threading.get_ident(), "")
+            if rest:
+                with self.lock:
+                    self.stream.write(prefix + rest + "\n")
+        with self.lock:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _status_of(returned, result):
+    if returned is True:
+        return "success"
+    if returned is False:
+        return "hardened"
+    if returned in STATUSES:
+        return returned
+    if result.emitted:
+        return result.status
+    raise ValueError(f"check returned {returned!r}; expected a status or True / False")
+
+
+def _run_target(check, target, prefixed, deadline):
+    _local.prefix = f"[{target}] " if prefixed else None
+    result = Result(target=target, deadline=deadline)
+    try:
+        status = _status_of(check(target, result), result)
+        result.emit(status)
+        return result.status
+    except SystemExit as exc:
+        # result.finish() (or sys.exit) inside a check ends this target only
+        if not result.emitted:
+            result.emit("success" if exc.code in (0, None) else "error", f"exited with {exc.code}")
+        return result.status
+    except DeadlineExceeded:
+        result.emit("timeout", "deadline reached")
+        return "timeout"
+    except Exception as exc:
+        traceback.print_exc()
+        result.emit("error", f"{type(exc).__name__}: {exc}")
+        return "error"
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _local.prefix = None
+
+
+def run(check, targets=None, concurrency=None, deadline_seconds=None, pacing=0.0):
+    """Run check() for every target and exit with the combined outcome."""
+    if targets is None:
+        parser = argparse.ArgumentParser(description="Run this check against one or more targets")
+        parser.add_argument("targets", nargs="+", help="Target IP addresses")
+        parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                            help="Targets checked at the same time")
+        parser.add_argument("--deadline", type=float, default=None,
+                            help="Seconds the whole run may take")
+        args = parser.parse_args()
+        targets, concurrency, deadline_seconds = args.targets, args.concurrency, args.deadline
+
+    deadline = Deadline(deadline_seconds, pacing) if deadline_seconds else Deadline.from_env(pacing)
+
+    concurrency = max(1, min(concurrency or DEFAULT_CONCURRENCY, len(targets)))
+    prefixed = len(targets) > 1
+
+    lock = threading.Lock()
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = _PrefixedStream(stdout, lock)
+    sys.stderr = _PrefixedStream(stderr, lock)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(lambda target: _run_target(check, target, prefixed, deadline), targets))
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+    sys.exit(0 if all(status == "success" for status in statuses) else 1)
@@ -0,0 +1,72 @@
+"""
+Deferred imports for checker scripts.
+
+A heavy module imported at the top of a script is paid for on every run,
+even when the target turns out to be unreachable before it is used.
+lazy_import() returns a stand-in that imports the module on first
+attribute access instead:
+
+    from automation_lazy import available, lazy_import
+
+    smbconnection = lazy_import("impacket.smbconnection")
+    ldap3 = lazy_import("ldap3")
+    LDAP3_AVAILABLE = available("ldap3")    # checked without importing it
+
+    conn = smbconnection.SMBConnection(ip, ip)   # imported here
+
+A missing module raises ImportError at that first use, not at
+lazy_import(). Modules the warm runner has already loaded are returned as
+they are. Safe to use from automation_harness threads: the import itself
+goes through importlib, which locks per module.
+
+To see what a script's imports cost, turn on import profiling for it on
+the dashboard; its runs then start with `python -X importtime`.
+"""
+
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is needed."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module `name`, imported on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def available(name):
+    """Whether top-level package `name` can be imported, without importing it."""
+    top = name.partition(".")[0]
+    if top in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(top) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,157 @@
+"""
+Structured results for checker scripts.
+
+A script reports what it found on one final stdout line, which the executor
+parses into Execution.targets[].result (status, per-check outcomes, timings,
+flags). The dashboard can then tell a hardened target from an unreachable
+one or a crashed script without reading the output.
+
+The executor puts this directory on PYTHONPATH, so scripts simply import it:
+
+    from automation_result import Result
+
+    result = Result()
+
+    with result.check("smb_guest_access") as check:
+        ...
+        check.passed("guest session on C$")    # or .failed(...) / .skipped(...)
+
+    result.record("ldap_anonymous_bind", "failed", "bind refused")
+    result.flag("user.txt", value=flag_text, source="smb://10.0.0.5/Users")
+    result.finish("success")                   # prints the line, exits 0
+
+result.deadline is the run's time budget (see automation_deadline); a check
+that runs out of it is recorded as skipped and the rest are skipped quickly.
+
+Statuses:
+    success      the check achieved what it set out to do
+    partial      some checks succeeded, not enough for success
+    hardened     the target answered but resisted every attempt
+    unreachable  the target could not be reached at all
+    timeout      the deadline ran out before a verdict
+    error        the script itself could not do its job
+
+Check outcomes: passed, failed, skipped, error.
+"""
+
+import json
+import sys
+import time
+
+from automation_deadline import Deadline, DeadlineExceeded
+
+MARKER = "@@AUTOMATION_RESULT@@"
+VERSION = 1
+
+STATUSES = ("success", "partial", "hardened", "unreachable", "timeout", "error")
+OUTCOMES = ("passed", "failed", "skipped", "error")
+
+
+def _elapsed_ms(started):
+    return round((time.monotonic() - started) * 1000)
+
+
+class Check:
+    """One named check; use through Result.check()."""
+
+    def __init__(self, result, name):
+        self.result = result
+        self.name = name
+        self.outcome = None
+        self.details = None
+        self.started = None
+
+    def passed(self, details=None):
+        self.outcome, self.details = "passed", details
+
+    def failed(self, details=None):
+        self.outcome, self.details = "failed", details
+
+    def skipped(self, details=None):
+        self.outcome, self.details = "skipped", details
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # An exception ends this check as 'error' (or 'skipped' when the
+        # deadline ran out) and the script carries on with the next one, like
+        # the try/except around each technique
+        if exc_type is not None and issubclass(exc_type, DeadlineExceeded):
+            self.outcome, self.details = "skipped", "deadline reached"
+        elif exc_type is not None and not issubclass(exc_type, (KeyboardInterrupt, SystemExit)):
+            self.outcome, self.details = "error", f"{exc_type.__name__}: {exc}"
+        self.result.record(self.name, self.outcome or "skipped", self.details, _elapsed_ms(self.started))
+        return exc_type is not None and self.outcome in ("error", "skipped")
+
+
+class Result:
+    def __init__(self, target=None, deadline=None):
+        self.target = target
+        self.deadline = deadline or Deadline.from_env()
+        self.started = time.monotonic()
+        self.checks = []
+        self.flags = []
+        self.data = {}
+        self.emitted = False
+        self.status = None  # the emitted status
+
+    def check(self, name):
+        return Check(self, name)
+
+    def record(self, name, outcome, details=None, duration_ms=None):
+        """Add a check outcome directly (for scripts that time their own checks)."""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"outcome must be one of {', '.join(OUTCOMES)}")
+        entry = {"name": str(name), "outcome": outcome}
+        if details is not None:
+            entry["details"] = str(details)
+        if duration_ms is not None:
+            entry["durationMs"] = duration_ms
+        self.checks.append(entry)
+
+    def flag(self, name, value=None, source=None):
+        """Note a captured flag or proof file."""
+        entry = {"name": str(name)}
+        if value is not None:
+            entry["value"] = str(value)
+        if source is not None:
+            entry["source"] = str(source)
+        self.flags.append(entry)
+
+    def set(self, **data):
+        """Free-form JSON-serializable facts (counts, versions, ...)."""
+        self.data.update(data)
+
+    def emit(self, status, message=None):
+        """Print the result line. Only the first call counts."""
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        if self.emitted:
+            return
+        self.emitted = True
+        self.status = status
+
+        payload = {
+            "version": VERSION,
+            "status": status,
+            "durationMs": _elapsed_ms(self.started),
+            "checks": self.checks,
+            "flags": self.flags,
+        }
+        if self.target is not None:
+            payload["target"] = str(self.target)
+        if message is not None:
+            payload["message"] = str(message)
+        if self.data:
+            payload["data"] = self.data
+
+        sys.stdout.flush()
+        sys.stdout.write(MARKER + " " + json.dumps(payload, default=str) + "\n")
+        sys.stdout.flush()
+
+    def finish(self, status, message=None, exit_code=None):
+        """Emit the result and exit: 0 for success unless exit_code is given."""
+        self.emit(status, message)
+        sys.exit(exit_code if exit_code is not None else (0 if status == "success" else 1))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold spawn vs warm fork benchmark for the uploaded checker scripts.
+
+Starts a private fork-server, then runs every script (default: the distinct
+files in uploads/scripts) N times each way against a target IP and reports
+wall-clock latency. Scripts fail fast against an unreachable target, which is
+what we want here: the numbers isolate interpreter start-up and import cost.
+
+Usage:
+    python3 benchmark.py [--runs 10] [--target 127.0.0.1] [script.py ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(HERE, "..", "uploads", "scripts")
+
+
+def distinct_scripts():
+    seen = {}
+    for name in sorted(os.listdir(SCRIPTS_DIR)):
+        path = os.path.join(SCRIPTS_DIR, name)
+        with open(path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        seen.setdefault(digest, path)
+    return list(seen.values())
+
+
+def run_cold(script, args, timeout):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, script, *args], stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, timeout=timeout)
+    return time.perf_counter() - started
+
+
+def run_warm(socket_path, script, args, timeout):
+    started = time.perf_counter()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(socket_path)
+        conn.sendall((json.dumps({"script": script, "args": args}) + "\n").encode())
+        with conn.makefile("rb") as reader:
+            for line in reader:
+                if json.loads(line).get("event") == "exit":
+                    break
+    return time.perf_counter() - started
+
+
+def summarize(samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return statistics.mean(ms), statistics.median(ms), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scripts", nargs="*")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", default="127.0.0.1")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    scripts = [os.path.abspath(s) for s in args.scripts] or distinct_scripts()
+    socket_path = os.path.join(tempfile.mkdtemp(), "runner.sock")
+
+    server = subprocess.Popen([sys.executable, os.path.join(HERE, "forkserver.py"), "--socket", socket_path])
+    try:
+        while not os.path.exists(socket_path):
+            if server.poll() is not None:
+                sys.exit("fork-server failed to start")
+            time.sleep(0.05)
+
+        print(f"{'script':<42} {'cold mean':>10} {'cold p50':>9} {'cold p95':>9}"
+              f" {'warm mean':>10} {'warm p50':>9} {'warm p95':>9} {'speedup':>8}")
+        totals = {"cold": [], "warm": []}
+        for script in scripts:
+            cold = [run_cold(script, [args.target], args.timeout) for _ in range(args.runs)]
+            warm = [run_warm(socket_path, script, [args.target], args.timeout) for _ in range(args.runs)]
+            totals["cold"] += cold
+            totals["warm"] += warm
+
+            c, w = summarize(cold), summarize(warm)
+            print(f"{os.path.basename(script):<42} {c[0]:>8.1f}ms {c[1]:>7.1f}ms {c[2]:>7.1f}ms"
+                  f" {w[0]:>8.1f}ms {w[1]:>7.1f}ms {w[2]:>7.1f}ms {c[0] / w[0]:>7.1f}x")
+
+        c, w = summarize(totals["cold"]), summarize(totals["warm"])
+        print(f"{'ALL':<42} {c[0]:>8.1f}ms {c[1]:>7.1f}ms {c[2]:>7.1f}ms"
+              f" {w[0]:>8.1f}ms {w[1]:>7.1f}ms {w[2]:>7.1f}ms {c[0] / w[0]:>7.1f}x")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Warm Python runner (fork-server) for the script executor.
+
+Pre-imports the heavy modules checker scripts rely on, then listens on a
+Unix socket. Each connection carries one job; the server forks, and the
+forked job runs the script as __main__ with the modules already loaded, so
+targets no longer pay interpreter start-up and import time.
+
+Protocol (newline-delimited JSON over the socket):
+    client -> {"script": "/abs/path.py", "args": ["10.0.0.5"], "cwd": "...",
+               "bytecode": "/abs/cpython-311.pyc"}   # optional, see preflight.py
+    server -> {"event": "started", "pid": 1234}
+    server -> {"event": "stdout" | "stderr", "data": "..."}
+    server -> {"event": "exit", "code": 0, "signal": null}
+    client -> {"signal": 15}      # signal the job's process group
+Closing the socket from the client side kills the job.
+
+Usage:
+    python3 forkserver.py --socket /tmp/automation-runner.sock
+"""
+
+import argparse
+import builtins
+import codecs
+import importlib
+import importlib.util
+import json
+import marshal
+import os
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import time
+import traceback
+import types
+
+DEFAULT_PRELOAD = [
+    "json", "re", "socket", "ssl", "argparse", "subprocess", "tempfile",
+    "urllib.parse", "requests", "impacket.smbconnection", "ldap3",
+    "automation_result", "automation_lazy",
+]
+
+READ_SIZE = 65536
+
+
+def preload(modules):
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            # Missing optional modules just stay cold
+            pass
+    return loaded
+
+
+def load_bytecode(path):
+    """Code object from a preflight .pyc, or None when it is missing or was
+    compiled by another Python version. Scripts are stored by content hash,
+    so a .pyc never goes stale against its source."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:4] != importlib.util.MAGIC_NUMBER:
+        return None
+    try:
+        return marshal.loads(data[16:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def run_main(script, bytecode=None):
+    """Run the script as __main__, from its bytecode when that is usable."""
+    code = load_bytecode(bytecode) if bytecode else None
+    if code is None:
+        runpy.run_path(script, run_name="__main__")
+        return
+    main = types.ModuleType("__main__")
+    main.__file__ = script
+    main.__cached__ = bytecode
+    main.__builtins__ = builtins
+    sys.modules["__main__"] = main
+    exec(code, main.__dict__)
+
+
+def send(conn, message):
+    conn.sendall((json.dumps(message) + "\n").encode())
+
+
+def run_job(request, stdout_w, stderr_w):
+    """Runs in the forked job process; never returns."""
+    os.setsid()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(stdout_w, 1)
+    os.dup2(stderr_w, 2)
+    # The pipes are not ttys; flush every line so output streams live
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+
+    code = 0
+    try:
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        os.environ.update(request.get("env") or {})
+        script = request["script"]
+        sys.argv = [script] + [str(arg) for arg in request.get("args", [])]
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        run_main(script, request.get("bytecode"))
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+    os._exit(code & 0xFF)
+
+
+def handle_connection(conn):
+    """Runs in a per-connection handler process; relays job output."""
+    reader = conn.makefile("rb")
+    line = reader.readline()
+    if not line:
+        os._exit(0)
+    request = json.loads(line)
+
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        os.close(stdout_r)
+        os.close(stderr_r)
+        run_job(request, stdout_w, stderr_w)
+
+    os.close(stdout_w)
+    os.close(stderr_w)
+    send(conn, {"event": "started", "pid": pid})
+
+    sel = selectors.DefaultSelector()
+    sel.register(stdout_r, selectors.EVENT_READ, "stdout")
+    sel.register(stderr_r, selectors.EVENT_READ, "stderr")
+    sel.register(conn, selectors.EVENT_READ, "control")
+    open_pipes = 2
+    control = b""
+    # A multibyte character may be split across two reads
+    decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in ("stdout", "stderr")}
+
+    def kill(sig):
+        try:
+            os.killpg(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    while open_pipes:
+        for key, _ in sel.select():
+            if key.data == "control":
+                data = conn.recv(READ_SIZE)
+                if not data:
+                    # Client went away: nobody is left to read the result
+                    kill(signal.SIGKILL)
+                    sel.unregister(conn)
+                    continue
+                control += data
+                while b"\n" in control:
+                    message, control = control.split(b"\n", 1)
+                    sig = json.loads(message).get("signal")
+                    if sig:
+                        kill(int(sig))
+                continue
+
+            data = os.read(key.fd, READ_SIZE)
+            final = not data
+            if final:
+                sel.unregister(key.fd)
+                os.close(key.fd)
+                open_pipes -= 1
+            text = decoders[key.data].decode(data, final=final)
+            if not text:
+                continue
+            try:
+                send(conn, {"event": key.data, "data": text})
+            except OSError:
+                kill(signal.SIGKILL)
+
+    _, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status):
+        result = {"event": "exit", "code": None, "signal": signal.Signals(os.WTERMSIG(status)).name}
+    else:
+        result = {"event": "exit", "code": os.WEXITSTATUS(status), "signal": None}
+    try:
+        send(conn, result)
+    except OSError:
+        pass
+    os._exit(0)
+
+
+def reap_children(signum, frame):
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def serve(socket_path, modules):
+    started = time.monotonic()
+    loaded = preload(modules)
+    print(f"[runner] Preloaded {len(loaded)} module(s) in "
+          f"{(time.monotonic() - started) * 1000:.0f} ms: {', '.join(loaded)}", flush=True)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(128)
+
+    signal.signal(signal.SIGCHLD, reap_children)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"[runner] Listening on {socket_path}", flush=True)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except InterruptedError:
+                continue
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                try:
+                    handle_connection(conn)
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    os._exit(1)
+            conn.close()
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm Python fork-server for script execution")
+    parser.add_argument("--socket", default=os.environ.get("PYTHON_RUNNER_SOCKET", "/tmp/automation-runner.sock"))
+    parser.add_argument("--preload", default=os.environ.get("PYTHON_RUNNER_PRELOAD"),
+                        help="Comma-separated modules to import before forking")
+    args = parser.parse_args()
+
+    modules = args.preload.split(",") if args.preload else DEFAULT_PRELOAD
+    serve(args.socket, [m.strip() for m in modules if m.strip()])
+
+
+if __name__ == "__main__":
+    main()
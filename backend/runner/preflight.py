@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Upload-time preflight for a checker script.
+
+Looks at a script without running any of its code and prints one JSON
+object on stdout:
+
+    {
+      "python": "3.11.4", "cacheTag": "cpython-311",
+      "syntaxError": null | {"message": ..., "line": 12, "offset": 5},
+      "bytecode": "/abs/<cache-dir>/cpython-311.pyc" | null,
+      "imports": [{"name": "ldap3", "found": true, "optional": false,
+                   "kind": "stdlib" | "local" | "third-party"}, ...],
+      "argv": {"convention": "single" | "multi" | "harness" | "unknown",
+               "min": 1, "max": 1 | null}
+    }
+
+- Syntax: the source is compiled; with --cache-dir the bytecode is written
+  there as <cache tag>.pyc for the fork-server to run instead of the source.
+- Imports: top-level module names are looked up on this interpreter's path
+  (runner/ included), without importing them. automation_lazy.lazy_import()
+  calls count as imports. Imports guarded by `except ImportError` or by
+  available() are reported as optional; "kind" tells standard library and
+  runner/ modules from installable (third-party) ones.
+- Arguments: how many command-line arguments the script accepts, from
+  `len(sys.argv) != n` / `< n` checks, `sys.argv[...]` use, argparse
+  positionals, or automation_harness.run() (any number of targets).
+
+Usage:
+    python3 preflight.py /path/to/script.py [--cache-dir DIR]
+"""
+
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import py_compile
+import sys
+import sysconfig
+
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+
+def _is_sys_argv(node):
+    return (isinstance(node, ast.Attribute) and node.attr == "argv"
+            and isinstance(node.value, ast.Name) and node.value.id == "sys")
+
+
+def _int(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+def _guards_import_error(handler):
+    if handler.type is None:
+        return True
+    names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(name, ast.Name) and name.id in IMPORT_ERRORS for name in names)
+
+
+class Survey(ast.NodeVisitor):
+    def __init__(self):
+        self.imports = {}        # top-level module -> optional
+        self.optional_depth = 0
+        self.exact = set()       # argument counts from len(sys.argv) == / !=
+        self.at_least = []
+        self.max_index = 0
+        self.argv_slice = False
+        self.harness = False
+        self.positionals = []    # nargs of argparse positionals
+        self.guarded = set()     # modules checked with automation_lazy.available()
+
+    # --- imports
+
+    def visit_Try(self, node):
+        optional = any(_guards_import_error(handler) for handler in node.handlers)
+        self.optional_depth += optional
+        for child in node.body:
+            self.visit(child)
+        self.optional_depth -= optional
+        for child in node.handlers + node.orelse + node.finalbody:
+            self.visit(child)
+
+    visit_TryStar = visit_Try
+
+    def _add_import(self, name):
+        top = name.split(".")[0]
+        optional = self.optional_depth > 0
+        self.imports[top] = self.imports.get(top, True) and optional
+        if top == "automation_harness":
+            self.harness = True
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._add_import(alias.name)
+
+    def visit_ImportFrom(self, node):
+        if node.level == 0 and node.module:
+            self._add_import(node.module)
+
+    # --- arguments
+
+    def visit_Compare(self, node):
+        left = node.left
+        if (len(node.ops) == 1 and isinstance(left, ast.Call) and isinstance(left.func, ast.Name)
+                and left.func.id == "len" and left.args and _is_sys_argv(left.args[0])):
+            count = _int(node.comparators[0])
+            if count is not None:
+                if isinstance(node.ops[0], (ast.Eq, ast.NotEq)):
+                    self.exact.add(count - 1)
+                elif isinstance(node.ops[0], ast.Lt):      # `if len(sys.argv) < n: usage()`
+                    self.at_least.append(count - 1)
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        if _is_sys_argv(node.value):
+            index = node.slice
+            if isinstance(index, ast.Slice):
+                self.argv_slice = True
+            elif _int(index) is not None:
+                self.max_index = max(self.max_index, _int(index))
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        # automation_lazy.lazy_import("pkg.module") is an import all the same
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        if (name == "lazy_import" and node.args and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            self._add_import(node.args[0].value)
+        # ... and one checked with available() first is optional
+        if (name == "available" and node.args and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            self.guarded.add(node.args[0].value.split(".")[0])
+        if isinstance(func, ast.Attribute) and func.attr == "add_argument" and node.args:
+            first = node.args[0]
+            if isinstance(first, ast.Constant) and isinstance(first.value, str) and not first.value.startswith("-"):
+                nargs = next((kw.value for kw in node.keywords if kw.arg == "nargs"), None)
+                self.positionals.append(nargs.value if isinstance(nargs, ast.Constant) else None)
+        self.generic_visit(node)
+
+    # --- results
+
+    def argv(self):
+        if self.harness:
+            return {"convention": "harness", "min": 1, "max": None}
+
+        low, high = 0, 0
+        if len(self.exact) == 1:
+            low = high = next(iter(self.exact))
+        elif self.positionals:
+            for nargs in self.positionals:
+                if nargs in ("+", "*"):
+                    low += nargs == "+"
+                    high = None
+                elif nargs == "?":
+                    high = high if high is None else high + 1
+                else:
+                    count = nargs if isinstance(nargs, int) else 1
+                    low += count
+                    high = high if high is None else high + count
+        else:
+            low = max([self.max_index, int(self.argv_slice)] + self.at_least)
+            high = None if self.argv_slice or not self.max_index else self.max_index
+
+        if high == 1 and low <= 1:
+            convention = "single"
+        elif high is None and low >= 1:
+            convention = "multi"
+        else:
+            convention = "unknown"
+        return {"convention": convention, "min": low, "max": high}
+
+
+def _is_stdlib(name, origin):
+    if name in sys.builtin_module_names or name in getattr(sys, "stdlib_module_names", ()):
+        return True
+    # Before 3.10: anything under the standard library directory but not site-packages
+    return bool(origin) and origin.startswith(STDLIB_DIR) and "site-packages" not in origin
+
+
+def find_module(name, script_dir):
+    """(found, kind) for a top-level module name."""
+    if os.path.exists(os.path.join(script_dir, name + ".py")) or os.path.isdir(os.path.join(script_dir, name)):
+        return True, "local"
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return name in sys.builtin_module_names, "stdlib" if _is_stdlib(name, None) else "third-party"
+
+    origin = spec.origin if spec.has_location else None
+    if origin is None and spec.submodule_search_locations:
+        origin = next(iter(spec.submodule_search_locations), None)
+    if origin and os.path.dirname(os.path.abspath(origin)) == RUNNER_DIR:
+        return True, "local"
+    return True, "stdlib" if _is_stdlib(name, origin and os.path.abspath(origin)) else "third-party"
+
+
+def preflight(script, cache_dir=None):
+    report = {
+        "python": ".".join(map(str, sys.version_info[:3])),
+        "cacheTag": sys.implementation.cache_tag,
+        "syntaxError": None,
+        "bytecode": None,
+        "imports": [],
+        "argv": {"convention": "unknown", "min": 0, "max": None},
+    }
+
+    with open(script, "rb") as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source, filename=script)
+        compile(tree, script, "exec")
+    except (SyntaxError, ValueError) as exc:
+        report["syntaxError"] = {
+            "message": getattr(exc, "msg", None) or str(exc),
+            "line": getattr(exc, "lineno", None),
+            "offset": getattr(exc, "offset", None),
+        }
+        return report
+
+    if cache_dir and sys.implementation.cache_tag:
+        os.makedirs(cache_dir, exist_ok=True)
+        target = os.path.join(cache_dir, sys.implementation.cache_tag + ".pyc")
+        # Tracebacks keep pointing at the uploaded file
+        report["bytecode"] = py_compile.compile(script, cfile=target, dfile=script, doraise=True,
+                                                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+    survey = Survey()
+    survey.visit(tree)
+    script_dir = os.path.dirname(os.path.abspath(script))
+    for name, optional in sorted(survey.imports.items()):
+        found, kind = find_module(name, script_dir)
+        optional = optional or name in survey.guarded
+        report["imports"].append({"name": name, "found": found, "optional": optional, "kind": kind})
+    report["argv"] = survey.argv()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a script before it is run")
+    parser.add_argument("script", help="Path to the script")
+    parser.add_argument("--cache-dir", help="Directory to write the compiled bytecode to")
+    args = parser.parse_args()
+
+    print(json.dumps(preflight(args.script, args.cache_dir)))
+
+
+if __name__ == "__main__":
+    main()
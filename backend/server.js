@@ -10,9 +10,21 @@ import executionRoutes from './routes/executionRoutes.js';
 import UserIpMappingRoutes from './routes/UserIpMappingRoutes.js';
 import { errorHandler } from './middleware/errorHandler.js';
 import challengeRoutes from './routes/challengeRoutes.js';
+import scheduleRoutes from './routes/scheduleRoutes.js';
+import dashboardRoutes from './routes/dashboardRoutes.js';
+import { workerPool } from './services/executionService.js';
+import { startPythonRunner } from './services/pythonRunner.js';
+import callbackDispatcher from './services/callbackDispatcher.js';
+import roundScheduler from './services/roundScheduler.js';
+import { resumePendingPreflights } from './services/preflight.js';
+import { startOutputPublisher, startOutputSubscriber } from './services/outputRelay.js';
+import eventLoopMonitor from './services/eventLoopMonitor.js';
+import { metricsHandler, startMetricsServer } from './services/metrics.js';
 import dotenv from 'dotenv';
 import fs from 'fs';
+import os from 'os';
 import path from 'path';
+import cluster from 'cluster';
 import { fileURLToPath } from 'url';
 
 const __filename = fileURLToPath(import.meta.url);
@@ -24,12 +36,21 @@ connectToMongo();
 const app = express();
 const PORT = process.env.PORT || 5000;
 
+// CLUSTER_WORKERS=auto (one per core) or a count forks that many HTTP
+// processes sharing PORT. The primary then serves no HTTP and runs the
+// background services (executor, scheduler, callbacks) once.
+const CLUSTER_WORKERS = process.env.CLUSTER_WORKERS === 'auto'
+  ? os.cpus().length
+  : parseInt(process.env.CLUSTER_WORKERS, 10) || 0;
+const CLUSTER_RESTART_DELAY_MS = 1000;
+const METRICS_PORT = parseInt(process.env.METRICS_PORT, 10) || 0;
+
 // Ensure upload directories exist
 const uploadsDir = path.join(__dirname, 'uploads');
 const scriptsDir = path.join(uploadsDir, 'scripts');
 
 if (!fs.existsSync(uploadsDir)) {
-  fs.mkdirSync(uploadsDir);
+  fs.mkdirSync(uploadsDir, { recursive: true });
   console.log('Uploads directory created');
 }
 
@@ -48,16 +69,89 @@ app.get('/', (req, res) => {
   res.json({ message: 'Infrastructure Script Automation API is running' });
 });
 
+// Liveness plus this process's event-loop lag; ?reset=1 starts a new window
+app.get('/api/health', (req, res) => {
+  const eventLoop = eventLoopMonitor.stats();
+  if (req.query.reset) {
+    eventLoopMonitor.reset();
+  }
+  res.json({ success: true, pid: process.pid, uptimeSeconds: Math.round(process.uptime()), eventLoop });
+});
+
+// Prometheus metrics of this process (in cluster mode the executor's live
+// in the primary, on METRICS_PORT)
+app.get('/metrics', metricsHandler);
+
 app.use('/api/auth', userRoutes);
 app.use('/api/scripts', scriptRoutes);
 app.use('/api/executions', executionRoutes);
 app.use('/api/userIpMapping', UserIpMappingRoutes);
 app.use('/api/challenges', challengeRoutes);
+app.use('/api/schedules', scheduleRoutes);
+app.use('/api/dashboard', dashboardRoutes);
 
 // Global error handler
 app.use(errorHandler);
 
-app.listen(PORT, () => {
-  console.log(`Server running on port ${PORT}`);
-  console.log(`Script uploads directory: ${scriptsDir}`);
-});
+const startHttp = () => {
+  app.listen(PORT, () => {
+    console.log(`Server running on port ${PORT} (pid ${process.pid})`);
+    console.log(`Script uploads directory: ${scriptsDir}`);
+  });
+};
+
+const startBackground = () => {
+  // Background executor for queued script runs (warm Python runner first, if
+  // enabled). With EXECUTOR_EMBEDDED_WORKER=false only `node worker.js`
+  // processes run scripts.
+  if (process.env.EXECUTOR_EMBEDDED_WORKER !== 'false') {
+    startPythonRunner()
+      .then(() => workerPool.start())
+      .catch(err => console.error('Failed to start worker pool:', err));
+  }
+
+  // Recurring rounds persisted in the schedules collection
+  roundScheduler.start()
+    .catch(err => console.error('Failed to start round scheduler:', err));
+
+  // Script checks interrupted by a restart
+  resumePendingPreflights()
+    .catch(err => console.error('Failed to resume script preflights:', err));
+
+  // Challenge-solve callbacks left in the outbox by a previous run are redelivered
+  callbackDispatcher.start()
+    .catch(err => console.error('Failed to start callback dispatcher:', err));
+};
+
+if (CLUSTER_WORKERS < 1) {
+  startHttp();
+
+  // Live output of runs on worker processes
+  startOutputSubscriber(workerPool.workerId)
+    .catch(err => console.error('Failed to start output relay:', err));
+
+  startBackground();
+} else if (cluster.isPrimary) {
+  // SSE clients live in the HTTP workers, so local runs go through the relay
+  startOutputPublisher(workerPool.workerId);
+  startBackground();
+  if (METRICS_PORT) {
+    startMetricsServer(METRICS_PORT);
+  }
+
+  for (let i = 0; i < CLUSTER_WORKERS; i++) cluster.fork();
+  console.log(`[cluster] Primary ${process.pid} started ${CLUSTER_WORKERS} HTTP worker(s)`);
+
+  cluster.on('exit', (worker, code, signal) => {
+    console.error(`[cluster] HTTP worker ${worker.process.pid} exited (${signal || code}); restarting`);
+    setTimeout(() => cluster.fork(), CLUSTER_RESTART_DELAY_MS);
+  });
+} else {
+  startHttp();
+
+  // Cancellations made here reach the other workers' SSE clients, and runs
+  // in the primary or worker.js processes reach ours
+  startOutputPublisher(workerPool.workerId);
+  startOutputSubscriber(workerPool.workerId)
+    .catch(err => console.error('Failed to start output relay:', err));
+}
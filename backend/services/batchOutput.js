@@ -0,0 +1,102 @@
+import { EventEmitter } from 'events';
+
+import outputBus from './outputBus.js';
+import { createResultScanner } from './scriptResult.js';
+
+const MAX_LINE_BYTES = 256 * 1024;
+const PREFIX = /^\[([^\]\s]+)\] /;
+
+// One output stream (stdout or stderr) of a batch run. Looks like a capture
+// to runProcess: write() returns false while any row's spill is congested
+// and 'drain' follows once all of them have caught up.
+class DemuxStream extends EventEmitter {
+  constructor(batch, name) {
+    super();
+    this.batch = batch;
+    this.name = name;
+    this.partial = '';
+    this.waiting = 0;
+  }
+
+  write(data) {
+    const lines = (this.partial + data).split('\n');
+    this.partial = lines.pop();
+    if (this.partial.length > MAX_LINE_BYTES) {
+      lines.push(this.partial);
+      this.partial = '';
+    }
+
+    let ok = true;
+    for (const line of lines) {
+      ok = this.batch.route(this, `${line}\n`) && ok;
+    }
+    return ok;
+  }
+
+  end() {
+    if (this.partial) {
+      this.batch.route(this, this.partial);
+      this.partial = '';
+    }
+  }
+
+  // A row's capture could not take more; hold the child until it drains
+  hold(capture) {
+    this.waiting += 1;
+    capture.once('drain', () => {
+      this.waiting -= 1;
+      if (this.waiting === 0) this.emit('drain');
+    });
+  }
+}
+
+// Splits the interleaved output of one batch run (runner/automation_harness.py)
+// back into its target rows. Lines prefixed "[<ip>] " belong to that IP's
+// row; anything else (harness set-up, a batch of one) goes to every row.
+// Live output goes through publish(position, stream, data), position being
+// the row's index in job.batch.
+export class BatchOutput {
+  constructor(job, createCapture, publish = (position, stream, data) =>
+    outputBus.chunk(job.execution, job.batch[position].target, stream, data)) {
+    this.job = job;
+    this.publish = publish;
+    this.rows = new Map(job.batch.map(({ target, ip }, position) => [ip, {
+      target,
+      ip,
+      position,
+      capture: { stdout: createCapture(job, 'stdout', target), stderr: createCapture(job, 'stderr', target) },
+      scanner: createResultScanner()
+    }]));
+    this.streams = { stdout: new DemuxStream(this, 'stdout'), stderr: new DemuxStream(this, 'stderr') };
+  }
+
+  route(stream, line) {
+    const match = PREFIX.exec(line);
+    const row = match && this.rows.get(match[1]);
+    const text = row ? line.slice(match[0].length) : line;
+
+    let ok = true;
+    for (const destination of row ? [row] : this.rows.values()) {
+      if (stream.name === 'stdout') destination.scanner.push(text);
+      this.publish(destination.position, stream.name, text);
+      if (!destination.capture[stream.name].write(text)) {
+        stream.hold(destination.capture[stream.name]);
+        ok = false;
+      }
+    }
+    return ok;
+  }
+
+  // Per row: { target, ip, stdout, stderr, line } once the child has exited
+  async finish() {
+    this.streams.stdout.end();
+    this.streams.stderr.end();
+    return Promise.all([...this.rows.values()].map(async row => ({
+      target: row.target,
+      ip: row.ip,
+      stdout: await row.capture.stdout.finish(),
+      stderr: await row.capture.stderr.finish(),
+      line: row.scanner.line()
+    })));
+  }
+}
@@ -0,0 +1,243 @@
+import os from 'os';
+import http from 'http';
+import https from 'https';
+import axios from 'axios';
+import dotenv from 'dotenv';
+
+import Callback from '../models/Callback.js';
+import resultWriter from './resultWriter.js';
+import metrics, { LATENCY_BUCKETS } from './metrics.js';
+
+dotenv.config();
+
+const MAX_CONCURRENCY = parseInt(process.env.CALLBACK_MAX_CONCURRENCY, 10) || 8;
+const TIMEOUT_MS = parseInt(process.env.CALLBACK_TIMEOUT_MS, 10) || 5000;
+const MAX_ATTEMPTS = parseInt(process.env.CALLBACK_MAX_ATTEMPTS, 10) || 6;
+const RETRY_BASE_MS = parseInt(process.env.CALLBACK_RETRY_BASE_MS, 10) || 1000;
+const RETRY_MAX_MS = parseInt(process.env.CALLBACK_RETRY_MAX_MS, 10) || 5 * 60 * 1000;
+const POLL_INTERVAL_MS = parseInt(process.env.CALLBACK_POLL_INTERVAL_MS, 10) || 1000;
+// How long a claimed delivery is ours before another dispatcher may take it
+// over; well above CALLBACK_TIMEOUT_MS, so only a dispatcher that died loses it
+const LEASE_MS = parseInt(process.env.CALLBACK_LEASE_MS, 10) || 60 * 1000;
+
+const callbackSeconds = metrics.histogram(
+  'automation_callback_seconds',
+  'Latency of challenge callback requests by outcome (delivered, retry, failed)',
+  ['outcome'],
+  LATENCY_BUCKETS
+);
+
+// Network errors, timeouts, 429 and 5xx are worth another try; any other
+// status is the scoring server's final answer.
+const isRetryable = (err) => {
+  const status = err.response?.status;
+  return !status || status === 429 || status >= 500;
+};
+
+// Exponential backoff with full jitter
+const retryDelay = (attempts) =>
+  Math.round(Math.random() * Math.min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** (attempts - 1)));
+
+// Delivers challenge-solve callbacks from the Callback outbox over pooled
+// keep-alive connections, at most `maxConcurrency` at a time. A claimed
+// callback carries a lease; one whose lease ran out belongs to a dispatcher
+// that died mid-delivery and is claimed again, so a restart (or a second
+// dispatcher) never repeats a delivery that is still in progress.
+export class CallbackDispatcher {
+  constructor({
+    baseUrl = process.env.CHALLENGE_BASE_URL,
+    maxConcurrency = MAX_CONCURRENCY,
+    timeout = TIMEOUT_MS,
+    maxAttempts = MAX_ATTEMPTS,
+    pollInterval = POLL_INTERVAL_MS,
+    leaseMs = LEASE_MS
+  } = {}) {
+    this.baseUrl = baseUrl;
+    this.maxConcurrency = maxConcurrency;
+    this.maxAttempts = maxAttempts;
+    this.pollInterval = pollInterval;
+    this.leaseMs = leaseMs;
+    this.owner = `${os.hostname()}:${process.pid}:${Math.random().toString(36).slice(2, 8)}`;
+
+    this.client = axios.create({
+      timeout,
+      httpAgent: new http.Agent({ keepAlive: true, maxSockets: maxConcurrency }),
+      httpsAgent: new https.Agent({ keepAlive: true, maxSockets: maxConcurrency })
+    });
+
+    this.inFlight = 0;
+    this.filling = false;
+    this.refill = false;
+    this.timer = null;
+  }
+
+  async start() {
+    // Deliveries from before leases existed have no owner to finish them
+    const { modifiedCount } = await Callback.updateMany(
+      { status: 'delivering', leaseOwner: { $exists: false } },
+      { $set: { leaseExpiresAt: new Date(0) } }
+    );
+    if (modifiedCount) {
+      console.log(`[callbacks] Re-queued ${modifiedCount} interrupted callback(s)`);
+    }
+
+    this.timer = setInterval(() => this.fill(), this.pollInterval);
+    this.timer.unref();
+    this.fill();
+  }
+
+  stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+  }
+
+  // Record that `job` solved its challenge. Repeats for the same
+  // (execution, challenge, user) join the existing delivery instead of
+  // calling the scoring server again.
+  async enqueue(script, job) {
+    if (!script.challenge || !job.user) return;
+    if (!this.baseUrl) {
+      console.error('[callbacks] CHALLENGE_BASE_URL is not set; skipping challenge callback');
+      return;
+    }
+
+    const key = { execution: job.execution, challenge: script.challenge, user: job.user };
+    const update = {
+      $addToSet: { targets: job.target },
+      $setOnInsert: { status: 'pending', attempts: 0, nextAttemptAt: new Date() }
+    };
+
+    let callback;
+    try {
+      callback = await Callback.findOneAndUpdate(key, update, { upsert: true, new: true });
+    } catch (err) {
+      // Two targets of the same team raced to create the entry; join the winner
+      if (err.code !== 11000) throw err;
+      callback = await Callback.findOneAndUpdate(key, update, { new: true });
+    }
+
+    if (callback.status === 'delivered' || callback.status === 'failed') {
+      // Already answered earlier in this round
+      await this.applyResponse(callback, [job.target]);
+    } else {
+      this.notify();
+    }
+  }
+
+  // Only a started dispatcher delivers; elsewhere (e.g. worker processes)
+  // the callback waits in the outbox for the dispatcher's next poll
+  notify() {
+    if (!this.timer) return;
+    setImmediate(() => this.fill());
+  }
+
+  // Next due callback, or one whose dispatcher stopped mid-delivery
+  claim() {
+    const now = new Date();
+    return Callback.findOneAndUpdate(
+      {
+        $or: [
+          { status: 'pending', nextAttemptAt: { $lte: now } },
+          { status: 'delivering', leaseExpiresAt: { $lt: now } }
+        ]
+      },
+      {
+        $set: { status: 'delivering', leaseOwner: this.owner, leaseExpiresAt: new Date(now.getTime() + this.leaseMs) },
+        $inc: { attempts: 1 }
+      },
+      { sort: { nextAttemptAt: 1 }, new: true }
+    );
+  }
+
+  async fill() {
+    if (this.filling) {
+      this.refill = true;
+      return;
+    }
+    this.filling = true;
+
+    try {
+      do {
+        this.refill = false;
+        while (this.inFlight < this.maxConcurrency) {
+          const callback = await this.claim();
+          if (!callback) break;
+          this.launch(callback);
+        }
+      } while (this.refill && this.inFlight < this.maxConcurrency);
+    } catch (err) {
+      console.error('[callbacks] Failed to claim callback:', err.message);
+    } finally {
+      this.filling = false;
+    }
+  }
+
+  launch(callback) {
+    this.inFlight += 1;
+    this.deliver(callback)
+      .catch(err => console.error(`[callbacks] Callback ${callback._id} crashed:`, err))
+      .finally(() => {
+        this.inFlight -= 1;
+        this.fill();
+      });
+  }
+
+  async deliver(callback) {
+    const url = `${this.baseUrl}/${callback.challenge}/${callback.user}`;
+    const answered = callbackSeconds.startTimer();
+
+    try {
+      const response = await this.client.get(url);
+      answered({ outcome: 'delivered' });
+      console.log(`[callbacks] Challenge API Response (${callback.challenge}/${callback.user}):`, response.data);
+      await this.settle(callback, 'delivered', {
+        statusCode: response.status,
+        message: response.data?.message || 'Challenge completed successfully',
+        success: true
+      });
+    } catch (err) {
+      const failure = {
+        statusCode: err.response?.status || 500,
+        message: err.message || 'Challenge API failed',
+        success: false
+      };
+
+      const retry = isRetryable(err) && callback.attempts < this.maxAttempts;
+      answered({ outcome: retry ? 'retry' : 'failed' });
+      if (retry) {
+        const delay = retryDelay(callback.attempts);
+        console.error(`[callbacks] Challenge API Error (${callback.challenge}/${callback.user}), attempt ${callback.attempts}; retrying in ${delay}ms:`, err.message);
+        await Callback.updateOne(
+          { _id: callback._id, status: 'delivering', leaseOwner: this.owner },
+          {
+            $set: { status: 'pending', lastError: err.message, nextAttemptAt: new Date(Date.now() + delay) },
+            $unset: { leaseOwner: 1, leaseExpiresAt: 1 }
+          }
+        );
+        return;
+      }
+
+      console.error(`[callbacks] Challenge API Error (${callback.challenge}/${callback.user}), giving up:`, err.message);
+      await this.settle(callback, 'failed', failure, err.message);
+    }
+  }
+
+  // Store the final answer and copy it onto every target row that joined
+  async settle(callback, status, response, lastError) {
+    const settled = await Callback.findOneAndUpdate(
+      { _id: callback._id },
+      { $set: { status, response, lastError, deliveredAt: new Date() }, $unset: { leaseOwner: 1, leaseExpiresAt: 1 } },
+      { new: true }
+    );
+    await this.applyResponse(settled, settled.targets);
+  }
+
+  applyResponse(callback, targets) {
+    const { statusCode, message } = callback.response;
+    return Promise.all(targets.map(target =>
+      resultWriter.write(callback.execution, target, { challengeResponse: { statusCode, message } })
+    ));
+  }
+}
+
+export default new CallbackDispatcher();
@@ -0,0 +1,204 @@
+// Everything the dashboard shows, in one response. Execution statistics --
+// status counts, success rates overall, per challenge and per team, and the
+// latest runs -- come from a single $facet aggregation; the user and script
+// counts and the import profiles are read alongside it. The result is kept
+// in memory and marked stale when an execution finishes (outputBus relays
+// that from every process). A stale summary is recomputed at most once per
+// DASHBOARD_REFRESH_MS, so a burst of finishing runs costs one aggregation,
+// not one each; DASHBOARD_CACHE_TTL_MS bounds how long new runs, users and
+// uploads can go unseen otherwise.
+import dotenv from 'dotenv';
+
+import Execution from '../models/Execution.js';
+import Script from '../models/Script.js';
+import User from '../models/User.js';
+import outputBus, { EXECUTION_DONE } from './outputBus.js';
+import { importProfiles } from './importProfile.js';
+
+dotenv.config();
+
+const CACHE_TTL_MS = parseInt(process.env.DASHBOARD_CACHE_TTL_MS, 10) || 30 * 1000;
+const REFRESH_MS = parseInt(process.env.DASHBOARD_REFRESH_MS, 10) || 5 * 1000;
+const RECENT_EXECUTIONS = 4;
+const BT = process.env.BT;
+
+// Target rows that ran to an outcome; pending and cancelled rows don't count
+const FINISHED = ['completed', 'failed', 'timeout'];
+
+const finishedTargets = [
+  { $unwind: '$targets' },
+  { $match: { 'targets.status': { $in: FINISHED } } }
+];
+
+// Runs and successful runs per `_id`, plus any extra accumulators
+const successRate = (_id, accumulators = {}) => [
+  {
+    $group: {
+      _id,
+      ...accumulators,
+      runs: { $sum: 1 },
+      succeeded: { $sum: { $cond: [{ $eq: ['$targets.status', 'completed'] }, 1, 0] } }
+    }
+  },
+  { $addFields: { successRate: { $divide: ['$succeeded', '$runs'] } } }
+];
+
+const userLookup = (localField) => ({
+  $lookup: { from: User.collection.name, localField, foreignField: '_id', as: 'user' }
+});
+
+const PIPELINE = [
+  // Only what the facets read; output and results stay on disk
+  {
+    $project: {
+      scriptName: 1,
+      status: 1,
+      startedAt: 1,
+      createdAt: 1,
+      challenge: 1,
+      'targets.user': 1,
+      'targets.ip': 1,
+      'targets.ips': 1,
+      'targets.status': 1
+    }
+  },
+  {
+    $facet: {
+      statuses: [
+        { $group: { _id: '$status', count: { $sum: 1 } } }
+      ],
+      overall: [
+        ...finishedTargets,
+        ...successRate(null)
+      ],
+      challenges: [
+        ...finishedTargets,
+        ...successRate('$challenge.id', { name: { $first: '$challenge.name' } }),
+        { $sort: { runs: -1, _id: 1 } }
+      ],
+      teams: [
+        ...finishedTargets,
+        ...successRate('$targets.user'),
+        userLookup('_id'),
+        {
+          $project: {
+            runs: 1,
+            succeeded: 1,
+            successRate: 1,
+            email: { $arrayElemAt: ['$user.email', 0] },
+            name: { $arrayElemAt: ['$user.name', 0] }
+          }
+        },
+        { $sort: { runs: -1, _id: 1 } }
+      ],
+      recent: [
+        { $sort: { createdAt: -1, _id: -1 } },
+        { $limit: RECENT_EXECUTIONS },
+        { $addFields: { target: { $arrayElemAt: ['$targets', 0] } } },
+        userLookup('target.user'),
+        {
+          $project: {
+            scriptName: 1,
+            status: 1,
+            startedAt: 1,
+            // all-ips and batch rows only carry `ips`
+            ip: {
+              $ifNull: [
+                '$target.ip',
+                {
+                  $reduce: {
+                    input: { $ifNull: ['$target.ips', []] },
+                    initialValue: null,
+                    in: { $cond: [{ $eq: ['$$value', null] }, '$$this', { $concat: ['$$value', ', ', '$$this'] }] }
+                  }
+                }
+              ]
+            },
+            email: { $arrayElemAt: ['$user.email', 0] }
+          }
+        }
+      ]
+    }
+  }
+];
+
+const rate = ({ runs = 0, succeeded = 0, successRate: value = null } = {}) => ({ runs, succeeded, successRate: value });
+
+const compute = async () => {
+  const [[facets], users, scripts, profiles] = await Promise.all([
+    Execution.aggregate(PIPELINE),
+    User.countDocuments({ role: BT }),
+    Script.countDocuments(),
+    importProfiles()
+  ]);
+
+  const statuses = Object.fromEntries(facets.statuses.map(entry => [entry._id, entry.count]));
+  return {
+    generatedAt: new Date(),
+    counts: {
+      users,
+      scripts,
+      executions: facets.statuses.reduce((sum, entry) => sum + entry.count, 0)
+    },
+    statuses,
+    overall: rate(facets.overall[0]),
+    challenges: facets.challenges.map(entry => ({ id: entry._id, name: entry.name || 'No challenge', ...rate(entry) })),
+    teams: facets.teams.map(entry => ({ id: entry._id, email: entry.email, name: entry.name, ...rate(entry) })),
+    recentExecutions: facets.recent.map(entry => ({
+      id: entry._id,
+      scriptName: entry.scriptName,
+      status: entry.status,
+      startedAt: entry.startedAt,
+      ip: entry.ip,
+      email: entry.email
+    })),
+    importProfiles: profiles
+  };
+};
+
+class DashboardSummary {
+  constructor() {
+    this.value = null;
+    this.computedAt = 0;
+    this.pending = null;
+    this.stale = false;
+    outputBus.on(EXECUTION_DONE, () => this.invalidate());
+  }
+
+  fresh() {
+    const age = Date.now() - this.computedAt;
+    return this.value && age < CACHE_TTL_MS && !(this.stale && age >= REFRESH_MS);
+  }
+
+  // Cached summary. Only one computation runs at a time; requests arriving
+  // meanwhile wait for it
+  async get() {
+    if (this.fresh()) return this.value;
+
+    if (!this.pending) {
+      const startedAt = Date.now();
+      // Executions finishing from here on mark the new summary stale again
+      this.stale = false;
+      const pending = compute()
+        .then((value) => {
+          this.value = value;
+          this.computedAt = startedAt;
+          return value;
+        }, (error) => {
+          this.stale = true;
+          throw error;
+        })
+        .finally(() => {
+          this.pending = null;
+        });
+      this.pending = pending;
+    }
+    return this.pending;
+  }
+
+  invalidate() {
+    this.stale = true;
+  }
+}
+
+export default new DashboardSummary();
@@ -0,0 +1,41 @@
+import { monitorEventLoopDelay } from 'perf_hooks';
+
+const RESOLUTION_MS = 10;
+const WINDOW_MS = parseInt(process.env.EVENT_LOOP_WINDOW_MS, 10) || 60000;
+const round = (ms) => Math.round(ms * 100) / 100;
+
+// Event-loop lag of this process: how late timers fire because something
+// kept the loop busy (bcrypt on the request path, a big JSON.stringify, ...).
+// Sampled continuously and reported over a window that restarts every
+// WINDOW_MS, so a storm shows up in the numbers and later ages out of them.
+class EventLoopMonitor {
+  constructor(windowMs = WINDOW_MS) {
+    this.histogram = monitorEventLoopDelay({ resolution: RESOLUTION_MS });
+    this.histogram.enable();
+    this.since = new Date();
+    setInterval(() => this.reset(), windowMs).unref();
+  }
+
+  // Lag since the window started, in milliseconds. The sampling
+  // resolution is subtracted, so an idle loop reads close to zero.
+  stats() {
+    const { histogram } = this;
+    const lag = (ns) => (histogram.count ? round(Math.max(0, ns / 1e6 - RESOLUTION_MS)) : 0);
+    return {
+      pid: process.pid,
+      since: this.since,
+      samples: histogram.count,
+      meanMs: lag(histogram.mean),
+      p50Ms: lag(histogram.percentile(50)),
+      p99Ms: lag(histogram.percentile(99)),
+      maxMs: lag(histogram.max)
+    };
+  }
+
+  reset() {
+    this.histogram.reset();
+    this.since = new Date();
+  }
+}
+
+export default new EventLoopMonitor();
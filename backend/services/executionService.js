@@ -0,0 +1,572 @@
+import fs from 'fs';
+import path from 'path';
+import { ChildProcess, spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+import dotenv from 'dotenv';
+
+import Script from '../models/Script.js';
+import Execution from '../models/Execution.js';
+import Challenge from '../models/challenge.js';
+import Job from '../models/Job.js';
+import { WorkerPool } from './workerPool.js';
+import outputBus from './outputBus.js';
+import resultWriter from './resultWriter.js';
+import callbackDispatcher from './callbackDispatcher.js';
+import { OutputCapture } from './outputCapture.js';
+import { BatchOutput } from './batchOutput.js';
+import { PYTHON, isWarmRunnerReady, pythonEnv, runWarm } from './pythonRunner.js';
+import metrics, { LATENCY_BUCKETS, mongoWriteSeconds } from './metrics.js';
+import { createResultScanner, targetResult } from './scriptResult.js';
+import { bytecodePath, preflightProblems } from './preflight.js';
+import { pythonFor } from './venvCache.js';
+import { ImportTimeFilter, recordImportProfile } from './importProfile.js';
+import * as resultCache from './resultCache.js';
+import sharedRuns, { flightKey } from './sharedRuns.js';
+
+dotenv.config();
+
+const DEFAULT_TIMEOUT_SECONDS = parseInt(process.env.EXECUTOR_DEFAULT_TIMEOUT_SECONDS, 10) || 300;
+const KILL_GRACE_MS = parseInt(process.env.EXECUTOR_KILL_GRACE_MS, 10) || 5000;
+const BATCH_SIZE = parseInt(process.env.EXECUTOR_BATCH_SIZE, 10) || 16;
+const DEADLINE_MARGIN = 0.1;
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const spawnSeconds = metrics.histogram(
+  'automation_spawn_seconds',
+  'Time from launching a script until its process is running, by runner',
+  ['runner'],
+  LATENCY_BUCKETS
+);
+const scriptDurationSeconds = metrics.histogram(
+  'automation_script_duration_seconds',
+  'Wall-clock run time of a script against one target',
+  ['script']
+);
+const scriptExits = metrics.counter(
+  'automation_script_exits_total',
+  'Finished script runs by exit code (or timeout / cancelled)',
+  ['script', 'code']
+);
+
+export const resolveScriptPath = (script) => path.resolve(__dirname, '../', script.filePath);
+
+export const formatDuration = (ms) =>
+  `${Math.floor(ms / 60000)}m ${Math.floor((ms % 60000) / 1000)}s`;
+
+// Expand request targets into Execution.targets rows according to the
+// script's argument mode: one row per team for 'all-ips', otherwise one row
+// per IP ('batch' runs several rows in one process but reports per row).
+export const buildTargetRows = (script, targets) => {
+  if (script.argMode === 'all-ips') {
+    return targets.map(target => ({
+      user: target.userId,
+      email: target.userEmail,
+      ips: target.ips,
+      description: target.description,
+      status: 'pending'
+    }));
+  }
+
+  return targets.flatMap(target => target.ips.map(ip => ({
+    user: target.userId,
+    email: target.userEmail,
+    ip,
+    ips: [ip],
+    description: target.description,
+    status: 'pending'
+  })));
+};
+
+// The tighter of the per-run and per-script budgets, or the global default
+export const resolveTimeoutMs = (script, timeoutSeconds) => {
+  const budgets = [timeoutSeconds, script.timeoutSeconds].filter(value => value > 0);
+  return (budgets.length ? Math.min(...budgets) : DEFAULT_TIMEOUT_SECONDS) * 1000;
+};
+
+// 'batch' scripts: each team's rows in groups of up to BATCH_SIZE IPs, one
+// job (and one interpreter) per group
+const batchRuns = (rows) => {
+  const byUser = new Map();
+  for (const row of rows) {
+    const key = String(row.user);
+    if (!byUser.has(key)) byUser.set(key, []);
+    byUser.get(key).push(row);
+  }
+
+  const runs = [];
+  for (const teamRows of byUser.values()) {
+    for (let i = 0; i < teamRows.length; i += BATCH_SIZE) {
+      const group = teamRows.slice(i, i + BATCH_SIZE);
+      runs.push({
+        target: group[0]._id,
+        batch: group.map(row => ({ target: row._id, ip: row.ip })),
+        user: group[0].user,
+        args: group.map(row => row.ip)
+      });
+    }
+  }
+  return runs;
+};
+
+// Create the Execution record and one queued job per target row (per group
+// of rows for 'batch' scripts). Returns
+// immediately; the worker pool runs the jobs in the background. With
+// `spreadMs` the jobs' start times are staggered evenly across that window.
+// Rows with a cached result (scripts with resultCacheSeconds) are filled in
+// from the cache and get no job, unless `force` is set.
+export const enqueueExecution = async (script, targets, { timeoutSeconds, spreadMs = 0, schedule, force = false } = {}) => {
+  const challenge = script.challenge
+    ? await Challenge.findById(script.challenge).select('name').lean()
+    : null;
+
+  const rows = buildTargetRows(script, targets);
+  const hits = force ? new Map() : await resultCache.lookup(script, rows);
+  hits.forEach((entry, index) => Object.assign(rows[index], resultCache.cachedRow(entry)));
+
+  const execution = new Execution({
+    script: script._id,
+    scriptName: script.name,
+    challenge: challenge ? { id: challenge._id, name: challenge.name } : undefined,
+    schedule,
+    status: 'running',
+    timeoutSeconds,
+    targets: rows,
+    startedAt: new Date()
+  });
+  const timeoutMs = resolveTimeoutMs(script, timeoutSeconds);
+
+  await execution.save();
+
+  const pending = execution.targets.filter(row => row.status === 'pending');
+  const runs = script.argMode === 'batch'
+    ? batchRuns(pending)
+    : pending.map(row => ({ target: row._id, user: row.user, ip: row.ip, args: row.ips }));
+
+  const now = Date.now();
+  const step = runs.length > 1 ? spreadMs / runs.length : 0;
+  const jobs = runs.map((run, index) => ({
+    ...run,
+    execution: execution._id,
+    script: script._id,
+    challenge: script.challenge,
+    weight: script.weight,
+    scriptLimit: script.maxConcurrency,
+    flightKey: flightKey(script, run.args) || undefined,
+    force: force || undefined,
+    timeoutMs,
+    runAfter: new Date(now + Math.round(index * step))
+  }));
+
+  if (jobs.length === 0) {
+    // Everything came from the cache
+    await finalizeExecution(execution._id);
+    return { execution, jobCount: 0, cachedCount: hits.size };
+  }
+
+  await Job.insertMany(jobs);
+
+  workerPool.notify();
+
+  return { execution, jobCount: jobs.length, cachedCount: hits.size };
+};
+
+// A submission the caller got wrong; carries the HTTP status to answer with
+export class ExecutionRequestError extends Error {
+  constructor(statusCode, message, details = {}) {
+    super(message);
+    this.statusCode = statusCode;
+    this.details = details;
+  }
+}
+
+// Validate a run request and queue it. Shared by every route that starts
+// executions, so none of them has to go back through HTTP.
+export const submitExecution = async ({ scriptId, targets, timeoutSeconds, force }) => {
+  if (!Array.isArray(targets) || targets.length === 0 || targets.some(target => !target.ips?.length)) {
+    throw new ExecutionRequestError(400, 'At least one target with IPs is required');
+  }
+
+  if (timeoutSeconds !== undefined && !(Number(timeoutSeconds) > 0)) {
+    throw new ExecutionRequestError(400, 'timeoutSeconds must be a positive number');
+  }
+
+  const script = await Script.findById(scriptId);
+  if (!script) {
+    throw new ExecutionRequestError(404, 'Script not found');
+  }
+
+  const filePath = resolveScriptPath(script);
+  if (!fs.existsSync(filePath)) {
+    throw new ExecutionRequestError(404, 'Script file not found', { path: filePath });
+  }
+
+  // Found broken at upload time; don't start a process per target to learn it again
+  const problems = preflightProblems(script, targets);
+  if (problems.length) {
+    throw new ExecutionRequestError(422, 'Script failed preflight', { problems });
+  }
+
+  const { execution, jobCount, cachedCount } = await enqueueExecution(script, targets, {
+    timeoutSeconds: timeoutSeconds && Number(timeoutSeconds),
+    force: force === true || force === 'true'
+  });
+
+  return {
+    execution,
+    details: {
+      totalTargets: targets.length,
+      totalIPs: targets.reduce((sum, target) => sum + target.ips.length, 0),
+      queuedJobs: jobCount,
+      cachedTargets: cachedCount
+    }
+  };
+};
+
+// Seconds a script may plan with (runner/automation_deadline.py): a margin
+// under its timeout so it can still report a result before being stopped
+const deadlineSeconds = (timeoutMs) => Math.max(1, Math.floor((timeoutMs * (1 - DEADLINE_MARGIN)) / 1000));
+
+// Python scripts go through the warm fork-server when it is up, unless they
+// have their own virtualenv (`python`), whose interpreter is spawned
+// instead, or their imports are being profiled, which needs a fresh
+// interpreter. Spawned children lead their own process group so the whole
+// tree can be signalled.
+const launchProcess = (script, args, { timeoutMs, python, profileImports } = {}) => {
+  const filePath = resolveScriptPath(script);
+  const deadline = timeoutMs ? { AUTOMATION_DEADLINE_SECONDS: String(deadlineSeconds(timeoutMs)) } : {};
+
+  if (script.language.toLowerCase() !== 'python') {
+    return spawn('bash', [filePath, ...args], { detached: true, env: { ...process.env, ...deadline } });
+  }
+  if (python || profileImports || !isWarmRunnerReady()) {
+    const flags = profileImports ? ['-X', 'importtime'] : [];
+    return spawn(python || PYTHON, [...flags, filePath, ...args], { detached: true, env: { ...pythonEnv(), ...deadline } });
+  }
+  return runWarm(filePath, args, { env: deadline, bytecode: bytecodePath(script) });
+};
+
+// Signal the child's whole process group (warm runs are group-killed by the runner)
+const signalGroup = (child, signal) => {
+  if (child instanceof ChildProcess && child.pid) {
+    try {
+      process.kill(-child.pid, signal);
+      return;
+    } catch (err) {
+      if (err.code === 'ESRCH') return;
+    }
+  }
+  child.kill(signal);
+};
+
+// Run a script to completion, or stop it (SIGTERM, then SIGKILL after a grace
+// period) when its wall-clock budget runs out or `signal` is aborted. Output
+// goes into bounded captures; a congested spill pauses the child's stream.
+const runProcess = (script, args, { onData = () => {}, timeoutMs, signal, capture, python, importTimes } = {}) => new Promise((resolve) => {
+  const spawned = spawnSeconds.startTimer();
+  const child = launchProcess(script, args, { timeoutMs, python, profileImports: Boolean(importTimes) });
+  child.once('spawn', () => spawned({ runner: child instanceof ChildProcess ? 'cold' : 'warm' }));
+
+  // Import-time lines are taken out of stderr before anything else sees it
+  const streams = { stdout: child.stdout, stderr: child.stderr };
+  let filtered = Promise.resolve();
+  if (importTimes) {
+    child.stderr.setEncoding('utf8');
+    streams.stderr = child.stderr.pipe(importTimes);
+    filtered = new Promise(done => importTimes.once('end', done));
+  }
+
+  let reason = null;
+  let killTimer = null;
+
+  const stop = (why) => {
+    if (reason) return;
+    reason = why;
+    signalGroup(child, 'SIGTERM');
+    killTimer = setTimeout(() => signalGroup(child, 'SIGKILL'), KILL_GRACE_MS);
+  };
+
+  const timeoutTimer = timeoutMs ? setTimeout(() => stop('timeout'), timeoutMs) : null;
+  const onAbort = () => stop('cancelled');
+  if (signal?.aborted) {
+    onAbort();
+  } else {
+    signal?.addEventListener('abort', onAbort, { once: true });
+  }
+
+  ['stdout', 'stderr'].forEach((name) => {
+    const stream = streams[name];
+    stream.setEncoding('utf8');
+    stream.on('data', (data) => {
+      onData(name, data);
+      if (!capture[name].write(data)) {
+        stream.pause();
+        capture[name].once('drain', () => stream.resume());
+      }
+    });
+  });
+  child.on('error', (err) => capture.stderr.write(err.message));
+  child.on('close', async (exitCode) => {
+    clearTimeout(timeoutTimer);
+    clearTimeout(killTimer);
+    signal?.removeEventListener('abort', onAbort);
+    await filtered;
+    resolve({ exitCode, reason });
+  });
+});
+
+const createCapture = (job, stream, target = job.target) => new OutputCapture({
+  filename: `${job.execution}-${target}-${stream}.log`,
+  metadata: { execution: job.execution, target, stream }
+});
+
+// Mark the execution finished once none of its jobs are queued or running
+export const finalizeExecution = async (executionId) => {
+  const remaining = await Job.countDocuments({
+    execution: executionId,
+    status: { $in: ['queued', 'running'] }
+  });
+  if (remaining > 0) return null;
+
+  const execution = await Execution.findOne({ _id: executionId, status: 'running' });
+  if (!execution) return null;
+
+  let status = execution.targets.some(target => target.status === 'completed') ? 'completed' : 'failed';
+  if (execution.cancelledAt) {
+    status = 'cancelled';
+  }
+
+  const finalized = await Execution.findOneAndUpdate(
+    { _id: executionId, status: 'running' },
+    {
+      $set: {
+        status,
+        completedAt: new Date(),
+        duration: formatDuration(Date.now() - execution.startedAt)
+      }
+    },
+    { new: true }
+  );
+
+  if (finalized) {
+    outputBus.executionDone(executionId, finalized.status);
+  }
+  return finalized;
+};
+
+// Cancel an execution: drop its queued jobs and abort the ones running here;
+// other workers see cancelledAt on their next heartbeat
+export const cancelExecution = async (executionId) => {
+  const execution = await Execution.findOneAndUpdate(
+    { _id: executionId, status: 'running' },
+    { $set: { cancelledAt: new Date() } },
+    { new: true }
+  );
+  if (!execution) return null;
+
+  const queued = await Job.find({ execution: executionId, status: 'queued' }).select('_id target batch').lean();
+  const queuedTargets = queued.flatMap(job => (job.batch?.length ? job.batch.map(row => row.target) : [job.target]));
+  await Job.updateMany(
+    { _id: { $in: queued.map(job => job._id) }, status: 'queued' },
+    { $set: { status: 'cancelled', finishedAt: new Date() } }
+  );
+  await Execution.updateOne(
+    { _id: executionId },
+    { $set: { 'targets.$[t].status': 'cancelled', 'targets.$[t].error': 'Cancelled before start' } },
+    { arrayFilters: [{ 't._id': { $in: queuedTargets }, 't.status': 'pending' }] }
+  );
+  queuedTargets.forEach(target => outputBus.targetDone(executionId, target, 'cancelled'));
+
+  const aborted = workerPool.cancelExecution(executionId);
+  await finalizeExecution(executionId);
+
+  return { dequeued: queued.length, aborted };
+};
+
+const targetStatus = (exitCode, reason) => reason || (exitCode === 0 ? 'completed' : 'failed');
+
+// Row fields for one target's share of a finished run
+const describeRun = (job, { stdout, stderr, line, exitCode, reason, durationMs }) => {
+  let error = stderr.text.trim() || null;
+  if (reason === 'timeout') {
+    error = [error, `Timed out after ${Math.round(job.timeoutMs / 1000)}s`].filter(Boolean).join('\n');
+  } else if (reason === 'cancelled') {
+    error = [error, 'Cancelled by user'].filter(Boolean).join('\n');
+  }
+
+  return {
+    output: stdout.text.trim(),
+    error,
+    outputLog: stdout.log,
+    errorLog: stderr.log,
+    status: targetStatus(exitCode, reason),
+    result: targetResult({ line, exitCode, reason, stderr: stderr.text, durationMs })
+  };
+};
+
+// Run the job's process and return [{ target, update }] for its row(s),
+// streaming live output through `publish`. A batch job runs every IP in one
+// interpreter and reports per row, so a row's status follows its own result
+// rather than the shared exit code.
+const startRun = async (script, job, signal, publish) => {
+  // Built on first use after an upload or eviction, then reused as is
+  const python = await pythonFor(script);
+  const batch = job.batch?.length ? new BatchOutput(job, createCapture, publish) : null;
+  const capture = batch
+    ? batch.streams
+    : { stdout: createCapture(job, 'stdout'), stderr: createCapture(job, 'stderr') };
+  const scanner = createResultScanner();
+  const importTimes = script.profileImports && script.language.toLowerCase() === 'python'
+    ? new ImportTimeFilter()
+    : null;
+
+  const finished = scriptDurationSeconds.startTimer({ script: script.name });
+  const { exitCode, reason } = await runProcess(script, job.args, {
+    python,
+    importTimes,
+    onData: batch ? undefined : (stream, data) => {
+      if (stream === 'stdout') scanner.push(data);
+      publish(0, stream, data);
+    },
+    timeoutMs: job.timeoutMs,
+    signal,
+    capture
+  });
+  const durationMs = finished() * 1000;
+  scriptExits.inc({ script: script.name, code: reason || (exitCode ?? 'signal') });
+  if (importTimes) {
+    recordImportProfile(script, importTimes.summary(durationMs)).catch(err =>
+      console.error(`[imports] Failed to store the import profile of ${script.name}:`, err.message)
+    );
+  }
+
+  console.log(`[IPs: ${job.args.join(', ')}] Exit code: ${exitCode}${reason ? ` (${reason})` : ''}`);
+
+  if (!batch) {
+    const stdout = await capture.stdout.finish();
+    const stderr = await capture.stderr.finish();
+    const update = describeRun(job, { stdout, stderr, line: scanner.line(), exitCode, reason, durationMs });
+    return [{ target: job.target, update }];
+  }
+
+  const rows = await batch.finish();
+  return rows.map((row) => {
+    const update = describeRun(job, { ...row, exitCode, reason, durationMs });
+    update.status = reason || (update.result.status === 'success' ? 'completed' : 'failed');
+    return { target: row.target, update };
+  });
+};
+
+// Identical runs already in progress are joined rather than started again
+const runTargets = (script, job, signal) =>
+  sharedRuns.run(script, job, signal, (runSignal, publish) => startRun(script, job, runSignal, publish));
+
+export const runJob = async (job, { signal, renewLease } = {}) => {
+  let script;
+  let results;
+  let cached = null;
+
+  try {
+    script = await Script.findById(job.script);
+    if (!script) {
+      throw new Error('Script not found');
+    }
+
+    // An identical run may have finished while this job was queued
+    cached = job.force ? null : await resultCache.lookupJob(script, job);
+    if (cached) {
+      console.log(`[IPs: ${job.args.join(', ')}] Served ${script.name} from the result cache`);
+      results = cached;
+    } else {
+      console.log(`\n[Running ${script.name} with IPs: ${job.args.join(', ')}]`);
+      results = await runTargets(script, job, signal);
+    }
+  } catch (err) {
+    console.error(`Error processing IPs ${job.args.join(', ')}:`, err);
+    const targets = job.batch?.length ? job.batch.map(row => row.target) : [job.target];
+    results = targets.map(target => ({
+      target,
+      update: {
+        error: err.message,
+        status: 'failed',
+        result: { status: 'error', source: 'exit-code', message: err.message }
+      }
+    }));
+  }
+
+  // Our lease lapsed and another worker re-ran the job; its result wins
+  if (renewLease && !(await renewLease())) {
+    console.error(`[IPs: ${job.args.join(', ')}] Lease on job ${job._id} lost; dropping this result`);
+    return;
+  }
+
+  // Durable before the job is marked done, so a crash never loses a result
+  await Promise.all(results.map(({ target, update }) => resultWriter.write(job.execution, target, update)));
+  // Re-storing a cached result would keep extending its expiry
+  if (script && !cached) {
+    await resultCache.store(script, job, results).catch(err =>
+      console.error(`[IPs: ${job.args.join(', ')}] Failed to cache results:`, err.message)
+    );
+  }
+
+  // Solved: hand the challenge callback to the outbox (delivered asynchronously)
+  // Not for cached results: like rows served at enqueue, they solved nothing new
+  for (const { target, update } of results) {
+    if (update.status !== 'completed' || update.cached) continue;
+    await callbackDispatcher.enqueue(script, { execution: job.execution, target, user: job.user }).catch(err =>
+      console.error(`[IPs: ${job.args.join(', ')}] Failed to queue challenge callback:`, err.message)
+    );
+  }
+
+  // A batch job is done when all of its rows are; otherwise it takes the
+  // first row's failure
+  const failed = results.find(({ update }) => update.status !== 'completed');
+  const jobStatus = failed ? failed.update.status : 'completed';
+
+  const written = mongoWriteSeconds.startTimer({ operation: 'job_finish' });
+  await Job.updateOne(
+    { _id: job._id },
+    { $set: { status: jobStatus, finishedAt: new Date() } }
+  );
+  written();
+
+  results.forEach(({ target, update }) => outputBus.targetDone(job.execution, target, update.status));
+
+  await finalizeExecution(job.execution);
+};
+
+export const workerPool = new WorkerPool({ runJob });
+
+metrics.gauge(
+  'automation_running_processes',
+  'Scripts running in this process, and its slot limit',
+  ['kind'],
+  (gauge) => {
+    gauge.set({ kind: 'running' }, workerPool.running.size);
+    gauge.set({ kind: 'slots' }, workerPool.timer ? workerPool.maxConcurrency : 0);
+  }
+);
+
+// Shared queue, so every process reports the same numbers
+metrics.gauge(
+  'automation_queue_jobs',
+  'Jobs in the shared queue: queued (of which due to start now) and running',
+  ['state'],
+  async (gauge) => {
+    const [counts] = await Job.aggregate([
+      { $match: { status: { $in: ['queued', 'running'] } } },
+      {
+        $group: {
+          _id: null,
+          queued: { $sum: { $cond: [{ $eq: ['$status', 'queued'] }, 1, 0] } },
+          due: { $sum: { $cond: [{ $and: [{ $eq: ['$status', 'queued'] }, { $lte: ['$runAfter', new Date()] }] }, 1, 0] } },
+          running: { $sum: { $cond: [{ $eq: ['$status', 'running'] }, 1, 0] } }
+        }
+      }
+    ]);
+    gauge.set({ state: 'queued' }, counts?.queued || 0);
+    gauge.set({ state: 'due' }, counts?.due || 0);
+    gauge.set({ state: 'running' }, counts?.running || 0);
+  }
+);
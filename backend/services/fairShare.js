@@ -0,0 +1,78 @@
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+const DEFAULT_COST_MS = parseInt(process.env.EXECUTOR_DEFAULT_COST_MS, 10) || 1000;
+const EMA_ALPHA = 0.2;
+
+// Queues are fair-shared per (team, challenge)
+export const fairKey = ({ user, challenge }) => `${user ?? '-'}:${challenge ?? '-'}`;
+
+const ema = (previous, sample) => (previous === undefined ? sample : previous + EMA_ALPHA * (sample - previous));
+
+// Weighted fair queuing over executor time. Every key has a virtual finish
+// tag; dispatching a job charges the key the job's expected runtime divided
+// by its weight, and the key with the smallest next start tag goes first.
+// Charges are corrected with the real runtime when the job finishes, so a
+// key whose scripts sit in slow SMB timeouts falls behind quick checkers
+// instead of taking every slot. Idle keys restart at the virtual clock and
+// cannot bank credit.
+export class FairShare {
+  constructor({ defaultCostMs = DEFAULT_COST_MS } = {}) {
+    this.defaultCostMs = defaultCostMs;
+    this.virtualTime = 0;
+    this.finish = new Map();  // key -> virtual finish tag
+    this.costs = new Map();   // scriptId -> average runtime (ms)
+    this.waits = new Map();   // key -> { dispatched, avgWaitMs, lastWaitMs }
+  }
+
+  startTag(key) {
+    return Math.max(this.finish.get(key) ?? 0, this.virtualTime);
+  }
+
+  // Candidates ({ key, weight, ... }) in dispatch order
+  order(candidates) {
+    return [...candidates].sort((a, b) => this.startTag(a.key) - this.startTag(b.key));
+  }
+
+  estimate(scriptId) {
+    return this.costs.get(scriptId.toString()) ?? this.defaultCostMs;
+  }
+
+  // A job of `key` was dispatched; returns the charge to settle later
+  charge(key, weight, scriptId, waitMs) {
+    const start = this.startTag(key);
+    const estimateMs = this.estimate(scriptId);
+    this.finish.set(key, start + estimateMs / weight);
+    this.virtualTime = start;
+
+    const wait = this.waits.get(key) || { dispatched: 0 };
+    this.waits.set(key, {
+      dispatched: wait.dispatched + 1,
+      avgWaitMs: ema(wait.avgWaitMs, waitMs),
+      lastWaitMs: waitMs
+    });
+
+    return { key, weight, scriptId: scriptId.toString(), estimateMs };
+  }
+
+  // Replace the estimate with the job's real runtime
+  settle({ key, weight, scriptId, estimateMs }, runtimeMs) {
+    if (this.finish.has(key)) {
+      this.finish.set(key, this.finish.get(key) + (runtimeMs - estimateMs) / weight);
+    }
+    this.costs.set(scriptId, ema(this.costs.get(scriptId), runtimeMs));
+
+    // Keys at or behind the clock carry no information any more
+    for (const [idleKey, tag] of this.finish) {
+      if (tag <= this.virtualTime) this.finish.delete(idleKey);
+    }
+  }
+
+  stats(key) {
+    return {
+      virtualFinish: this.finish.get(key) ?? null,
+      ...(this.waits.get(key) || { dispatched: 0 })
+    };
+  }
+}
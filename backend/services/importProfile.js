@@ -0,0 +1,116 @@
+// Import-time profiling for Python scripts. A script with profileImports
+// on runs as `python -X importtime`, which reports every import on stderr:
+//
+//   import time: self [us] | cumulative | imported package
+//   import time:       412 |       9120 | impacket.smbconnection
+//   import time:        88 |         88 |   impacket.nmb
+//
+// ImportTimeFilter takes those lines out of the run's stderr (so the stored
+// output stays the script's own) and sums them up; recordImportProfile()
+// stores the latest sample on Script.importProfile for the dashboard.
+import { Transform } from 'stream';
+import dotenv from 'dotenv';
+
+import Script from '../models/Script.js';
+
+dotenv.config();
+
+// Startup slower than this is flagged on the dashboard
+export const SLOW_IMPORT_MS = parseInt(process.env.SLOW_IMPORT_MS, 10) || 500;
+const TOP_MODULES = 10;
+
+const IMPORT_TIME = /^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$/;
+const HEADER = /^import time: self \[us\]/;
+
+const milliseconds = (microseconds) => Math.round(microseconds / 100) / 10;
+
+export class ImportTimeFilter extends Transform {
+  constructor() {
+    super({ decodeStrings: false, encoding: 'utf8' });
+    this.partial = '';
+    this.imports = 0;
+    this.totalUs = 0;
+    this.modules = []; // top-level imports: { name, cumulativeUs }
+  }
+
+  take(line) {
+    if (HEADER.test(line)) return true;
+    const match = IMPORT_TIME.exec(line);
+    if (!match) return false;
+
+    this.imports += 1;
+    // Nested imports are indented under the one that pulled them in
+    if (match[3].length <= 1) {
+      const cumulativeUs = Number(match[2]);
+      this.totalUs += cumulativeUs;
+      this.modules.push({ name: match[4], cumulativeUs });
+    }
+    return true;
+  }
+
+  _transform(chunk, encoding, callback) {
+    const lines = (this.partial + chunk).split('\n');
+    this.partial = lines.pop();
+    const kept = lines.filter(line => !this.take(line));
+    if (kept.length) this.push(kept.map(line => `${line}\n`).join(''));
+    callback();
+  }
+
+  _flush(callback) {
+    if (this.partial && !this.take(this.partial)) this.push(this.partial);
+    this.partial = '';
+    callback();
+  }
+
+  // What one run's imports cost; null when the run printed no import times
+  summary(durationMs) {
+    if (this.imports === 0) return null;
+    const importMs = milliseconds(this.totalUs);
+    return {
+      importMs,
+      checkMs: Math.max(0, Math.round(durationMs - importMs)),
+      imports: this.imports,
+      modules: this.modules
+        .sort((a, b) => b.cumulativeUs - a.cumulativeUs)
+        .slice(0, TOP_MODULES)
+        .map(({ name, cumulativeUs }) => ({ name, ms: milliseconds(cumulativeUs) }))
+    };
+  }
+}
+
+// Keep the latest sample on the script
+export const recordImportProfile = async (script, summary) => {
+  if (!summary) return;
+  await Script.updateOne(
+    { _id: script._id },
+    {
+      $set: {
+        'importProfile.sampledAt': new Date(),
+        'importProfile.importMs': summary.importMs,
+        'importProfile.checkMs': summary.checkMs,
+        'importProfile.imports': summary.imports,
+        'importProfile.modules': summary.modules
+      },
+      $inc: { 'importProfile.samples': 1 }
+    }
+  );
+};
+
+// Latest sample of every profiled script, slowest start-up first
+export const importProfiles = async () => {
+  const scripts = await Script.find({ 'importProfile.samples': { $gt: 0 } })
+    .select('name profileImports importProfile')
+    .sort({ 'importProfile.importMs': -1 })
+    .lean();
+
+  return {
+    slowImportMs: SLOW_IMPORT_MS,
+    scripts: scripts.map(script => ({
+      id: script._id,
+      name: script.name,
+      profileImports: script.profileImports,
+      ...script.importProfile,
+      slow: script.importProfile.importMs > SLOW_IMPORT_MS
+    }))
+  };
+};
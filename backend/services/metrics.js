@@ -0,0 +1,221 @@
+import http from 'http';
+
+import eventLoopMonitor from './eventLoopMonitor.js';
+
+// Minimal Prometheus registry for the execution pipeline. Recording a value
+// is a Map lookup and a few additions, so the instruments can stay on in the
+// hot path; anything that needs a query (queue depth) is collected at scrape
+// time instead. Values are per process: scrape every process that runs jobs.
+
+// Seconds; covers quick checkers up to scripts that sit in long timeouts
+export const DURATION_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600];
+export const LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+const formatLabels = (names, values, extra = '') => {
+  const pairs = names.map((name, i) => `${name}="${escapeLabel(values[i])}"`);
+  if (extra) pairs.push(extra);
+  return pairs.length ? `{${pairs.join(',')}}` : '';
+};
+
+const formatValue = (value) => (Number.isFinite(value) ? String(value) : value > 0 ? '+Inf' : value < 0 ? '-Inf' : 'NaN');
+
+class Metric {
+  constructor(type, name, help, labelNames = []) {
+    this.type = type;
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.series = new Map(); // joined label values -> { values, ... }
+  }
+
+  entry(labels, create) {
+    const values = this.labelNames.map(name => labels[name] ?? '');
+    const key = values.join('\u0000');
+    let entry = this.series.get(key);
+    if (!entry) {
+      entry = { values, ...create() };
+      this.series.set(key, entry);
+    }
+    return entry;
+  }
+
+  header() {
+    return `# HELP ${this.name} ${this.help}\n# TYPE ${this.name} ${this.type}\n`;
+  }
+}
+
+export class Counter extends Metric {
+  constructor(name, help, labelNames) {
+    super('counter', name, help, labelNames);
+  }
+
+  inc(labels = {}, amount = 1) {
+    this.entry(labels, () => ({ value: 0 })).value += amount;
+  }
+
+  render() {
+    let text = this.header();
+    for (const { values, value } of this.series.values()) {
+      text += `${this.name}${formatLabels(this.labelNames, values)} ${formatValue(value)}\n`;
+    }
+    return text;
+  }
+}
+
+// Either set() directly, or give `collect` to read the value(s) at scrape
+// time; `collect` may be async and calls set() itself
+export class Gauge extends Metric {
+  constructor(name, help, labelNames, collect) {
+    super('gauge', name, help, labelNames);
+    this.collect = collect;
+  }
+
+  set(labels, value) {
+    this.entry(labels, () => ({ value: 0 })).value = value;
+  }
+
+  render() {
+    let text = this.header();
+    for (const { values, value } of this.series.values()) {
+      text += `${this.name}${formatLabels(this.labelNames, values)} ${formatValue(value)}\n`;
+    }
+    return text;
+  }
+}
+
+export class Histogram extends Metric {
+  constructor(name, help, labelNames, buckets = DURATION_BUCKETS) {
+    super('histogram', name, help, labelNames);
+    this.buckets = buckets;
+  }
+
+  observe(labels, value) {
+    const entry = this.entry(labels, () => ({ counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 }));
+    const index = this.buckets.findIndex(bound => value <= bound);
+    if (index !== -1) entry.counts[index] += 1;
+    entry.sum += value;
+    entry.count += 1;
+  }
+
+  // Returns a function that observes the seconds elapsed since startTimer();
+  // only its first call counts
+  startTimer(labels = {}) {
+    const started = process.hrtime.bigint();
+    let observed = false;
+    return (extraLabels) => {
+      if (observed) return 0;
+      observed = true;
+      const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+      this.observe(extraLabels ? { ...labels, ...extraLabels } : labels, seconds);
+      return seconds;
+    };
+  }
+
+  render() {
+    let text = this.header();
+    for (const { values, counts, sum, count } of this.series.values()) {
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i];
+        text += `${this.name}_bucket${formatLabels(this.labelNames, values, `le="${bound}"`)} ${cumulative}\n`;
+      });
+      text += `${this.name}_bucket${formatLabels(this.labelNames, values, 'le="+Inf"')} ${count}\n`;
+      text += `${this.name}_sum${formatLabels(this.labelNames, values)} ${formatValue(sum)}\n`;
+      text += `${this.name}_count${formatLabels(this.labelNames, values)} ${count}\n`;
+    }
+    return text;
+  }
+}
+
+class Registry {
+  constructor() {
+    this.metrics = new Map();
+  }
+
+  register(metric) {
+    if (!this.metrics.has(metric.name)) {
+      this.metrics.set(metric.name, metric);
+    }
+    return this.metrics.get(metric.name);
+  }
+
+  counter(name, help, labelNames) {
+    return this.register(new Counter(name, help, labelNames));
+  }
+
+  gauge(name, help, labelNames, collect) {
+    return this.register(new Gauge(name, help, labelNames, collect));
+  }
+
+  histogram(name, help, labelNames, buckets) {
+    return this.register(new Histogram(name, help, labelNames, buckets));
+  }
+
+  // Text exposition format 0.0.4
+  async render() {
+    const metrics = [...this.metrics.values()];
+    await Promise.all(metrics.map(async (metric) => {
+      if (!metric.collect) return;
+      try {
+        await metric.collect(metric);
+      } catch (err) {
+        console.error(`[metrics] Failed to collect ${metric.name}:`, err.message);
+      }
+    }));
+    return metrics.map(metric => metric.render()).join('');
+  }
+}
+
+const registry = new Registry();
+
+// Shared by every module that writes to Mongo on the execution path
+export const mongoWriteSeconds = registry.histogram(
+  'automation_mongo_write_seconds',
+  'Latency of Mongo writes on the execution path, by operation',
+  ['operation'],
+  LATENCY_BUCKETS
+);
+
+registry.gauge(
+  'automation_event_loop_lag_seconds',
+  'Event-loop lag of this process over the current window (mean, p50, p99, max)',
+  ['stat'],
+  (gauge) => {
+    const stats = eventLoopMonitor.stats();
+    gauge.set({ stat: 'mean' }, stats.meanMs / 1000);
+    gauge.set({ stat: 'p50' }, stats.p50Ms / 1000);
+    gauge.set({ stat: 'p99' }, stats.p99Ms / 1000);
+    gauge.set({ stat: 'max' }, stats.maxMs / 1000);
+  }
+);
+
+export const CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8';
+
+export const metricsHandler = async (req, res) => {
+  try {
+    res.setHeader('Content-Type', CONTENT_TYPE);
+    res.end(await registry.render());
+  } catch (err) {
+    console.error('[metrics] Failed to render metrics:', err);
+    res.statusCode = 500;
+    res.end();
+  }
+};
+
+// Stand-alone /metrics listener for processes without an HTTP API
+// (`node worker.js`, or the cluster primary)
+export const startMetricsServer = (port) => {
+  const server = http.createServer((req, res) => {
+    if (req.method === 'GET' && req.url.split('?')[0] === '/metrics') {
+      return metricsHandler(req, res);
+    }
+    res.statusCode = 404;
+    res.end();
+  });
+  server.listen(port, () => console.log(`[metrics] Serving /metrics on port ${port} (pid ${process.pid})`));
+  return server;
+};
+
+export default registry;
@@ -0,0 +1,63 @@
+import { EventEmitter } from 'events';
+
+const TAIL_BYTES = parseInt(process.env.STREAM_TAIL_BYTES, 10) || 64 * 1024;
+
+// Emitted with (executionId, status) when any execution finishes, whichever
+// process ran it
+export const EXECUTION_DONE = 'execution-done';
+
+// In-process fan-out of live script output. The executor publishes chunks as
+// they arrive and SSE clients subscribe per execution. A bounded tail of each
+// running target is kept so late subscribers see recent output immediately.
+class OutputBus extends EventEmitter {
+  constructor() {
+    super();
+    this.setMaxListeners(0);
+    this.tails = new Map(); // targetId -> { stdout, stderr }
+    this.forward = null;    // set in worker processes to relay events to the API
+  }
+
+  chunk(executionId, targetId, stream, data) {
+    this.publish(executionId, { type: 'chunk', target: targetId.toString(), stream, data });
+  }
+
+  targetDone(executionId, targetId, status) {
+    this.publish(executionId, { type: 'target', target: targetId.toString(), status });
+  }
+
+  executionDone(executionId, status) {
+    this.publish(executionId, { type: 'done', status });
+  }
+
+  publish(executionId, event) {
+    this.replay(executionId, event);
+    this.forward?.(executionId, event);
+  }
+
+  // Apply an event locally: keep the tails current and notify subscribers
+  replay(executionId, event) {
+    if (event.type === 'chunk') {
+      const tail = this.tails.get(event.target) || { stdout: '', stderr: '' };
+      tail[event.stream] = (tail[event.stream] + event.data).slice(-TAIL_BYTES);
+      this.tails.set(event.target, tail);
+    } else if (event.type === 'target') {
+      this.tails.delete(event.target);
+    } else if (event.type === 'done') {
+      this.emit(EXECUTION_DONE, executionId, event.status);
+    }
+
+    this.emit(executionId.toString(), event);
+  }
+
+  tail(targetId) {
+    return this.tails.get(targetId.toString());
+  }
+
+  subscribe(executionId, listener) {
+    const channel = executionId.toString();
+    this.on(channel, listener);
+    return () => this.off(channel, listener);
+  }
+}
+
+export default new OutputBus();
@@ -0,0 +1,136 @@
+import { EventEmitter } from 'events';
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+const HEAD_BYTES = parseInt(process.env.OUTPUT_HEAD_BYTES, 10) || 32 * 1024;
+const TAIL_BYTES = parseInt(process.env.OUTPUT_TAIL_BYTES, 10) || 32 * 1024;
+export const OUTPUT_BUCKET = 'executionOutput';
+
+export const outputBucket = () =>
+  new mongoose.mongo.GridFSBucket(mongoose.connection.db, { bucketName: OUTPUT_BUCKET });
+
+// Captures one output stream of a script with bounded memory: the first
+// `headBytes` and a ring buffer of the last `tailBytes`. As soon as the output
+// outgrows both, the full log is spilled to GridFS and the document only keeps
+// head + tail. Emits 'drain' when a congested spill can accept more data.
+export class OutputCapture extends EventEmitter {
+  constructor({ filename, metadata, headBytes = HEAD_BYTES, tailBytes = TAIL_BYTES } = {}) {
+    super();
+    this.filename = filename;
+    this.metadata = metadata;
+    this.headBytes = headBytes;
+    this.tailBytes = tailBytes;
+
+    this.head = Buffer.alloc(0);
+    this.ring = Buffer.alloc(tailBytes);
+    this.ringStart = 0;  // index of the oldest byte in the ring
+    this.ringLength = 0;
+    this.totalBytes = 0;
+    this.spill = null;
+    this.spillError = null;
+  }
+
+  get truncated() {
+    return this.totalBytes > this.headBytes + this.tailBytes;
+  }
+
+  pushRing(buffer) {
+    if (buffer.length >= this.tailBytes) {
+      buffer.copy(this.ring, 0, buffer.length - this.tailBytes);
+      this.ringStart = 0;
+      this.ringLength = this.tailBytes;
+      return;
+    }
+
+    let writeAt = (this.ringStart + this.ringLength) % this.tailBytes;
+    const firstPart = Math.min(buffer.length, this.tailBytes - writeAt);
+    buffer.copy(this.ring, writeAt, 0, firstPart);
+    buffer.copy(this.ring, 0, firstPart);
+
+    const overflow = Math.max(0, this.ringLength + buffer.length - this.tailBytes);
+    this.ringLength = Math.min(this.tailBytes, this.ringLength + buffer.length);
+    this.ringStart = (this.ringStart + overflow) % this.tailBytes;
+  }
+
+  ringContents() {
+    const end = this.ringStart + this.ringLength;
+    if (end <= this.tailBytes) {
+      return this.ring.subarray(this.ringStart, end);
+    }
+    return Buffer.concat([
+      this.ring.subarray(this.ringStart),
+      this.ring.subarray(0, end - this.tailBytes)
+    ]);
+  }
+
+  openSpill() {
+    this.spill = outputBucket().openUploadStream(this.filename, { metadata: this.metadata });
+    this.spill.on('error', (err) => {
+      this.spillError = err;
+      console.error(`[capture] Spill of ${this.filename} failed:`, err.message);
+    });
+    this.spill.on('drain', () => this.emit('drain'));
+    // Everything seen so far is still in head + ring (copied: the ring is reused)
+    this.spill.write(this.head);
+    this.spill.write(Buffer.from(this.ringContents()));
+  }
+
+  // Returns false when the spill is congested; wait for 'drain' before more
+  write(chunk) {
+    const buffer = Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk);
+    this.totalBytes += buffer.length;
+
+    let rest = buffer;
+    if (this.head.length < this.headBytes) {
+      const take = Math.min(this.headBytes - this.head.length, rest.length);
+      this.head = Buffer.concat([this.head, rest.subarray(0, take)]);
+      rest = rest.subarray(take);
+    }
+
+    if (this.spill) {
+      this.pushRing(rest);
+      return this.spillError ? true : this.spill.write(buffer);
+    }
+
+    if (rest.length > 0 && this.ringLength + rest.length > this.tailBytes) {
+      this.openSpill();
+      this.pushRing(rest);
+      return this.spill.write(rest);
+    }
+
+    this.pushRing(rest);
+    return true;
+  }
+
+  // head + tail, with a marker where bytes were left out
+  text() {
+    if (!this.truncated) {
+      return Buffer.concat([this.head, this.ringContents()]).toString('utf8');
+    }
+    const skipped = this.totalBytes - this.head.length - this.ringLength;
+    return `${this.head.toString('utf8')}\n\n... [${skipped} bytes truncated, full log available for download] ...\n\n${this.ringContents().toString('utf8')}`;
+  }
+
+  // Close the spill (if any) and describe what was captured
+  async finish() {
+    let file = null;
+    if (this.spill) {
+      await new Promise((resolve) => {
+        if (this.spillError) return resolve();
+        this.spill.end(resolve);
+      });
+      file = this.spillError ? null : this.spill.id;
+    }
+
+    return {
+      text: this.text(),
+      log: {
+        file,
+        bytes: this.totalBytes,
+        truncated: this.truncated
+      }
+    };
+  }
+}
@@ -0,0 +1,84 @@
+import dotenv from 'dotenv';
+
+import OutputEvent from '../models/OutputEvent.js';
+import outputBus from './outputBus.js';
+
+dotenv.config();
+
+const FLUSH_MS = parseInt(process.env.OUTPUT_RELAY_FLUSH_MS, 10) || 100;
+const MAX_MERGED_BYTES = 256 * 1024;
+const RETRY_MS = 1000;
+
+// Worker side: batch this process's output events into the capped
+// collection every FLUSH_MS. Consecutive chunks of the same target stream
+// are merged so a chatty script costs one document per flush, not per line.
+export const startOutputPublisher = (origin) => {
+  let pending = [];
+  let timer = null;
+  let flushing = Promise.resolve();
+
+  const flush = async () => {
+    timer = null;
+    const batch = pending;
+    pending = [];
+    try {
+      await OutputEvent.insertMany(batch.map(({ execution, event }) => ({ execution, origin, event })));
+    } catch (err) {
+      console.error(`[relay] Failed to publish ${batch.length} output event(s):`, err.message);
+    }
+  };
+
+  outputBus.forward = (executionId, event) => {
+    const last = pending[pending.length - 1];
+    if (
+      event.type === 'chunk' && last?.event.type === 'chunk' &&
+      last.event.target === event.target && last.event.stream === event.stream &&
+      last.event.data.length + event.data.length <= MAX_MERGED_BYTES
+    ) {
+      last.event = { ...last.event, data: last.event.data + event.data };
+    } else {
+      pending.push({ execution: executionId, event });
+    }
+
+    if (!timer) {
+      // Flushes are chained so events reach the collection in order
+      timer = setTimeout(() => {
+        flushing = flushing.then(flush);
+      }, FLUSH_MS);
+    }
+  };
+};
+
+// API side: tail the capped collection and replay other processes' events
+// on the local bus, where the SSE routes are subscribed. Starts at the
+// newest event; history is served from the database instead.
+export const startOutputSubscriber = async (origin) => {
+  const newest = await OutputEvent.findOne().sort({ $natural: -1 }).select('_id').lean();
+  let lastId = newest?._id;
+
+  const follow = async () => {
+    for (;;) {
+      try {
+        const cursor = OutputEvent.find(lastId ? { _id: { $gt: lastId } } : {})
+          .tailable(true, { awaitData: true })
+          .lean()
+          .cursor();
+
+        for await (const doc of cursor) {
+          lastId = doc._id;
+          if (doc.origin !== origin) {
+            outputBus.replay(doc.execution, doc.event);
+          }
+        }
+      } catch (err) {
+        // An empty capped collection kills tailable cursors; just retry
+        if (!/tailable|dead|killed/i.test(err.message)) {
+          console.error('[relay] Output tail failed:', err.message);
+        }
+      }
+      await new Promise(resolve => setTimeout(resolve, RETRY_MS));
+    }
+  };
+
+  follow();
+};
@@ -0,0 +1,198 @@
+// Upload-time checks for Python scripts (runner/preflight.py): does it
+// compile on the runner's interpreter, are its imports installed, and how
+// many arguments does it take. The report is stored on Script.preflight so
+// the executor can refuse a run that cannot work before it fans out one
+// process per target, and the fork-server can run the cached bytecode.
+import path from 'path';
+import { spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+import dotenv from 'dotenv';
+
+import Script from '../models/Script.js';
+import { PYTHON, pythonEnv } from './pythonRunner.js';
+import { artifactDir } from './scriptStore.js';
+import venvCache from './venvCache.js';
+
+dotenv.config();
+
+const PREFLIGHT_TIMEOUT_MS = parseInt(process.env.PREFLIGHT_TIMEOUT_MS, 10) || 20000;
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const BACKEND_DIR = path.resolve(__dirname, '..');
+const PREFLIGHT = path.join(BACKEND_DIR, 'runner', 'preflight.py');
+
+// Import names whose package is called something else
+const DISTRIBUTIONS = {
+  bs4: 'beautifulsoup4',
+  Crypto: 'pycryptodome',
+  Cryptodome: 'pycryptodomex',
+  dateutil: 'python-dateutil',
+  dns: 'dnspython',
+  jwt: 'PyJWT',
+  ldap: 'python-ldap',
+  nmap: 'python-nmap',
+  nmb: 'pysmb',
+  OpenSSL: 'pyOpenSSL',
+  PIL: 'Pillow',
+  smb: 'pysmb',
+  socks: 'PySocks',
+  yaml: 'PyYAML'
+};
+
+const runScript = (args, python = PYTHON) => new Promise((resolve, reject) => {
+  const child = spawn(python, [PREFLIGHT, ...args], { env: pythonEnv(), stdio: ['ignore', 'pipe', 'pipe'] });
+  let stdout = '';
+  let stderr = '';
+  const timer = setTimeout(() => child.kill('SIGKILL'), PREFLIGHT_TIMEOUT_MS);
+
+  child.stdout.setEncoding('utf8').on('data', data => { stdout += data; });
+  child.stderr.setEncoding('utf8').on('data', data => { stderr += data; });
+  child.on('error', (error) => {
+    clearTimeout(timer);
+    reject(error);
+  });
+  child.on('close', (code, signal) => {
+    clearTimeout(timer);
+    if (code !== 0) {
+      reject(new Error(signal ? `preflight killed (${signal})` : stderr.trim().split('\n').pop() || `preflight exited with ${code}`));
+      return;
+    }
+    resolve(JSON.parse(stdout));
+  });
+});
+
+// Problems that make every run of the script fail, whatever its targets
+const reportProblems = (report) => {
+  const problems = [];
+  if (report.syntaxError) {
+    const { message, line } = report.syntaxError;
+    problems.push(`Syntax error${line ? ` on line ${line}` : ''} (Python ${report.python}): ${message}`);
+  }
+  const missing = report.imports.filter(entry => !entry.found && !entry.optional).map(entry => entry.name);
+  if (missing.length) {
+    problems.push(`Missing modules on the runner: ${missing.join(', ')}`);
+  }
+  return problems;
+};
+
+// Packages to install for imports the shared interpreter can't satisfy
+const inferDependencies = (report) => [...new Set(report.imports
+  .filter(entry => entry.kind === 'third-party' && !entry.found && !entry.optional)
+  .map(entry => DISTRIBUTIONS[entry.name] || entry.name))];
+
+// Check a script and record the outcome on it (Script.preflight, and the
+// dependencies inferred from its imports unless they were declared); the
+// caller saves. Only Python scripts are checked; a preflight that cannot
+// run is recorded as 'error' and doesn't block executions.
+export const runPreflight = async (script) => {
+  const checkedAt = new Date();
+  if (script.language.toLowerCase() !== 'python') {
+    script.preflight = { status: 'skipped', checkedAt };
+    return script.preflight;
+  }
+
+  const args = [path.resolve(BACKEND_DIR, script.filePath)];
+  if (script.contentHash) {
+    args.push('--cache-dir', path.resolve(BACKEND_DIR, artifactDir(script.contentHash)));
+  }
+
+  let report;
+  let environment;
+  const problems = [];
+  try {
+    report = await runScript(args);
+
+    if (script.dependencySource !== 'declared') {
+      script.dependencies = report.syntaxError ? [] : inferDependencies(report);
+      script.dependencySource = script.dependencies.length ? 'inferred' : undefined;
+    }
+
+    // Imports are resolved again inside the script's own environment
+    if (script.dependencies?.length) {
+      try {
+        environment = await venvCache.ensure(script.dependencies, { isolated: script.dependencySource === 'declared' });
+        report = await runScript(args, environment.python);
+      } catch (error) {
+        problems.push(`Could not build the script's environment: ${error.message}`);
+      }
+    }
+  } catch (error) {
+    console.warn(`[preflight] ${script.name}: ${error.message}`);
+    script.preflight = { status: 'error', checkedAt, problems: [error.message] };
+    return script.preflight;
+  }
+
+  problems.push(...reportProblems(report));
+  script.preflight = {
+    status: problems.length ? 'failed' : 'passed',
+    checkedAt,
+    python: report.python,
+    cacheTag: report.cacheTag,
+    environment: environment?.hash,
+    bytecodePath: report.bytecode ? path.relative(BACKEND_DIR, report.bytecode) : undefined,
+    syntaxError: report.syntaxError || undefined,
+    imports: report.imports,
+    argv: report.argv,
+    problems
+  };
+  return script.preflight;
+};
+
+const inProgress = new Map(); // script id -> Promise
+
+// Preflight a saved script in the background and store the outcome. Building
+// its environment may take minutes of pip install, far too long to hold an
+// HTTP request; callers set preflight.status to 'pending' first. A check
+// already running for the script is not started again.
+export const queuePreflight = (scriptId) => {
+  const id = String(scriptId);
+  if (inProgress.has(id)) return inProgress.get(id);
+
+  const check = (async () => {
+    const script = await Script.findById(id);
+    if (!script) return;
+    await runPreflight(script);
+    // Deleted meanwhile: nothing to store
+    if (await Script.exists({ _id: id })) await script.save();
+  })()
+    .catch(error => console.error(`[preflight] Background check of script ${id} failed:`, error.message))
+    .finally(() => inProgress.delete(id));
+
+  inProgress.set(id, check);
+  return check;
+};
+
+// Checks cut short by a restart are started again
+export const resumePendingPreflights = async () => {
+  const pending = await Script.find({ 'preflight.status': 'pending' }).distinct('_id');
+  if (pending.length) console.log(`[preflight] Resuming ${pending.length} pending check(s)`);
+  pending.forEach(id => queuePreflight(id));
+};
+
+// Why running `script` against `targets` ({ ips }) is bound to fail, from its
+// stored preflight and argument mode; empty when the run may go ahead (or
+// the script was never checked)
+export const preflightProblems = (script, targets = []) => {
+  const preflight = script.preflight;
+  if (!preflight?.status) return [];
+
+  const problems = preflight.status === 'failed' ? [...preflight.problems] : [];
+  const argv = preflight.argv || {};
+  const perProcess = script.argMode === 'per-ip' ? 1 : Math.max(0, ...targets.map(target => target.ips.length));
+
+  if (argv.max !== null && argv.max !== undefined && perProcess > argv.max) {
+    problems.push(`Script takes at most ${argv.max} argument(s) but argument mode '${script.argMode}' passes up to ${perProcess}`);
+  }
+  if (argv.min > 1 && script.argMode === 'per-ip') {
+    problems.push(`Script needs at least ${argv.min} arguments but argument mode 'per-ip' passes one`);
+  }
+  return problems;
+};
+
+// Absolute path of the script's compiled bytecode, when the preflight made one
+export const bytecodePath = (script) => {
+  const relative = script.preflight?.bytecodePath;
+  return relative ? path.resolve(BACKEND_DIR, relative) : undefined;
+};
@@ -0,0 +1,158 @@
+import net from 'net';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { spawn } from 'child_process';
+import { EventEmitter } from 'events';
+import { PassThrough } from 'stream';
+import { fileURLToPath } from 'url';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const RUNNER_MODE = process.env.PYTHON_RUNNER || 'cold';
+const SOCKET_PATH = process.env.PYTHON_RUNNER_SOCKET || '/tmp/automation-runner.sock';
+const RUNNER_DIR = path.resolve(__dirname, '../runner');
+const FORKSERVER = path.join(RUNNER_DIR, 'forkserver.py');
+export const PYTHON = process.env.PYTHON_BIN || 'python';
+
+// Python scripts see runner/ on their path, for `import automation_result`,
+// and write unbuffered: their stdout is a pipe, which Python would otherwise
+// block-buffer, holding live output back until the script exits
+export const pythonEnv = () => ({
+  ...process.env,
+  PYTHONUNBUFFERED: '1',
+  PYTHONPATH: [RUNNER_DIR, process.env.PYTHONPATH].filter(Boolean).join(path.delimiter)
+});
+
+let server = null;
+let ready = false;
+let socketPath = SOCKET_PATH;
+
+const waitForSocket = (timeoutMs) => new Promise((resolve, reject) => {
+  const deadline = Date.now() + timeoutMs;
+  const check = () => {
+    if (fs.existsSync(socketPath)) return resolve();
+    if (Date.now() > deadline) return reject(new Error('Python runner did not start in time'));
+    setTimeout(check, 100);
+  };
+  check();
+});
+
+// Start the fork-server when PYTHON_RUNNER=warm. Any failure leaves the
+// executor on plain spawn(), so a broken runner never blocks executions.
+// Processes sharing a host (e.g. several workers) need their own socket.
+export const startPythonRunner = async ({ socket = SOCKET_PATH } = {}) => {
+  if (RUNNER_MODE !== 'warm') return false;
+
+  socketPath = socket;
+  if (fs.existsSync(socketPath)) fs.unlinkSync(socketPath);
+
+  server = spawn(PYTHON, [FORKSERVER, '--socket', socketPath], { stdio: ['ignore', 'inherit', 'inherit'], env: pythonEnv() });
+  server.on('exit', (code, signal) => {
+    ready = false;
+    console.error(`[runner] Python runner exited (code ${code}, signal ${signal}); using cold spawn`);
+  });
+
+  try {
+    await waitForSocket(30000);
+    ready = true;
+  } catch (err) {
+    console.error('[runner]', err.message);
+    server.kill();
+  }
+  return ready;
+};
+
+export const stopPythonRunner = () => {
+  if (server) server.kill('SIGTERM');
+};
+
+export const isWarmRunnerReady = () => ready;
+
+// Run a Python script through the fork-server. Returns an object shaped like a
+// ChildProcess (stdout/stderr streams, kill(), 'error' and 'close' events) so
+// the executor can treat warm and cold runs the same way. `bytecode` is the
+// script's preflight .pyc, run instead of compiling the source again.
+export const runWarm = (scriptPath, args, { cwd, env, bytecode } = {}) => {
+  const child = new EventEmitter();
+  child.stdout = new PassThrough();
+  child.stderr = new PassThrough();
+  child.pid = undefined;
+
+  const socket = net.createConnection(socketPath);
+  let buffer = '';
+  let exited = false;
+
+  // Like a ChildProcess, 'close' follows the end of both output streams, so
+  // output still held back by a paused reader is not lost
+  const ended = Promise.all([child.stdout, child.stderr].map(stream => new Promise(resolve => stream.once('end', resolve))));
+
+  const finish = (code, signal) => {
+    if (exited) return;
+    exited = true;
+    child.stdout.end();
+    child.stderr.end();
+    socket.destroy();
+    ended.then(() => child.emit('close', code, signal));
+  };
+
+  // Stop reading the socket while a reader is behind: the fork-server then
+  // blocks on the socket and the script on its pipe, instead of Node
+  // buffering a chatty script's output without limit
+  const congested = new Set();
+  const relay = (stream, data) => {
+    if (stream.write(data) || congested.has(stream)) return;
+    congested.add(stream);
+    socket.pause();
+    stream.once('drain', () => {
+      congested.delete(stream);
+      if (congested.size === 0) socket.resume();
+    });
+  };
+
+  child.kill = (signal = 'SIGTERM') => {
+    if (exited) return false;
+    const signo = typeof signal === 'number' ? signal : os.constants.signals[signal];
+    socket.write(JSON.stringify({ signal: signo }) + '\n');
+    return true;
+  };
+
+  socket.setEncoding('utf8');
+  socket.on('connect', () => {
+    socket.write(JSON.stringify({ script: scriptPath, bytecode, args, cwd, env }) + '\n');
+  });
+
+  socket.on('data', (data) => {
+    buffer += data;
+    let newline;
+    while ((newline = buffer.indexOf('\n')) !== -1) {
+      const message = JSON.parse(buffer.slice(0, newline));
+      buffer = buffer.slice(newline + 1);
+
+      if (message.event === 'started') {
+        child.pid = message.pid;
+        child.emit('spawn');
+      } else if (message.event === 'stdout') {
+        relay(child.stdout, message.data);
+      } else if (message.event === 'stderr') {
+        relay(child.stderr, message.data);
+      } else if (message.event === 'exit') {
+        finish(message.code, message.signal);
+      }
+    }
+  });
+
+  socket.on('error', (err) => {
+    if (exited) return;
+    child.emit('error', err);
+    finish(null, null);
+  });
+
+  socket.on('close', () => finish(null, null));
+
+  return child;
+};
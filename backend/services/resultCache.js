@@ -0,0 +1,86 @@
+// Result cache for scripts that opt in with Script.resultCacheSeconds. A
+// target row is looked up when its execution is queued, by what makes two
+// runs identical: script content, argument mode, dependencies and the row's
+// arguments (the same key that lets runs share a process, see
+// sharedRuns.flightKey). A hit is copied into the row, marked as `cached`,
+// and no job is created for it. Jobs look again right before they start
+// (lookupJob), since an identical run may have finished while they were
+// queued. Results are stored when a run completes or fails as a check;
+// timeouts, cancellations, crashes and errors are not.
+import crypto from 'crypto';
+
+import ResultCache from '../models/ResultCache.js';
+import { flightKey } from './sharedRuns.js';
+
+const CACHEABLE = ['completed', 'failed'];
+const UNCACHEABLE_RESULTS = ['error', 'crashed', 'timeout', 'cancelled'];
+const FIELDS = ['status', 'output', 'error', 'outputLog', 'errorLog', 'result'];
+
+const enabled = (script) => script.resultCacheSeconds > 0 && Boolean(script.contentHash);
+
+export const cacheKey = (script, args) =>
+  crypto.createHash('sha256').update(flightKey(script, args)).digest('hex');
+
+// Cached entries for `rows` (Execution.targets rows), by row index
+export const lookup = async (script, rows) => {
+  if (!enabled(script) || rows.length === 0) return new Map();
+
+  const keys = rows.map(row => cacheKey(script, row.ips));
+  const entries = await ResultCache.find({ key: { $in: keys }, expiresAt: { $gt: new Date() } }).lean();
+  const byKey = new Map(entries.map(entry => [entry.key, entry]));
+
+  const hits = new Map();
+  keys.forEach((key, index) => {
+    if (byKey.has(key)) hits.set(index, byKey.get(key));
+  });
+  return hits;
+};
+
+// Row fields for a row served from `entry`
+export const cachedRow = (entry) => ({
+  ...entry.fields,
+  cached: { execution: entry.execution, target: entry.target, finishedAt: entry.finishedAt }
+});
+
+// The arguments a job's row `target` is cached under: its IP for a batch row
+const argsOf = (job, target) => {
+  const row = job.batch?.find(entry => String(entry.target) === String(target));
+  return row ? [row.ip] : job.args;
+};
+
+// runJob's [{ target, update }] for a queued job, when every one of its rows
+// has a cached result; otherwise null and the job runs
+export const lookupJob = async (script, job) => {
+  const targets = job.batch?.length ? job.batch.map(row => row.target) : [job.target];
+  const hits = await lookup(script, targets.map(target => ({ ips: argsOf(job, target) })));
+  if (hits.size < targets.length) return null;
+  return targets.map((target, index) => ({ target, update: cachedRow(hits.get(index)) }));
+};
+
+// Keep the results of a finished job. `results` is runJob's [{ target, update }].
+export const store = async (script, job, results) => {
+  if (!enabled(script)) return;
+
+  const now = new Date();
+  const expiresAt = new Date(now.getTime() + script.resultCacheSeconds * 1000);
+
+  const operations = results
+    .filter(({ update }) => CACHEABLE.includes(update.status) && !UNCACHEABLE_RESULTS.includes(update.result?.status))
+    .map(({ target, update }) => {
+      const args = argsOf(job, target);
+      const fields = Object.fromEntries(FIELDS.filter(field => update[field] !== undefined).map(field => [field, update[field]]));
+      return {
+        updateOne: {
+          filter: { key: cacheKey(script, args) },
+          update: {
+            $set: { script: script._id, args, execution: job.execution, target, fields, finishedAt: now, expiresAt }
+          },
+          upsert: true
+        }
+      };
+    });
+
+  if (operations.length) {
+    await ResultCache.bulkWrite(operations, { ordered: false });
+  }
+};
@@ -0,0 +1,84 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+import Execution from '../models/Execution.js';
+import { mongoWriteSeconds } from './metrics.js';
+
+dotenv.config();
+
+const FLUSH_INTERVAL_MS = parseInt(process.env.EXECUTOR_RESULT_FLUSH_MS, 10) || 50;
+const MAX_BATCH = parseInt(process.env.EXECUTOR_RESULT_BATCH_SIZE, 10) || 100;
+
+// Persists target results as they come in. Results that arrive within
+// `flushInterval` of each other are coalesced: all targets of one execution
+// become a single update (one arrayFilter per target row), and all executions
+// go out in one bulkWrite. write() resolves once the result is durable, so
+// callers can rely on it before marking their job finished.
+export class ResultWriter {
+  constructor({ flushInterval = FLUSH_INTERVAL_MS, maxBatch = MAX_BATCH } = {}) {
+    this.flushInterval = flushInterval;
+    this.maxBatch = maxBatch;
+
+    this.pending = new Map();  // executionId -> Map(targetId -> { id, fields })
+    this.waiters = [];         // { resolve, reject } of results in `pending`
+    this.size = 0;
+    this.timer = null;
+  }
+
+  // `fields` are target row fields, e.g. { status: 'completed', output: '...' }
+  write(executionId, targetId, fields) {
+    const key = executionId.toString();
+    if (!this.pending.has(key)) {
+      this.pending.set(key, new Map());
+    }
+    const targets = this.pending.get(key);
+    const previous = targets.get(targetId.toString())?.fields;
+    targets.set(targetId.toString(), { id: new mongoose.Types.ObjectId(targetId), fields: { ...previous, ...fields } });
+    this.size += 1;
+
+    const done = new Promise((resolve, reject) => this.waiters.push({ resolve, reject }));
+
+    if (this.size >= this.maxBatch) {
+      this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.flushInterval);
+    }
+    return done;
+  }
+
+  async flush() {
+    clearTimeout(this.timer);
+    this.timer = null;
+    if (this.size === 0) return;
+
+    const pending = this.pending;
+    const waiters = this.waiters;
+    this.pending = new Map();
+    this.waiters = [];
+    this.size = 0;
+
+    const operations = [...pending].map(([executionId, targets]) => {
+      const $set = {};
+      const arrayFilters = [];
+      [...targets.values()].forEach(({ id, fields }, index) => {
+        for (const [field, value] of Object.entries(fields)) {
+          $set[`targets.$[t${index}].${field}`] = value;
+        }
+        arrayFilters.push({ [`t${index}._id`]: id });
+      });
+      return { updateOne: { filter: { _id: executionId }, update: { $set }, arrayFilters } };
+    });
+
+    const written = mongoWriteSeconds.startTimer({ operation: 'result_flush' });
+    try {
+      await Execution.bulkWrite(operations, { ordered: false });
+      written();
+      waiters.forEach(({ resolve }) => resolve());
+    } catch (err) {
+      console.error(`[results] Failed to persist ${waiters.length} target result(s):`, err.message);
+      waiters.forEach(({ reject }) => reject(err));
+    }
+  }
+}
+
+export default new ResultWriter();
@@ -0,0 +1,169 @@
+import dotenv from 'dotenv';
+
+import Schedule from '../models/Schedule.js';
+import Script from '../models/Script.js';
+import Job from '../models/Job.js';
+import UserIpMapping from '../models/UserIpMapping.js';
+import { enqueueExecution } from './executionService.js';
+import { preflightProblems } from './preflight.js';
+
+dotenv.config();
+
+const TICK_MS = parseInt(process.env.SCHEDULER_TICK_MS, 10) || 5000;
+const MAX_DEFAULT_SPREAD_SECONDS = 60;
+
+const jitter = (schedule) => Math.round(Math.random() * (schedule.jitterSeconds || 0) * 1000);
+
+export const spreadMs = (schedule) =>
+  (schedule.spreadSeconds ?? Math.min(MAX_DEFAULT_SPREAD_SECONDS, schedule.intervalSeconds / 4)) * 1000;
+
+// First slot at or after `from` on the schedule's interval grid (anchored on
+// startAt), plus jitter. Null once the window has closed.
+export const nextRunAfter = (schedule, from = new Date()) => {
+  const interval = schedule.intervalSeconds * 1000;
+  const anchor = (schedule.startAt || schedule.createdAt || from).getTime();
+
+  let slot = anchor;
+  if (slot < from.getTime()) {
+    slot += Math.ceil((from.getTime() - anchor) / interval) * interval;
+  }
+
+  if (schedule.endAt && slot > schedule.endAt.getTime()) return null;
+  return new Date(slot + jitter(schedule));
+};
+
+// All mapped IPs, grouped per team, in the shape /execute takes
+const loadTargets = async () => {
+  const mappings = await UserIpMapping.find().populate('user', 'email').lean();
+  const byUser = new Map();
+
+  for (const mapping of mappings) {
+    if (!mapping.user) continue;
+    const key = mapping.user._id.toString();
+    if (!byUser.has(key)) {
+      byUser.set(key, { userId: mapping.user._id, userEmail: mapping.user.email, ips: [], description: '' });
+    }
+    byUser.get(key).ips.push(mapping.ip);
+  }
+
+  return [...byUser.values()].map(target => ({ ...target, description: `IPs: ${target.ips.join(', ')}` }));
+};
+
+// Drop targets whose previous run of this script has not finished yet
+const withoutInFlight = async (script, targets) => {
+  const inFlight = await Job.find({ script: script._id, status: { $in: ['queued', 'running'] } })
+    .select('user args')
+    .lean();
+  if (inFlight.length === 0) return { targets, skipped: 0 };
+
+  let skipped = 0;
+  if (script.argMode === 'all-ips') {
+    const busyUsers = new Set(inFlight.map(job => job.user?.toString()));
+    const remaining = targets.filter(target => !busyUsers.has(target.userId.toString()));
+    return { targets: remaining, skipped: targets.length - remaining.length };
+  }
+
+  const busyIps = new Set(inFlight.flatMap(job => job.args.map(ip => `${job.user}|${ip}`)));
+  const remaining = targets
+    .map(target => {
+      const ips = target.ips.filter(ip => !busyIps.has(`${target.userId}|${ip}`));
+      skipped += target.ips.length - ips.length;
+      return { ...target, ips };
+    })
+    .filter(target => target.ips.length > 0);
+  return { targets: remaining, skipped };
+};
+
+// Enqueue one round of a schedule: one execution per script
+export const runRound = async (schedule) => {
+  const scripts = schedule.script
+    ? await Script.find({ _id: schedule.script })
+    : await Script.find({ challenge: schedule.challenge });
+  const targets = await loadTargets();
+
+  const round = { executions: [], queuedTargets: 0, skippedTargets: 0 };
+  for (const script of scripts) {
+    const { targets: due, skipped } = await withoutInFlight(script, targets);
+    round.skippedTargets += skipped;
+    if (due.length === 0) continue;
+
+    const problems = preflightProblems(script, due);
+    if (problems.length) {
+      console.warn(`[scheduler] ${schedule.name}: not running ${script.name}: ${problems.join('; ')}`);
+      continue;
+    }
+
+    const { execution } = await enqueueExecution(script, due, {
+      timeoutSeconds: schedule.timeoutSeconds,
+      spreadMs: spreadMs(schedule),
+      schedule: schedule._id
+    });
+    round.executions.push(execution._id);
+    round.queuedTargets += execution.targets.length;
+  }
+
+  console.log(`[scheduler] ${schedule.name}: queued ${round.queuedTargets} target(s) across ${round.executions.length} script(s), skipped ${round.skippedTargets} still in flight`);
+  return round;
+};
+
+// Polls for due schedules. A round is claimed by moving the schedule's
+// nextRunAt forward conditionally, so it runs once even if several
+// processes poll the same collection.
+export class RoundScheduler {
+  constructor({ tickMs = TICK_MS } = {}) {
+    this.tickMs = tickMs;
+    this.timer = null;
+    this.ticking = false;
+  }
+
+  async start() {
+    // Schedules created or re-enabled without a next slot get one
+    const unplanned = await Schedule.find({ enabled: true, nextRunAt: null });
+    for (const schedule of unplanned) {
+      await Schedule.updateOne({ _id: schedule._id }, { $set: { nextRunAt: nextRunAfter(schedule) } });
+    }
+
+    this.timer = setInterval(() => this.tick(), this.tickMs);
+    this.timer.unref();
+    console.log(`[scheduler] Started (tick ${this.tickMs}ms)`);
+    this.tick();
+  }
+
+  stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+  }
+
+  async tick() {
+    if (this.ticking) return;
+    this.ticking = true;
+
+    try {
+      const now = new Date();
+      const due = await Schedule.find({ enabled: true, nextRunAt: { $lte: now } });
+
+      for (const schedule of due) {
+        // Missed slots (e.g. while the server was down) are skipped, not replayed
+        const nextRunAt = nextRunAfter(schedule, new Date(now.getTime() + 1));
+        const claimed = await Schedule.updateOne(
+          { _id: schedule._id, nextRunAt: schedule.nextRunAt },
+          { $set: { nextRunAt, lastRunAt: now, enabled: nextRunAt !== null } }
+        );
+        if (claimed.modifiedCount === 0) continue;
+
+        try {
+          const lastRound = await runRound(schedule);
+          await Schedule.updateOne({ _id: schedule._id }, { $set: { lastRound } });
+        } catch (err) {
+          console.error(`[scheduler] Round of ${schedule.name} failed:`, err.message);
+        }
+      }
+    } catch (err) {
+      console.error('[scheduler] Tick failed:', err.message);
+    } finally {
+      this.ticking = false;
+    }
+  }
+}
+
+export default new RoundScheduler();
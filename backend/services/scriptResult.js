@@ -0,0 +1,106 @@
+// Structured script results (see runner/automation_result.py). A script
+// prints one line `@@AUTOMATION_RESULT@@ {json}` on stdout; the executor
+// picks it out of the stream and stores a typed copy on the target row.
+// Scripts that don't use the helper get a result derived from how they
+// exited, so every finished row has a `result.status` to aggregate on.
+
+export const RESULT_MARKER = '@@AUTOMATION_RESULT@@';
+
+// Reported by scripts
+export const SCRIPT_STATUSES = ['success', 'partial', 'hardened', 'unreachable', 'timeout', 'error'];
+// Derived by the executor when there is no (valid) result line
+export const EXIT_STATUSES = ['success', 'failed', 'crashed', 'timeout', 'cancelled'];
+export const RESULT_STATUSES = [...new Set([...SCRIPT_STATUSES, ...EXIT_STATUSES])];
+export const CHECK_OUTCOMES = ['passed', 'failed', 'skipped', 'error'];
+
+const MAX_LINE_BYTES = 256 * 1024;
+const MAX_ENTRIES = 200;
+const MAX_TEXT = 2000;
+
+const text = (value) => (value === undefined || value === null ? undefined : String(value).slice(0, MAX_TEXT));
+const milliseconds = (value) => (Number.isFinite(value) && value >= 0 ? Math.round(value) : undefined);
+
+// Watches a stdout stream chunk by chunk and keeps the last result line.
+// Only the current partial line is buffered, so output size doesn't matter.
+export const createResultScanner = () => {
+  let partial = '';
+  let line = null;
+
+  const take = (candidate) => {
+    const start = candidate.indexOf(RESULT_MARKER);
+    if (start !== -1) line = candidate.slice(start + RESULT_MARKER.length).trim();
+  };
+
+  return {
+    push(data) {
+      const lines = (partial + data).split('\n');
+      partial = lines.pop();
+      lines.forEach(take);
+      if (partial.length > MAX_LINE_BYTES) partial = '';
+    },
+    line() {
+      take(partial);
+      partial = '';
+      return line;
+    }
+  };
+};
+
+// Validate a script's JSON payload into the Execution.targets[].result shape.
+// Returns null when the line isn't a usable result.
+export const parseResult = (line) => {
+  let payload;
+  try {
+    payload = JSON.parse(line);
+  } catch {
+    return null;
+  }
+  if (!payload || !SCRIPT_STATUSES.includes(payload.status)) return null;
+
+  const checks = Array.isArray(payload.checks) ? payload.checks : [];
+  const flags = Array.isArray(payload.flags) ? payload.flags : [];
+
+  return {
+    status: payload.status,
+    source: 'script',
+    message: text(payload.message),
+    durationMs: milliseconds(payload.durationMs),
+    checks: checks
+      .filter(check => check?.name && CHECK_OUTCOMES.includes(check.outcome))
+      .slice(0, MAX_ENTRIES)
+      .map(check => ({
+        name: text(check.name),
+        outcome: check.outcome,
+        durationMs: milliseconds(check.durationMs),
+        details: text(check.details)
+      })),
+    flags: flags
+      .filter(flag => flag?.name)
+      .slice(0, MAX_ENTRIES)
+      .map(flag => ({ name: text(flag.name), value: text(flag.value), source: text(flag.source) })),
+    data: payload.data && typeof payload.data === 'object' ? payload.data : undefined
+  };
+};
+
+// What a script without a result line told us by exiting
+export const exitResult = ({ exitCode, reason, stderr = '', durationMs }) => {
+  let status;
+  if (reason) {
+    status = reason;
+  } else if (exitCode === 0) {
+    status = 'success';
+  } else {
+    status = /Traceback \(most recent call last\)/.test(stderr) || exitCode === null ? 'crashed' : 'failed';
+  }
+  return { status, source: 'exit-code', exitCode, durationMs: milliseconds(durationMs) };
+};
+
+// The result stored for a finished run: the script's own report when it
+// gave one, with the executor's view of timeouts and cancellations winning
+export const targetResult = ({ line, exitCode, reason, stderr, durationMs }) => {
+  const reported = line ? parseResult(line) : null;
+  if (!reported || reason) {
+    return exitResult({ exitCode, reason, stderr, durationMs });
+  }
+  return { ...reported, exitCode, durationMs: reported.durationMs ?? milliseconds(durationMs) };
+};
@@ -0,0 +1,146 @@
+// Content-addressed script storage. An upload is hashed (sha256) while it
+// streams to a temp file and is then stored once as
+// uploads/scripts/<sha256>.<ext>; every Script with the same content points
+// its filePath at that one blob. A blob's reference count is the number of
+// Scripts whose filePath names it, so deleting a Script removes the file only
+// when nothing else uses it. Keying files by content also gives the runner a
+// stable key for per-script artifacts (bytecode, dependency checks).
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+import { pipeline } from 'stream/promises';
+import { fileURLToPath } from 'url';
+
+import Script from '../models/Script.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const BACKEND_DIR = path.resolve(__dirname, '..');
+export const SCRIPTS_DIR = 'uploads/scripts';
+const ARTIFACTS_DIR = 'uploads/cache';
+const BLOB_NAME = /^[0-9a-f]{64}\.[A-Za-z0-9]+$/;
+
+const absolute = (filePath) => path.resolve(BACKEND_DIR, filePath);
+
+export const blobPath = (contentHash, ext) => `${SCRIPTS_DIR}/${contentHash}.${ext}`;
+export const isBlobPath = (filePath) =>
+  path.dirname(filePath) === SCRIPTS_DIR && BLOB_NAME.test(path.basename(filePath));
+
+// Where artifacts derived from a blob's content (bytecode, ...) are kept
+export const artifactDir = (contentHash) => `${ARTIFACTS_DIR}/${contentHash}`;
+
+const extensionOf = (originalName) => originalName.split('.').pop().toLowerCase();
+
+const ignoreMissing = (error) => {
+  if (error.code !== 'ENOENT') throw error;
+};
+
+// commit() and release() of one blob run one at a time in this process
+const locks = new Map(); // filePath -> tail of its queue
+const serialize = (filePath, task) => {
+  const run = (locks.get(filePath) || Promise.resolve()).then(task);
+  const tail = run.catch(() => {});
+  locks.set(filePath, tail);
+  tail.then(() => {
+    if (locks.get(filePath) === tail) locks.delete(filePath);
+  });
+  return run;
+};
+
+// Stream `source` into a temp file next to the blobs, hashing on the way
+export const receive = async (source, originalName) => {
+  const dir = absolute(SCRIPTS_DIR);
+  await fs.promises.mkdir(dir, { recursive: true });
+
+  const tempPath = path.join(dir, `.upload-${process.pid}-${crypto.randomBytes(6).toString('hex')}.tmp`);
+  const hash = crypto.createHash('sha256');
+  let size = 0;
+
+  try {
+    await pipeline(
+      source,
+      async function* (chunks) {
+        for await (const chunk of chunks) {
+          hash.update(chunk);
+          size += chunk.length;
+          yield chunk;
+        }
+      },
+      fs.createWriteStream(tempPath)
+    );
+  } catch (error) {
+    await fs.promises.unlink(tempPath).catch(ignoreMissing);
+    throw error;
+  }
+
+  const contentHash = hash.digest('hex');
+  return { tempPath, size, contentHash, path: blobPath(contentHash, extensionOf(originalName)) };
+};
+
+// Move a received upload into place. Call after the Script referencing it
+// is saved, so a concurrent release() of the same blob counts that Script.
+// Renaming over an existing blob is harmless: the content is identical.
+export const commit = (file) => serialize(file.path, () =>
+  fs.promises.rename(file.tempPath, absolute(file.path)));
+
+// Drop a received upload that was never committed (validation failed)
+export const discard = async (file) => {
+  await fs.promises.unlink(file.tempPath).catch(ignoreMissing);
+};
+
+// The Script referencing `filePath` is gone; remove the file if it was the last.
+// Only files in the scripts directory are managed here.
+//
+// Another process may save a Script for the same content between the count
+// and the unlink, and commit() it (a rename over the blob) just before the
+// unlink. So the blob is first moved aside, counted again, and put back if
+// it gained a reference meanwhile.
+export const release = (filePath) => {
+  if (!filePath || path.dirname(filePath) !== SCRIPTS_DIR) return Promise.resolve(false);
+
+  return serialize(filePath, async () => {
+    if (await Script.countDocuments({ filePath }) > 0) return false;
+
+    const aside = absolute(`${SCRIPTS_DIR}/.release-${process.pid}-${crypto.randomBytes(6).toString('hex')}.tmp`);
+    try {
+      await fs.promises.rename(absolute(filePath), aside);
+    } catch (error) {
+      ignoreMissing(error);
+      return false;
+    }
+
+    if (await Script.countDocuments({ filePath }) > 0) {
+      // Renaming over a blob committed since is harmless: same content
+      await fs.promises.rename(aside, absolute(filePath));
+      return false;
+    }
+    await fs.promises.unlink(aside).catch(ignoreMissing);
+
+    if (isBlobPath(filePath)) {
+      const contentHash = path.basename(filePath).split('.')[0];
+      if (await Script.countDocuments({ contentHash }) === 0) {
+        await fs.promises.rm(absolute(artifactDir(contentHash)), { recursive: true, force: true });
+      }
+    }
+    return true;
+  });
+};
+
+// Hash a file already on disk and store it as a blob (used for files from
+// before content addressing). The original file is left for release().
+export const adopt = async (filePath) => {
+  const file = await receive(fs.createReadStream(absolute(filePath)), filePath);
+  await commit(file);
+  return file;
+};
+
+// multer storage engine: `req.file` gets { path, size, contentHash, tempPath }
+export const storage = () => ({
+  _handleFile(req, file, cb) {
+    receive(file.stream, file.originalname).then(info => cb(null, info), cb);
+  },
+  _removeFile(req, file, cb) {
+    discard(file).then(() => cb(null), cb);
+  }
+});
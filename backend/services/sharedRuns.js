@@ -0,0 +1,128 @@
+// Single-flight for target runs. Jobs that would start the same process
+// while it is already running -- same script content, argument mode,
+// dependencies and arguments, e.g. an operator's run and an Excel import
+// hitting the same team IP -- share it: the first job starts the process,
+// later ones attach to it, see its live output under their own target rows
+// and get a copy of its result, marked `shared`. The process keeps the
+// first job's timeout. It is only stopped once every attached job has been
+// cancelled; a job cancelled while others still wait detaches and reports
+// 'cancelled' at once. Jobs carry their key (Job.flightKey) so the worker
+// pool can hand identical queued jobs to the process running the first one.
+// A follower that arrives after the run has finished starts its own.
+import outputBus from './outputBus.js';
+import { exitResult } from './scriptResult.js';
+
+const STREAMS = ['stdout', 'stderr'];
+
+// Scripts without a content hash (not yet deduplicated) never share
+export const flightKey = (script, args) => (script.contentHash
+  ? JSON.stringify([script.contentHash, script.argMode, script.dependencies || [], args])
+  : null);
+
+// A job's target rows, in the order of its arguments
+const targetsOf = (job) => (job.batch?.length ? job.batch.map(row => row.target) : [job.target]);
+
+const cancelledRow = (durationMs) => ({
+  status: 'cancelled',
+  error: 'Cancelled by user',
+  result: exitResult({ exitCode: null, reason: 'cancelled', durationMs })
+});
+
+class Flight {
+  constructor(owner) {
+    this.owner = owner;
+    this.participants = new Set([owner]);
+    this.controller = new AbortController();
+    this.promise = null;
+  }
+
+  // Live output of the run's `position`-th row, to every attached job
+  chunk(position, stream, data) {
+    for (const participant of this.participants) {
+      outputBus.chunk(participant.execution, participant.targets[position], stream, data);
+    }
+  }
+}
+
+class SharedRuns {
+  constructor() {
+    this.flights = new Map(); // key -> Flight
+  }
+
+  // Run `start(signal, publish)` for `job`, or attach to the identical run
+  // in progress. `start` resolves to [{ target, update }] in argument order
+  // and streams through publish(position, stream, data). Resolves to the
+  // job's own rows.
+  async run(script, job, signal, start) {
+    const participant = { execution: job.execution, targets: targetsOf(job) };
+    const key = job.flightKey || flightKey(script, job.args);
+    if (!key) {
+      return start(signal, (position, stream, data) =>
+        outputBus.chunk(participant.execution, participant.targets[position], stream, data));
+    }
+
+    let flight = this.flights.get(key);
+    // A run being stopped is not joined; a new one replaces it
+    if (flight && !flight.controller.signal.aborted) {
+      console.log(`[shared] ${script.name} (${job.args.join(', ')}): attached to the run of execution ${flight.owner.execution}`);
+      this.replay(flight, participant);
+      flight.participants.add(participant);
+    } else {
+      flight = new Flight(participant);
+      this.flights.set(key, flight);
+      flight.promise = Promise.resolve()
+        .then(() => start(flight.controller.signal, (...chunk) => flight.chunk(...chunk)))
+        .finally(() => {
+          if (this.flights.get(key) === flight) this.flights.delete(key);
+        });
+      // Nobody may be waiting any more when it settles
+      flight.promise.catch(() => {});
+    }
+
+    const attachedAt = Date.now();
+    let onAbort;
+    const detached = new Promise((resolve) => {
+      onAbort = () => {
+        flight.participants.delete(participant);
+        if (flight.participants.size === 0) {
+          // The last one stops the process and waits for its actual result
+          flight.controller.abort();
+        } else {
+          resolve(null);
+        }
+      };
+      if (signal?.aborted) {
+        onAbort();
+      } else {
+        signal?.addEventListener('abort', onAbort, { once: true });
+      }
+    });
+
+    try {
+      const results = await Promise.race([flight.promise, detached]);
+      if (!results) {
+        return participant.targets.map(target => ({ target, update: cancelledRow(Date.now() - attachedAt) }));
+      }
+      if (participant === flight.owner) return results;
+      return results.map(({ update }, position) => ({
+        target: participant.targets[position],
+        update: { ...update, shared: { execution: flight.owner.execution, target: flight.owner.targets[position] } }
+      }));
+    } finally {
+      signal?.removeEventListener('abort', onAbort);
+      flight.participants.delete(participant);
+    }
+  }
+
+  // Catch a late joiner up on the output so far
+  replay(flight, participant) {
+    flight.owner.targets.forEach((target, position) => {
+      const tail = outputBus.tail(target);
+      STREAMS.forEach((stream) => {
+        if (tail?.[stream]) outputBus.chunk(participant.execution, participant.targets[position], stream, tail[stream]);
+      });
+    });
+  }
+}
+
+export default new SharedRuns();
@@ -0,0 +1,89 @@
+const MAX_BUFFERED_BYTES = parseInt(process.env.STREAM_MAX_BUFFERED_BYTES, 10) || 256 * 1024;
+const HEARTBEAT_MS = 15000;
+
+// Wrap an Express response as a Server-Sent Events stream with backpressure.
+// While the socket is congested, events queue up to `maxBufferedBytes`; beyond
+// that the oldest chunk events are dropped and the client is told how many
+// bytes it missed, so a slow browser can never grow server memory unbounded.
+export const openEventStream = (res, { maxBufferedBytes = MAX_BUFFERED_BYTES } = {}) => {
+  res.set({
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.flushHeaders();
+
+  const queue = [];
+  let queuedBytes = 0;
+  let droppedBytes = 0;
+  let congested = false;
+  let closed = false;
+
+  const frame = (event, data) => `event: ${event}\ndata: ${JSON.stringify(data)}\n\n`;
+
+  const flush = () => {
+    congested = false;
+    if (droppedBytes > 0) {
+      const notice = frame('dropped', { bytes: droppedBytes });
+      droppedBytes = 0;
+      if (!res.write(notice)) {
+        congested = true;
+        return;
+      }
+    }
+    while (queue.length > 0) {
+      const { text } = queue.shift();
+      queuedBytes -= text.length;
+      if (!res.write(text)) {
+        congested = true;
+        return;
+      }
+    }
+  };
+
+  const send = (event, data) => {
+    if (closed) return;
+    const text = frame(event, data);
+
+    if (!congested) {
+      congested = !res.write(text);
+      return;
+    }
+
+    queue.push({ event, text });
+    queuedBytes += text.length;
+
+    // Shed the oldest output chunks first; status events are small and kept
+    while (queuedBytes > maxBufferedBytes) {
+      const index = queue.findIndex(item => item.event === 'chunk');
+      if (index === -1) break;
+      const [dropped] = queue.splice(index, 1);
+      queuedBytes -= dropped.text.length;
+      droppedBytes += dropped.text.length;
+    }
+  };
+
+  res.on('drain', flush);
+
+  const heartbeat = setInterval(() => {
+    if (!congested) res.write(': ping\n\n');
+  }, HEARTBEAT_MS);
+
+  const cleanups = [];
+  const close = () => {
+    if (closed) return;
+    closed = true;
+    clearInterval(heartbeat);
+    cleanups.forEach(fn => fn());
+    res.end();
+  };
+
+  res.on('close', close);
+
+  return {
+    send,
+    close,
+    onClose: (fn) => cleanups.push(fn)
+  };
+};
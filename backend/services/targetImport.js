@@ -0,0 +1,205 @@
+import fs from 'fs';
+import path from 'path';
+import readline from 'readline';
+import { Worker } from 'worker_threads';
+import { fileURLToPath } from 'url';
+
+import dotenv from 'dotenv';
+
+import User from '../models/User.js';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const WORKBOOK_THREAD = path.join(path.dirname(__filename), 'threads', 'workbookRows.js');
+
+const USER_LOOKUP_BATCH = 1000;
+// xlsx has no streaming reader: a workbook is parsed whole, in memory (in
+// its worker thread), so only CSV imports run in bounded memory. Workbooks
+// above this size are refused; large target lists go in as CSV.
+const WORKBOOK_MAX_BYTES = parseInt(process.env.IMPORT_WORKBOOK_MAX_BYTES, 10) || 10 * 1024 * 1024;
+const MAX_REPORTED_ERRORS = 200;
+const IP_PATTERN = /^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$/;
+const IP_COLUMN = /^IP\d*$/;
+
+// The uploaded file could not be read as a sheet (as opposed to, say, the
+// user lookup failing). The message is meant for the uploader.
+export class TargetFileError extends Error {}
+
+// IP before IP1, IP2 before IP10
+const ipColumnIndex = (key) => Number(key.slice(2)) || 0;
+
+// Split one CSV line, honouring double-quoted fields ("a,b" and "" escapes)
+const splitCsvLine = (line) => {
+  const fields = [];
+  let field = '';
+  let quoted = false;
+
+  for (let i = 0; i < line.length; i++) {
+    const char = line[i];
+    if (quoted) {
+      if (char === '"' && line[i + 1] === '"') {
+        field += '"';
+        i++;
+      } else if (char === '"') {
+        quoted = false;
+      } else {
+        field += char;
+      }
+    } else if (char === '"') {
+      quoted = true;
+    } else if (char === ',') {
+      fields.push(field);
+      field = '';
+    } else {
+      field += char;
+    }
+  }
+  fields.push(field);
+  return fields;
+};
+
+// CSV fast path: read line by line, never holding the whole file
+async function* csvRows(filePath) {
+  const lines = readline.createInterface({ input: fs.createReadStream(filePath), crlfDelay: Infinity });
+  let header = null;
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    const fields = splitCsvLine(line);
+    if (!header) {
+      header = fields.map(name => name.replace(/^\uFEFF/, '').trim());
+      continue;
+    }
+    yield Object.fromEntries(header.map((name, index) => [name, fields[index]?.trim() ?? '']));
+  }
+}
+
+// Workbooks are parsed in a worker thread (xlsx parsing is CPU-bound and
+// synchronous) and pulled over in batches as the import consumes them. The
+// parse itself holds the whole workbook, hence WORKBOOK_MAX_BYTES.
+async function* workbookRows(filePath) {
+  const { size } = await fs.promises.stat(filePath);
+  if (size > WORKBOOK_MAX_BYTES) {
+    throw new TargetFileError(
+      `Workbook is larger than ${Math.floor(WORKBOOK_MAX_BYTES / (1024 * 1024))} MB; save it as CSV, which is imported row by row`
+    );
+  }
+
+  const worker = new Worker(WORKBOOK_THREAD, { workerData: { filePath } });
+  const nextBatch = () => new Promise((resolve, reject) => {
+    const onError = (err) => {
+      worker.off('message', onMessage);
+      reject(err);
+    };
+    const onMessage = (message) => {
+      worker.off('error', onError);
+      message.error ? reject(new Error(message.error)) : resolve(message);
+    };
+    worker.once('message', onMessage);
+    worker.once('error', onError);
+    worker.postMessage('next');
+  });
+
+  try {
+    for (;;) {
+      const { rows, done } = await nextBatch();
+      yield* rows;
+      if (done) return;
+    }
+  } finally {
+    worker.terminate();
+  }
+}
+
+export const isCsvFile = (filename) => path.extname(filename || '').toLowerCase() === '.csv';
+
+// Failures reading the file surface as TargetFileError
+async function* fileRows(rows) {
+  try {
+    yield* rows;
+  } catch (err) {
+    if (err instanceof TargetFileError) throw err;
+    throw new TargetFileError('Invalid Excel file format', { cause: err });
+  }
+}
+
+export const readTargetRows = (filePath, originalName) =>
+  fileRows(isCsvFile(originalName) ? csvRows(filePath) : workbookRows(filePath));
+
+// Turn sheet rows (UserEmail, IP/IP1/IP2..., Description) into execution
+// targets. Emails are resolved in batches against a Map, so each row costs
+// one lookup instead of a scan over every user.
+export const importTargets = async (rows) => {
+  const targets = [];
+  const errors = [];
+  const usersByEmail = new Map();
+  let totalRows = 0;
+  let errorCount = 0;
+  let batch = [];
+
+  const addError = (message) => {
+    errorCount += 1;
+    if (errors.length < MAX_REPORTED_ERRORS) errors.push(message);
+  };
+
+  const resolveBatch = async () => {
+    const unknown = [...new Set(batch.map(entry => entry.email))].filter(email => !usersByEmail.has(email));
+    if (unknown.length > 0) {
+      const users = await User.find({ email: { $in: unknown } }).select('_id email').lean();
+      users.forEach(user => usersByEmail.set(user.email, user._id));
+      unknown.forEach(email => {
+        if (!usersByEmail.has(email)) usersByEmail.set(email, null);
+      });
+    }
+
+    for (const { email, ips, description, rowNumber } of batch) {
+      const userId = usersByEmail.get(email);
+      if (!userId) {
+        addError(`Row ${rowNumber}: User not found - ${email}`);
+        continue;
+      }
+      targets.push({ userId, userEmail: email, ips, description });
+    }
+    batch = [];
+  };
+
+  for await (const row of rows) {
+    totalRows += 1;
+    const rowNumber = totalRows + 1;  // header is row 1
+
+    if (!row.UserEmail) {
+      addError(`Row ${rowNumber}: Missing UserEmail`);
+      continue;
+    }
+
+    // Extract all IP columns (IP, IP1, IP2, ...) in column order
+    const ips = Object.keys(row)
+      .filter(key => IP_COLUMN.test(key))
+      .sort((a, b) => ipColumnIndex(a) - ipColumnIndex(b))
+      .map(key => row[key])
+      .filter(ip => ip && typeof ip === 'string' && ip.trim() !== '');
+
+    if (ips.length === 0) {
+      addError(`Row ${rowNumber}: No valid IPs found for user - ${row.UserEmail}`);
+      continue;
+    }
+
+    const invalidIPs = ips.filter(ip => !IP_PATTERN.test(ip));
+    if (invalidIPs.length > 0) {
+      addError(`Row ${rowNumber}: Invalid IP format(s) - ${invalidIPs.join(', ')}`);
+      continue;
+    }
+
+    batch.push({
+      email: row.UserEmail,
+      ips,
+      description: row.Description || `IPs: ${ips.join(', ')}`,
+      rowNumber
+    });
+    if (batch.length >= USER_LOOKUP_BATCH) await resolveBatch();
+  }
+  await resolveBatch();
+
+  return { targets, errors, errorCount, totalRows };
+};
@@ -0,0 +1,72 @@
+import os from 'os';
+import path from 'path';
+import { Worker } from 'worker_threads';
+import { fileURLToPath } from 'url';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const POOL_SIZE = parseInt(process.env.CPU_THREADS, 10) || Math.min(4, os.cpus().length);
+const TASKS_FILE = path.join(__dirname, 'threads', 'cpuTasks.js');
+
+// Small fixed pool of worker threads for CPU-bound request work (password
+// hashing), so it runs in parallel and off the event loop. Threads start on
+// first use; idle threads are unref'd so they never keep the process alive.
+class ThreadPool {
+  constructor(size = POOL_SIZE) {
+    this.size = size;
+    this.idle = [];
+    this.threads = 0;
+    this.queue = [];     // { task, args, resolve, reject } waiting for a thread
+    this.nextId = 0;
+  }
+
+  spawn() {
+    const worker = new Worker(TASKS_FILE);
+    worker.on('error', (err) => {
+      console.error('[threads] Worker thread failed:', err.message);
+      worker.current?.reject(err);
+      this.threads -= 1;
+      this.idle = this.idle.filter(idle => idle !== worker);
+      this.dispatch();
+    });
+    worker.on('message', ({ id, result, error }) => {
+      const current = worker.current;
+      worker.current = null;
+      if (current?.id === id) {
+        error ? current.reject(new Error(error)) : current.resolve(result);
+      }
+      worker.unref();
+      this.idle.push(worker);
+      this.dispatch();
+    });
+    this.threads += 1;
+    return worker;
+  }
+
+  run(task, ...args) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, task, args, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  dispatch() {
+    while (this.queue.length > 0) {
+      let worker = this.idle.pop();
+      if (!worker) {
+        if (this.threads >= this.size) return;
+        worker = this.spawn();
+      }
+      const job = this.queue.shift();
+      worker.current = job;
+      worker.ref();
+      worker.postMessage({ id: job.id, task: job.task, args: job.args });
+    }
+  }
+}
+
+export default new ThreadPool();
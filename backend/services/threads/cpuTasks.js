@@ -0,0 +1,15 @@
+// Runs inside ThreadPool worker threads; one message in, one reply out.
+import { parentPort } from 'worker_threads';
+import bcrypt from 'bcryptjs';
+
+const tasks = {
+  comparePassword: (password, hash) => bcrypt.compareSync(password, hash)
+};
+
+parentPort.on('message', ({ id, task, args }) => {
+  try {
+    parentPort.postMessage({ id, result: tasks[task](...args) });
+  } catch (err) {
+    parentPort.postMessage({ id, error: err.message });
+  }
+});
@@ -0,0 +1,57 @@
+// Parses an uploaded workbook off the event loop and hands its first sheet
+// back in batches of row records, one batch per 'next' request. xlsx reads
+// the whole workbook at once, so memory grows with the file; the caller
+// caps workbook size (CSV is the streaming path).
+import { parentPort, workerData } from 'worker_threads';
+import xlsx from 'xlsx';
+
+const BATCH_ROWS = 500;
+
+function* rows(filePath) {
+  const workbook = xlsx.readFile(filePath, {
+    dense: true,
+    sheets: 0,
+    cellFormula: false,
+    cellHTML: false,
+    cellText: false,
+    cellStyles: false
+  });
+  const sheet = workbook.Sheets[workbook.SheetNames[0]];
+  if (!sheet?.['!ref']) return;
+
+  const data = sheet['!data'] || sheet;
+  const range = xlsx.utils.decode_range(sheet['!ref']);
+  const header = [];
+  for (let col = range.s.c; col <= range.e.c; col++) {
+    header[col] = String(data[range.s.r]?.[col]?.v ?? '').trim();
+  }
+
+  for (let row = range.s.r + 1; row <= range.e.r; row++) {
+    const cells = data[row];
+    if (!cells) continue;
+    const record = {};
+    for (let col = range.s.c; col <= range.e.c; col++) {
+      const value = cells[col]?.v;
+      if (header[col] && value !== undefined && value !== '') {
+        record[header[col]] = typeof value === 'string' ? value.trim() : String(value);
+      }
+    }
+    if (Object.keys(record).length > 0) yield record;
+  }
+}
+
+let iterator;
+
+parentPort.on('message', () => {
+  try {
+    iterator ??= rows(workerData.filePath);
+    const batch = [];
+    for (let next = iterator.next(); !next.done; next = iterator.next()) {
+      batch.push(next.value);
+      if (batch.length >= BATCH_ROWS) break;
+    }
+    parentPort.postMessage({ rows: batch, done: batch.length < BATCH_ROWS });
+  } catch (err) {
+    parentPort.postMessage({ error: err.message });
+  }
+});
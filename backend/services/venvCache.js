@@ -0,0 +1,182 @@
+// One virtualenv per dependency set, shared by every Script that needs the
+// same packages. Environments are built once, offline, from a local
+// wheelhouse (pip --no-index --find-links PYTHON_WHEELHOUSE), kept under
+// PYTHON_VENV_DIR/<hash>, and reused by later runs at no install cost.
+// Beyond PYTHON_VENV_MAX environments the least recently used are removed,
+// but never one used within PYTHON_VENV_GRACE_MS (it may still be running).
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+import { spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+import dotenv from 'dotenv';
+
+import { PYTHON } from './pythonRunner.js';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const BACKEND_DIR = path.resolve(__dirname, '..');
+const VENV_DIR = path.resolve(BACKEND_DIR, process.env.PYTHON_VENV_DIR || 'venvs');
+const WHEELHOUSE = path.resolve(BACKEND_DIR, process.env.PYTHON_WHEELHOUSE || 'wheelhouse');
+const VENV_MAX = parseInt(process.env.PYTHON_VENV_MAX, 10) || 20;
+const VENV_GRACE_MS = parseInt(process.env.PYTHON_VENV_GRACE_MS, 10) || 15 * 60 * 1000;
+const BUILD_TIMEOUT_MS = parseInt(process.env.PYTHON_VENV_BUILD_TIMEOUT_MS, 10) || 5 * 60 * 1000;
+const TOUCH_INTERVAL_MS = 60 * 1000;
+
+const MARKER = '.last-used';
+const HASH_LENGTH = 16;
+
+// name[extras] followed by optional version clauses, e.g. impacket==0.11.0,
+// requests[socks]>=2.31,<3. Nothing that pip could read as an option.
+const REQUIREMENT = /^([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)(\[[A-Za-z0-9._,-]+\])?((?:\s*(?:===|==|~=|!=|<=|>=|<|>)\s*[A-Za-z0-9.*+!_-]+\s*,?)*)$/;
+
+export class DependencyError extends Error {}
+
+// Canonical form of a requirement list: names normalised (PEP 503),
+// whitespace dropped, duplicates removed, sorted. Throws DependencyError on
+// anything that isn't a plain requirement.
+export const normalizeDependencies = (dependencies = []) => {
+  const normalized = dependencies
+    .map(entry => String(entry).trim())
+    .filter(Boolean)
+    .map((entry) => {
+      const match = REQUIREMENT.exec(entry);
+      if (!match) throw new DependencyError(`Invalid dependency: ${entry}`);
+      const name = match[1].toLowerCase().replace(/[-_.]+/g, '-');
+      return `${name}${match[2] || ''}${match[3].replace(/\s+/g, '')}`;
+    });
+  return [...new Set(normalized)].sort();
+};
+
+// `isolated` environments see only their own packages; the others (used for
+// inferred dependencies) also see the base interpreter's site-packages.
+export const environmentHash = (dependencies, { isolated = true } = {}) =>
+  crypto.createHash('sha256')
+    .update(JSON.stringify({ python: PYTHON, isolated, dependencies: normalizeDependencies(dependencies) }))
+    .digest('hex')
+    .slice(0, HASH_LENGTH);
+
+const environmentDir = (hash) => path.join(VENV_DIR, hash);
+const pythonOf = (dir) => path.join(dir, 'bin', 'python');
+
+const run = (command, args) => new Promise((resolve, reject) => {
+  const child = spawn(command, args, { stdio: ['ignore', 'pipe', 'pipe'] });
+  let output = '';
+  const timer = setTimeout(() => child.kill('SIGKILL'), BUILD_TIMEOUT_MS);
+  child.stdout.setEncoding('utf8').on('data', data => { output += data; });
+  child.stderr.setEncoding('utf8').on('data', data => { output += data; });
+  child.on('error', (error) => {
+    clearTimeout(timer);
+    reject(error);
+  });
+  child.on('close', (code, signal) => {
+    clearTimeout(timer);
+    if (code === 0) return resolve(output);
+    const last = output.trim().split('\n').slice(-3).join(' ');
+    reject(new Error(`${path.basename(command)} ${args.slice(0, 3).join(' ')} failed (${signal || `exit ${code}`}): ${last}`));
+  });
+});
+
+class VenvCache {
+  constructor() {
+    this.building = new Map(); // hash -> Promise
+    this.touched = new Map(); // hash -> last marker update (ms)
+  }
+
+  // Python interpreter of the environment for `dependencies`, building it
+  // first if needed. Concurrent callers for the same set share one build.
+  async ensure(dependencies, { isolated = true } = {}) {
+    const hash = environmentHash(dependencies, { isolated });
+    const dir = environmentDir(hash);
+
+    if (fs.existsSync(path.join(dir, MARKER))) {
+      await this.touch(hash);
+      return { hash, python: pythonOf(dir) };
+    }
+
+    if (!this.building.has(hash)) {
+      const build = this.build(hash, normalizeDependencies(dependencies), isolated)
+        .finally(() => this.building.delete(hash));
+      this.building.set(hash, build);
+    }
+    await this.building.get(hash);
+    return { hash, python: pythonOf(dir) };
+  }
+
+  // Build into a temporary directory and rename it into place, so a
+  // half-built environment is never used. Another process may win the
+  // rename; its environment is then used instead. The interpreter finds
+  // its pyvenv.cfg relative to itself, so the renamed environment works.
+  async build(hash, dependencies, isolated) {
+    const dir = environmentDir(hash);
+    const staging = path.join(VENV_DIR, `.build-${hash}-${process.pid}`);
+    const started = Date.now();
+
+    await fs.promises.mkdir(VENV_DIR, { recursive: true });
+    await fs.promises.rm(staging, { recursive: true, force: true });
+    try {
+      await run(PYTHON, ['-m', 'venv', ...(isolated ? [] : ['--system-site-packages']), staging]);
+      if (dependencies.length) {
+        await run(pythonOf(staging), [
+          '-m', 'pip', 'install', '--no-index', '--find-links', WHEELHOUSE,
+          '--disable-pip-version-check', '--no-input', '--quiet', ...dependencies
+        ]);
+      }
+      await fs.promises.writeFile(path.join(staging, 'requirements.txt'), dependencies.join('\n') + '\n');
+      await fs.promises.writeFile(path.join(staging, MARKER), '');
+      await fs.promises.rename(staging, dir).catch((error) => {
+        if (!['ENOTEMPTY', 'EEXIST'].includes(error.code)) throw error;
+      });
+    } finally {
+      await fs.promises.rm(staging, { recursive: true, force: true });
+    }
+
+    console.log(`[venv] Built ${hash} (${dependencies.join(' ') || 'no packages'}) in ${Date.now() - started} ms`);
+    this.touched.set(hash, Date.now());
+    await this.collect().catch(error => console.warn('[venv] Clean-up failed:', error.message));
+  }
+
+  // Record a use; the marker's mtime is the LRU clock shared by processes
+  async touch(hash) {
+    const now = Date.now();
+    if (now - (this.touched.get(hash) || 0) < TOUCH_INTERVAL_MS) return;
+    this.touched.set(hash, now);
+    const time = new Date(now);
+    await fs.promises.utimes(path.join(environmentDir(hash), MARKER), time, time).catch(() => {});
+  }
+
+  // Remove least recently used environments beyond VENV_MAX
+  async collect() {
+    const entries = await fs.promises.readdir(VENV_DIR, { withFileTypes: true });
+    const environments = [];
+    for (const entry of entries) {
+      if (!entry.isDirectory() || entry.name.startsWith('.')) continue;
+      const stat = await fs.promises.stat(path.join(VENV_DIR, entry.name, MARKER)).catch(() => null);
+      if (stat) environments.push({ hash: entry.name, usedAt: stat.mtimeMs });
+    }
+
+    environments.sort((a, b) => a.usedAt - b.usedAt);
+    const idleBefore = Date.now() - VENV_GRACE_MS;
+    for (const environment of environments.slice(0, Math.max(0, environments.length - VENV_MAX))) {
+      if (environment.usedAt > idleBefore) break;
+      await fs.promises.rm(environmentDir(environment.hash), { recursive: true, force: true });
+      this.touched.delete(environment.hash);
+      console.log(`[venv] Removed ${environment.hash} (last used ${new Date(environment.usedAt).toISOString()})`);
+    }
+  }
+}
+
+const venvCache = new VenvCache();
+
+// Interpreter to run `script` with: its environment's when it has
+// dependencies, otherwise null (the shared interpreter / fork-server)
+export const pythonFor = async (script) => {
+  if (!script.dependencies?.length) return null;
+  const { python } = await venvCache.ensure(script.dependencies, { isolated: script.dependencySource !== 'inferred' });
+  return python;
+};
+
+export default venvCache;
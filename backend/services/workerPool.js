@@ -0,0 +1,436 @@
+import os from 'os';
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+import Job from '../models/Job.js';
+import Execution from '../models/Execution.js';
+import { FairShare, fairKey } from './fairShare.js';
+import { mongoWriteSeconds } from './metrics.js';
+
+dotenv.config();
+
+const DEFAULT_MAX_CONCURRENCY = parseInt(process.env.EXECUTOR_MAX_CONCURRENCY, 10) || os.cpus().length * 2;
+const DEFAULT_MAX_PER_SCRIPT = parseInt(process.env.EXECUTOR_MAX_PER_SCRIPT, 10) || DEFAULT_MAX_CONCURRENCY;
+const DEFAULT_POLL_INTERVAL = parseInt(process.env.EXECUTOR_POLL_INTERVAL_MS, 10) || 1000;
+const DEFAULT_MAX_PER_IP = parseInt(process.env.EXECUTOR_MAX_PER_IP, 10) || 1;
+const DEFAULT_LEASE_MS = parseInt(process.env.EXECUTOR_LEASE_MS, 10) || 30000;
+const DEFAULT_HEARTBEAT_MS = parseInt(process.env.EXECUTOR_HEARTBEAT_MS, 10) || 5000;
+
+// Pulls queued jobs out of Mongo and runs at most `maxConcurrency` of them at
+// once. Free slots go to (team, challenge) queues in weighted fair order.
+//
+// The per-script (`maxPerScript` / Script.maxConcurrency) and per-IP
+// (`maxPerIp`) caps are global: they count running jobs in the shared queue,
+// whichever pool runs them. Two pools claiming against the same cap at once
+// are settled after the claim: the later claim goes back to the queue.
+//
+// Queued jobs identical to a run in progress (same Job.flightKey) are not
+// claimed on their own: the pool running the first one attaches them to it
+// (`attachedTo`), and they share its process (services/sharedRuns.js).
+// Attached jobs take no slot and count against no cap.
+//
+// Any number of pools (API process or `node worker.js`, on any host) can
+// share the queue. A claimed job carries a lease that its pool renews on
+// every heartbeat; jobs whose lease ran out belong to a pool that died and
+// are put back in the queue by whichever pool notices first.
+export class WorkerPool {
+  constructor({
+    runJob,
+    maxConcurrency = DEFAULT_MAX_CONCURRENCY,
+    maxPerScript = DEFAULT_MAX_PER_SCRIPT,
+    maxPerIp = DEFAULT_MAX_PER_IP,
+    pollInterval = DEFAULT_POLL_INTERVAL,
+    leaseMs = DEFAULT_LEASE_MS,
+    heartbeatMs = DEFAULT_HEARTBEAT_MS
+  }) {
+    this.runJob = runJob;
+    this.maxConcurrency = maxConcurrency;
+    this.maxPerScript = maxPerScript;
+    this.maxPerIp = maxPerIp;
+    this.pollInterval = pollInterval;
+    this.leaseMs = leaseMs;
+    this.heartbeatMs = heartbeatMs;
+    this.workerId = `${os.hostname()}:${process.pid}:${Math.random().toString(36).slice(2, 8)}`;
+
+    this.running = new Map();       // jobId -> { job, controller }
+    this.fairShare = new FairShare();
+    this.filling = false;
+    this.refill = false;
+    this.timer = null;
+    this.heartbeatTimer = null;
+    this.draining = false;
+  }
+
+  async start() {
+    // Running jobs from before leases existed have no owner to renew them
+    await Job.updateMany(
+      { status: 'running', leaseOwner: { $exists: false } },
+      { $set: { leaseExpiresAt: new Date(0) } }
+    );
+    await this.reclaimExpired();
+
+    // Jobs queued before runAfter existed are due immediately
+    await Job.updateMany(
+      { status: 'queued', runAfter: { $exists: false } },
+      [{ $set: { runAfter: '$createdAt' } }]
+    );
+
+    this.timer = setInterval(() => this.fill(), this.pollInterval);
+    this.timer.unref();
+    this.heartbeatTimer = setInterval(() => this.heartbeat(), this.heartbeatMs);
+    this.heartbeatTimer.unref();
+    console.log(`[pool] Worker ${this.workerId} started (max ${this.maxConcurrency} concurrent, ${this.maxPerScript} per script, ${this.maxPerIp} per IP)`);
+    this.fill();
+  }
+
+  stop() {
+    clearInterval(this.timer);
+    clearInterval(this.heartbeatTimer);
+    this.timer = null;
+    this.heartbeatTimer = null;
+  }
+
+  // Stop claiming and wait for running jobs to finish (heartbeats continue)
+  async drain() {
+    clearInterval(this.timer);
+    this.timer = null;
+    this.draining = true;
+    while (this.running.size > 0) {
+      await new Promise(resolve => setTimeout(resolve, 200));
+    }
+    this.stop();
+  }
+
+  // Put jobs whose owner stopped renewing their lease back in the queue
+  async reclaimExpired() {
+    const now = new Date();
+    const { modifiedCount } = await Job.updateMany(
+      { status: 'running', leaseExpiresAt: { $lt: now } },
+      {
+        $set: { status: 'queued', runAfter: now },
+        $unset: { leaseOwner: 1, leaseExpiresAt: 1, startedAt: 1, attachedTo: 1 }
+      }
+    );
+    if (modifiedCount) {
+      console.log(`[pool] Reclaimed ${modifiedCount} job(s) with an expired lease`);
+      this.notify();
+    }
+    return modifiedCount;
+  }
+
+  // Renew our leases, give up jobs we no longer own, pick up cancellations
+  // made through another process, and reclaim other pools' expired jobs
+  async heartbeat() {
+    try {
+      if (this.running.size > 0) {
+        const ids = [...this.running.values()].map(({ job }) => job._id);
+        const { matchedCount } = await Job.updateMany(
+          { _id: { $in: ids }, status: 'running', leaseOwner: this.workerId },
+          { $set: { leaseExpiresAt: new Date(Date.now() + this.leaseMs) } }
+        );
+
+        if (matchedCount < ids.length) {
+          const owned = await Job.find({ _id: { $in: ids }, status: 'running', leaseOwner: this.workerId }).distinct('_id');
+          const ownedIds = new Set(owned.map(id => id.toString()));
+          for (const [jobId, { controller }] of this.running) {
+            if (!ownedIds.has(jobId)) {
+              console.error(`[pool] Lost the lease on job ${jobId}; stopping it`);
+              controller.abort();
+            }
+          }
+        }
+
+        const executionIds = [...new Set([...this.running.values()].map(({ job }) => job.execution.toString()))];
+        const cancelled = await Execution.find({ _id: { $in: executionIds }, cancelledAt: { $ne: null } }).distinct('_id');
+        cancelled.forEach(executionId => this.cancelExecution(executionId));
+      }
+
+      await this.reclaimExpired();
+    } catch (err) {
+      console.error('[pool] Heartbeat failed:', err.message);
+    }
+  }
+
+  // Extend a job's lease right before its result is written. False means
+  // another worker has taken the job over and this result must be dropped.
+  async renewLease(job) {
+    const { matchedCount } = await Job.updateOne(
+      { _id: job._id, status: 'running', leaseOwner: this.workerId },
+      { $set: { leaseExpiresAt: new Date(Date.now() + this.leaseMs) } }
+    );
+    return matchedCount === 1;
+  }
+
+  // Called after enqueueing so new jobs start without waiting for the next poll
+  notify() {
+    setImmediate(() => this.fill());
+  }
+
+  // Running jobs with a process of their own
+  processes() {
+    let count = 0;
+    for (const { job } of this.running.values()) {
+      if (!job.attachedTo) count += 1;
+    }
+    return count;
+  }
+
+  // Scripts and IPs at their cap, and the flights in progress, over every
+  // pool's running jobs
+  async saturated() {
+    const [counts] = await Job.aggregate([
+      { $match: { status: 'running', attachedTo: null } },
+      { $project: { script: 1, scriptLimit: 1, args: 1, flightKey: 1 } },
+      {
+        $facet: {
+          scripts: [{ $group: { _id: '$script', count: { $sum: 1 }, limit: { $max: '$scriptLimit' } } }],
+          ips: [{ $unwind: '$args' }, { $group: { _id: '$args', count: { $sum: 1 } } }],
+          flights: [{ $match: { flightKey: { $type: 'string' } } }, { $group: { _id: '$flightKey' } }]
+        }
+      }
+    ]);
+    return {
+      scripts: counts.scripts.filter(entry => entry.count >= (entry.limit || this.maxPerScript)).map(entry => entry._id),
+      ips: counts.ips.filter(entry => entry.count >= this.maxPerIp).map(entry => entry._id),
+      flights: counts.flights.map(entry => entry._id)
+    };
+  }
+
+  // Jobs this pool may start right now
+  async claimableFilter() {
+    const saturated = await this.saturated();
+    return {
+      status: 'queued',
+      runAfter: { $lte: new Date() },
+      script: { $nin: saturated.scripts },
+      args: { $nin: saturated.ips },
+      // Left for attachFollowers() in the pool running the identical job
+      flightKey: { $nin: saturated.flights }
+    };
+  }
+
+  // Whether a job we just claimed is within its caps, and not a duplicate of
+  // a run in progress, once the jobs claimed before it (by any pool) are
+  // counted
+  async withinCaps(job) {
+    const before = {
+      _id: { $ne: job._id },
+      status: 'running',
+      attachedTo: null,
+      $or: [{ startedAt: { $lt: job.startedAt } }, { startedAt: job.startedAt, _id: { $lt: job._id } }]
+    };
+    const [scriptCount, identical, ipCounts] = await Promise.all([
+      Job.countDocuments({ ...before, script: job.script }),
+      job.flightKey ? Job.exists({ ...before, flightKey: job.flightKey }) : null,
+      Job.aggregate([
+        { $match: { ...before, args: { $in: job.args } } },
+        { $unwind: '$args' },
+        { $match: { args: { $in: job.args } } },
+        { $group: { _id: '$args', count: { $sum: 1 } } }
+      ])
+    ]);
+    return !identical &&
+      scriptCount < (job.scriptLimit || this.maxPerScript) &&
+      ipCounts.every(entry => entry.count < this.maxPerIp);
+  }
+
+  // Give a claimed job back to the queue without counting the attempt
+  async release(job) {
+    await Job.updateOne(
+      { _id: job._id, status: 'running', leaseOwner: this.workerId },
+      {
+        $set: { status: 'queued' },
+        $unset: { leaseOwner: 1, leaseExpiresAt: 1, startedAt: 1 },
+        $inc: { attempts: -1 }
+      }
+    );
+  }
+
+  // (team, challenge) keys with claimable jobs
+  async backlog() {
+    const groups = await Job.aggregate([
+      { $match: await this.claimableFilter() },
+      {
+        $group: {
+          _id: { user: '$user', challenge: '$challenge' },
+          count: { $sum: 1 },
+          weight: { $max: '$weight' }
+        }
+      }
+    ]);
+    return groups.map(group => ({
+      key: fairKey(group._id),
+      user: group._id.user ?? null,
+      challenge: group._id.challenge ?? null,
+      weight: group.weight || 1,
+      count: group.count
+    }));
+  }
+
+  async claim(candidate) {
+    const written = mongoWriteSeconds.startTimer({ operation: 'job_claim' });
+    const job = await Job.findOneAndUpdate(
+      { ...(await this.claimableFilter()), user: candidate.user, challenge: candidate.challenge },
+      {
+        $set: {
+          status: 'running',
+          startedAt: new Date(),
+          leaseOwner: this.workerId,
+          leaseExpiresAt: new Date(Date.now() + this.leaseMs)
+        },
+        $inc: { attempts: 1 }
+      },
+      { sort: { runAfter: 1 }, new: true }
+    );
+    written();
+
+    if (job && !(await this.withinCaps(job))) {
+      await this.release(job);
+      return null;
+    }
+    return job;
+  }
+
+  // Claim queued jobs identical to runs this pool has in progress, as
+  // followers of those runs
+  async attachFollowers() {
+    const owners = new Map(); // flightKey -> owner job id
+    for (const { job } of this.running.values()) {
+      if (job.flightKey && !job.attachedTo) owners.set(job.flightKey, job._id);
+    }
+
+    for (const [flightKey, owner] of owners) {
+      for (;;) {
+        const job = await Job.findOneAndUpdate(
+          { status: 'queued', runAfter: { $lte: new Date() }, flightKey },
+          {
+            $set: {
+              status: 'running',
+              startedAt: new Date(),
+              leaseOwner: this.workerId,
+              leaseExpiresAt: new Date(Date.now() + this.leaseMs),
+              attachedTo: owner
+            },
+            $inc: { attempts: 1 }
+          },
+          { sort: { runAfter: 1 }, new: true }
+        );
+        if (!job) break;
+        console.log(`[pool] Job ${job._id} attached to the identical run of job ${owner}`);
+        this.launch(job);
+      }
+    }
+  }
+
+  async fill() {
+    // Processes that never started the pool (cluster HTTP workers, or the API
+    // with EXECUTOR_EMBEDDED_WORKER=false) enqueue jobs but must not claim them
+    if (this.draining || !this.timer) return;
+    if (this.filling) {
+      this.refill = true;
+      return;
+    }
+    this.filling = true;
+
+    try {
+      do {
+        this.refill = false;
+        await this.attachFollowers();
+        if (this.processes() >= this.maxConcurrency) break;
+
+        let candidates = await this.backlog();
+        while (candidates.length > 0 && this.processes() < this.maxConcurrency) {
+          const [next] = this.fairShare.order(candidates);
+          const job = await this.claim(next);
+          if (!job) {
+            // Taken elsewhere, or blocked by a cap that changed meanwhile
+            candidates = candidates.filter(candidate => candidate !== next);
+            continue;
+          }
+
+          this.launch(job, next.weight);
+          next.count -= 1;
+          if (next.count === 0) {
+            candidates = candidates.filter(candidate => candidate !== next);
+          }
+        }
+      } while (this.refill && this.processes() < this.maxConcurrency);
+
+      // Identical jobs queued behind the runs just started
+      await this.attachFollowers();
+    } catch (err) {
+      console.error('[pool] Failed to claim job:', err.message);
+    } finally {
+      this.filling = false;
+    }
+  }
+
+  // Queue depth, wait and running count per (team, challenge) key
+  async queueStats() {
+    const now = Date.now();
+    const groups = await Job.aggregate([
+      { $match: { status: 'queued' } },
+      {
+        $group: {
+          _id: { user: '$user', challenge: '$challenge' },
+          depth: { $sum: 1 },
+          due: { $sum: { $cond: [{ $lte: ['$runAfter', new Date(now)] }, 1, 0] } },
+          oldestRunAfter: { $min: '$runAfter' }
+        }
+      }
+    ]);
+
+    const keys = new Map();
+    for (const group of groups) {
+      keys.set(fairKey(group._id), {
+        user: group._id.user ?? null,
+        challenge: group._id.challenge ?? null,
+        depth: group.depth,
+        due: group.due,
+        running: 0,
+        oldestWaitMs: Math.max(0, now - group.oldestRunAfter)
+      });
+    }
+    for (const { job } of this.running.values()) {
+      const key = fairKey(job);
+      if (!keys.has(key)) {
+        keys.set(key, { user: job.user ?? null, challenge: job.challenge ?? null, depth: 0, due: 0, running: 0, oldestWaitMs: 0 });
+      }
+      keys.get(key).running += 1;
+    }
+
+    return [...keys].map(([key, entry]) => ({ key, ...entry, ...this.fairShare.stats(key) }));
+  }
+
+  // Abort every job of an execution that is running in this process
+  cancelExecution(executionId) {
+    let cancelled = 0;
+    for (const { job, controller } of this.running.values()) {
+      if (job.execution.toString() === executionId.toString()) {
+        controller.abort();
+        cancelled += 1;
+      }
+    }
+    return cancelled;
+  }
+
+  launch(job, weight = 1) {
+    const jobId = job._id.toString();
+    const scriptId = job.script.toString();
+    const controller = new AbortController();
+    const waitMs = job.startedAt - (job.runAfter || job.createdAt);
+    // Followers cost their (team, challenge) no share: they start no process
+    const charge = job.attachedTo ? null : this.fairShare.charge(fairKey(job), weight, scriptId, waitMs);
+
+    this.running.set(jobId, { job, controller });
+
+    Promise.resolve()
+      .then(() => this.runJob(job, { signal: controller.signal, renewLease: () => this.renewLease(job) }))
+      .catch(err => console.error(`[pool] Job ${jobId} crashed:`, err))
+      .finally(() => {
+        this.running.delete(jobId);
+        if (charge) this.fairShare.settle(charge, Date.now() - job.startedAt);
+        this.fill();
+      });
+  }
+}
@@ -0,0 +1,80 @@
+// Moves Scripts uploaded before content addressing onto shared blobs: each
+// Script's file is hashed and stored as uploads/scripts/<sha256>.<ext>, the
+// Script is pointed at it, and the old per-upload file is removed once no
+// Script references it. Safe to run more than once.
+//
+//   MONGODB_URL=mongodb://localhost/automation node tools/dedupeScripts.js [--dry-run]
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+import { fileURLToPath } from 'url';
+import { parseArgs } from 'util';
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+import Script from '../models/Script.js';
+import * as scriptStore from '../services/scriptStore.js';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const BACKEND_DIR = path.resolve(path.dirname(__filename), '..');
+
+const { values: options } = parseArgs({
+  options: {
+    'dry-run': { type: 'boolean', default: false }
+  }
+});
+const dryRun = options['dry-run'];
+
+const sha256 = (filePath) => new Promise((resolve, reject) => {
+  const hash = crypto.createHash('sha256');
+  fs.createReadStream(filePath)
+    .on('data', chunk => hash.update(chunk))
+    .on('end', () => resolve(hash.digest('hex')))
+    .on('error', reject);
+});
+
+const main = async () => {
+  await mongoose.connect(process.env.MONGODB_URL);
+
+  const scripts = await Script.find({}, 'name filePath contentHash').lean();
+  const blobs = new Set();
+  let moved = 0;
+  let missing = 0;
+
+  for (const script of scripts) {
+    if (scriptStore.isBlobPath(script.filePath)) {
+      blobs.add(script.filePath);
+      continue;
+    }
+    const source = path.resolve(BACKEND_DIR, script.filePath);
+    if (!fs.existsSync(source)) {
+      console.warn(`[dedupe] ${script.name}: ${script.filePath} is missing, skipped`);
+      missing += 1;
+      continue;
+    }
+
+    let target;
+    if (dryRun) {
+      const ext = script.filePath.split('.').pop().toLowerCase();
+      target = { path: scriptStore.blobPath(await sha256(source), ext) };
+    } else {
+      target = await scriptStore.adopt(script.filePath);
+      await Script.updateOne({ _id: script._id }, { filePath: target.path, contentHash: target.contentHash });
+      await scriptStore.release(script.filePath);
+    }
+    blobs.add(target.path);
+    moved += 1;
+    console.log(`[dedupe] ${script.name}: ${script.filePath} -> ${target.path}`);
+  }
+
+  console.log(`[dedupe] ${scripts.length} scripts, ${moved} moved, ${missing} missing, ${blobs.size} distinct files${dryRun ? ' (dry run)' : ''}`);
+  await mongoose.disconnect();
+};
+
+main().catch(async (error) => {
+  console.error(`[dedupe] ${error.stack || error.message}`);
+  await mongoose.disconnect();
+  process.exit(1);
+});
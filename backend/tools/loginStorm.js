@@ -0,0 +1,103 @@
+// Login storm against a running API, as at the start of an exercise: fires
+// many concurrent POST /api/auth/login requests and meanwhile probes
+// /api/health to see how far the event loop falls behind.
+//
+//   node tools/loginStorm.js --email team@example.com --password secret \
+//     [--url http://localhost:5000] [--requests 500] [--concurrency 50]
+//
+// Run it once against a single process and once with CLUSTER_WORKERS=auto
+// to compare. With the cluster each probe reports whichever worker answered.
+import { parseArgs } from 'util';
+
+const { values: options } = parseArgs({
+  options: {
+    url: { type: 'string', default: 'http://localhost:5000' },
+    email: { type: 'string' },
+    password: { type: 'string' },
+    requests: { type: 'string', default: '500' },
+    concurrency: { type: 'string', default: '50' },
+    'probe-ms': { type: 'string', default: '50' }
+  }
+});
+
+if (!options.email || !options.password) {
+  console.error('[storm] --email and --password are required');
+  process.exit(1);
+}
+
+const totalRequests = Number(options.requests);
+const concurrency = Number(options.concurrency);
+
+const percentile = (values, p) => {
+  if (values.length === 0) return 0;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+};
+
+const timed = async (request) => {
+  const started = performance.now();
+  const response = await request();
+  return { response, ms: performance.now() - started };
+};
+
+const health = (reset = false) => fetch(`${options.url}/api/health${reset ? '?reset=1' : ''}`).then(res => res.json());
+
+const main = async () => {
+  await health(true);
+
+  const probes = [];
+  const worstLag = new Map(); // pid -> max event-loop lag seen
+  let storming = true;
+  const probe = (async () => {
+    while (storming) {
+      try {
+        const { response, ms } = await timed(() => health());
+        probes.push(ms);
+        const { pid, eventLoop } = response;
+        worstLag.set(pid, Math.max(worstLag.get(pid) || 0, eventLoop.maxMs));
+      } catch (err) {
+        console.error('[storm] Health probe failed:', err.message);
+      }
+      await new Promise(resolve => setTimeout(resolve, Number(options['probe-ms'])));
+    }
+  })();
+
+  const logins = [];
+  let failed = 0;
+  let issued = 0;
+  const started = performance.now();
+  await Promise.all(Array.from({ length: concurrency }, async () => {
+    while (issued < totalRequests) {
+      issued += 1;
+      try {
+        const { response, ms } = await timed(() => fetch(`${options.url}/api/auth/login`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ email: options.email, password: options.password })
+        }));
+        if (!response.ok) failed += 1;
+        await response.arrayBuffer();
+        logins.push(ms);
+      } catch {
+        failed += 1;
+      }
+    }
+  }));
+  const elapsedMs = performance.now() - started;
+
+  storming = false;
+  await probe;
+
+  const round = (ms) => Math.round(ms);
+  console.log(`[storm] ${logins.length} login(s) in ${round(elapsedMs)} ms (${Math.round(logins.length / (elapsedMs / 1000))}/s), ${failed} failed`);
+  console.log(`[storm] Login latency p50 ${round(percentile(logins, 50))} ms, p99 ${round(percentile(logins, 99))} ms`);
+  console.log(`[storm] Health probe latency p50 ${round(percentile(probes, 50))} ms, max ${round(Math.max(0, ...probes))} ms`);
+  for (const [pid, maxMs] of worstLag) {
+    console.log(`[storm] pid ${pid}: max event-loop lag ${maxMs} ms`);
+  }
+};
+
+main().catch((err) => {
+  console.error('[storm] Error:', err);
+  process.exit(1);
+});
@@ -0,0 +1,69 @@
+// Checks that Python output reaches the executor while the script is still
+// running, not when it exits: a script prints a line, sleeps, then exits, and
+// the first chunk must arrive well before the exit. Runs the cold path
+// (spawn with pythonEnv()) and, when the fork-server starts, the warm one.
+//
+//   node tools/streamingCheck.js [--sleep-ms 1500]
+//
+// Exits non-zero if any path buffered the line until exit.
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { spawn } from 'child_process';
+import { parseArgs } from 'util';
+
+// The fork-server only starts in warm mode; set before pythonRunner loads
+process.env.PYTHON_RUNNER = 'warm';
+const { PYTHON, pythonEnv, runWarm, startPythonRunner, stopPythonRunner } = await import('../services/pythonRunner.js');
+
+const { values: options } = parseArgs({
+  options: {
+    'sleep-ms': { type: 'string', default: '1500' }
+  }
+});
+
+const sleepMs = Number(options['sleep-ms']);
+const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'streaming-check-'));
+const scriptPath = path.join(workDir, 'slow.py');
+
+fs.writeFileSync(scriptPath, `import time
+print("line1")
+time.sleep(${sleepMs / 1000})
+print("line2")
+`);
+
+// Milliseconds from start to the first stdout chunk and to 'close'
+const timeRun = (child) => new Promise((resolve, reject) => {
+  const started = Date.now();
+  let firstChunk = null;
+  child.stdout.on('data', () => {
+    firstChunk ??= Date.now() - started;
+  });
+  child.stderr.on('data', data => process.stderr.write(data));
+  child.on('error', reject);
+  child.on('close', () => resolve({ firstChunk, closed: Date.now() - started }));
+});
+
+const check = async (name, child) => {
+  const { firstChunk, closed } = await timeRun(child);
+  // The line must beat the sleep by a wide margin, not merely the exit
+  const ok = firstChunk !== null && firstChunk < closed - sleepMs / 2;
+  console.log(`[streaming] ${name}: first chunk at ${firstChunk} ms, closed at ${closed} ms -> ${ok ? 'ok' : 'BUFFERED'}`);
+  return ok;
+};
+
+const results = [];
+try {
+  results.push(await check('cold', spawn(PYTHON, [scriptPath], { env: pythonEnv() })));
+
+  if (await startPythonRunner({ socket: path.join(workDir, 'runner.sock') })) {
+    results.push(await check('warm', runWarm(scriptPath, [], { env: {} })));
+  } else {
+    console.log('[streaming] warm: fork-server did not start; skipped');
+  }
+} finally {
+  stopPythonRunner();
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
+
+process.exit(results.every(Boolean) ? 0 : 1);
@@ -0,0 +1,79 @@
+// Local stand-in for the scoring server behind CHALLENGE_BASE_URL, for
+// exercising the callback dispatcher without the real CTF platform.
+//
+//   node tools/stubScoringServer.js [--port 5055] [--latency 50] [--fail-rate 0.2] [--fail-first 2]
+//   CHALLENGE_BASE_URL=http://localhost:5055/api/challenges/solve npm start
+//
+// GET <any prefix>/:challengeId/:userId records a solve. --fail-rate answers
+// that fraction of calls with 503, --fail-first fails the first N calls for
+// each (challenge, user). GET /_stats reports per-pair call counts so
+// duplicate deliveries stand out; POST /_reset clears them.
+import http from 'http';
+import { parseArgs } from 'util';
+
+const { values: options } = parseArgs({
+  options: {
+    port: { type: 'string', default: process.env.STUB_SCORING_PORT || '5055' },
+    latency: { type: 'string', default: '0' },
+    'fail-rate': { type: 'string', default: '0' },
+    'fail-first': { type: 'string', default: '0' }
+  }
+});
+
+const latency = Number(options.latency);
+const failRate = Number(options['fail-rate']);
+const failFirst = Number(options['fail-first']);
+
+const calls = new Map();  // "challenge/user" -> { calls, solves }
+let connections = 0;
+
+const send = (res, status, body) => {
+  res.writeHead(status, { 'Content-Type': 'application/json' });
+  res.end(JSON.stringify(body));
+};
+
+const server = http.createServer((req, res) => {
+  const url = new URL(req.url, 'http://localhost');
+
+  if (url.pathname === '/_stats') {
+    const pairs = Object.fromEntries(calls);
+    const duplicates = Object.entries(pairs).filter(([, entry]) => entry.solves > 1).map(([key]) => key);
+    return send(res, 200, { connections, pairs, duplicates });
+  }
+  if (url.pathname === '/_reset' && req.method === 'POST') {
+    calls.clear();
+    connections = 0;
+    return send(res, 200, { success: true });
+  }
+
+  const [challengeId, userId] = url.pathname.split('/').filter(Boolean).slice(-2);
+  if (!challengeId || !userId) {
+    return send(res, 404, { message: 'Expected /:challengeId/:userId' });
+  }
+
+  const key = `${challengeId}/${userId}`;
+  const entry = calls.get(key) || { calls: 0, solves: 0 };
+  entry.calls += 1;
+  calls.set(key, entry);
+
+  setTimeout(() => {
+    if (entry.calls <= failFirst || Math.random() < failRate) {
+      console.log(`[stub] ${key} -> 503 (call ${entry.calls})`);
+      return send(res, 503, { message: 'Scoring temporarily unavailable' });
+    }
+
+    entry.solves += 1;
+    const message = entry.solves === 1 ? 'Challenge solved' : 'Challenge already solved';
+    console.log(`[stub] ${key} -> 200 ${message} (call ${entry.calls})`);
+    send(res, 200, { success: true, message });
+  }, latency);
+});
+
+// Count TCP connections to confirm callbacks reuse keep-alive sockets
+server.on('connection', () => {
+  connections += 1;
+});
+
+server.listen(Number(options.port), () => {
+  console.log(`[stub] Scoring server listening on http://localhost:${options.port}`);
+});
@@ -0,0 +1,277 @@
+// Multi-process check for lease-based claiming: queues a run of many
+// targets, starts several `worker.js` processes against the same database,
+// SIGKILLs some of them mid-run and starts replacements, then verifies that
+// every target finished exactly once per claim: nothing lost, nothing run by
+// two workers at the same time. Then queues --identical runs of one slow
+// script against one IP, each in its own execution, and verifies that a
+// single process on a single worker served all of them (services/sharedRuns.js).
+//
+//   MONGODB_URL=mongodb://localhost/automation-harness \
+//     node tools/workerHarness.js [--workers 4] [--targets 200] [--kill 2] [--lease-ms 3000] [--identical 5]
+//
+// Uses its own throwaway Script/Execution/Job documents and removes them
+// afterwards (unless --keep).
+import fs from 'fs';
+import os from 'os';
+import crypto from 'crypto';
+import path from 'path';
+import { spawn } from 'child_process';
+import { fileURLToPath } from 'url';
+import { parseArgs } from 'util';
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+import Script from '../models/Script.js';
+import Execution from '../models/Execution.js';
+import Job from '../models/Job.js';
+import { buildTargetRows } from '../services/executionService.js';
+import { flightKey } from '../services/sharedRuns.js';
+
+dotenv.config();
+
+const __filename = fileURLToPath(import.meta.url);
+const BACKEND_DIR = path.resolve(path.dirname(__filename), '..');
+
+const { values: options } = parseArgs({
+  options: {
+    workers: { type: 'string', default: '4' },
+    targets: { type: 'string', default: '200' },
+    kill: { type: 'string', default: '2' },
+    'kill-after-ms': { type: 'string', default: '1500' },
+    'lease-ms': { type: 'string', default: '3000' },
+    identical: { type: 'string', default: '5' },
+    'timeout-ms': { type: 'string', default: '180000' },
+    verbose: { type: 'boolean', default: false },
+    keep: { type: 'boolean', default: false }
+  }
+});
+
+const workerCount = Number(options.workers);
+const targetCount = Number(options.targets);
+const killCount = Number(options.kill);
+const leaseMs = Number(options['lease-ms']);
+const identicalCount = Number(options.identical);
+
+const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'worker-harness-'));
+const runLog = path.join(workDir, 'runs.log');
+const scriptPath = path.join(workDir, 'check.sh');
+
+// Records every start, then takes 100-500 ms like a quick checker
+fs.writeFileSync(scriptPath, `#!/bin/bash
+echo "$1 $$" >> "${runLog}"
+sleep 0.$((RANDOM % 5 + 1))
+echo "ok $1"
+`, { mode: 0o755 });
+
+// Same, but slow enough for identical jobs to be queued behind it
+const sharedLog = path.join(workDir, 'shared.log');
+const slowScriptPath = path.join(workDir, 'slow-check.sh');
+fs.writeFileSync(slowScriptPath, `#!/bin/bash
+echo "$1 $$" >> "${sharedLog}"
+sleep 2
+echo "ok $1"
+`, { mode: 0o755 });
+const SHARED_IP = '10.255.255.1';
+
+const workers = new Set();
+
+const startWorker = (index) => {
+  const child = spawn(process.execPath, ['worker.js'], {
+    cwd: BACKEND_DIR,
+    env: {
+      ...process.env,
+      EXECUTOR_LEASE_MS: String(leaseMs),
+      EXECUTOR_HEARTBEAT_MS: String(Math.max(200, Math.floor(leaseMs / 4))),
+      EXECUTOR_POLL_INTERVAL_MS: '200',
+      EXECUTOR_MAX_CONCURRENCY: '8',
+      PYTHON_RUNNER: 'cold'
+    },
+    stdio: ['ignore', 'pipe', 'pipe']
+  });
+
+  const prefix = `[worker ${index} pid ${child.pid}]`;
+  if (options.verbose) {
+    child.stdout.on('data', data => process.stdout.write(`${prefix} ${data}`));
+  } else {
+    child.stdout.resume();
+  }
+  child.stderr.on('data', data => process.stderr.write(`${prefix} ${data}`));
+  child.on('exit', () => workers.delete(child));
+
+  workers.add(child);
+  return child;
+};
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const waitForJobs = async (filter) => {
+  const deadline = Date.now() + Number(options['timeout-ms']);
+  let open = Infinity;
+  while (Date.now() < deadline) {
+    open = await Job.countDocuments({ ...filter, status: { $in: ['queued', 'running'] } });
+    if (open === 0) break;
+    await sleep(500);
+  }
+  return open;
+};
+
+// Queue `count` identical runs at once and check they shared one process.
+// Returns [failures, cleanup].
+const checkSharedRuns = async (count) => {
+  const content = fs.readFileSync(slowScriptPath);
+  const script = await Script.create({
+    name: `worker-harness-shared-${process.pid}`,
+    description: 'Throwaway script for tools/workerHarness.js',
+    challenge: new mongoose.Types.ObjectId(),
+    filePath: slowScriptPath,
+    contentHash: crypto.createHash('sha256').update(content).digest('hex'),
+    language: 'Bash'
+  });
+
+  const executions = await Execution.insertMany(Array.from({ length: count }, () => ({
+    script: script._id,
+    scriptName: script.name,
+    status: 'running',
+    targets: buildTargetRows(script, [{ ips: [SHARED_IP], description: 'harness shared' }])
+  })));
+  const executionIds = executions.map(execution => execution._id);
+  await Job.insertMany(executions.map(execution => ({
+    execution: execution._id,
+    script: script._id,
+    target: execution.targets[0]._id,
+    ip: SHARED_IP,
+    args: [SHARED_IP],
+    flightKey: flightKey(script, [SHARED_IP]),
+    timeoutMs: 60000
+  })));
+  console.log(`[harness] Queued ${count} identical run(s) against ${SHARED_IP}`);
+
+  const open = await waitForJobs({ execution: { $in: executionIds } });
+  const jobs = await Job.find({ execution: { $in: executionIds } }).lean();
+  const rows = (await Execution.find({ _id: { $in: executionIds } }).lean()).map(execution => execution.targets[0]);
+  const processes = fs.existsSync(sharedLog) ? fs.readFileSync(sharedLog, 'utf8').split('\n').filter(Boolean).length : 0;
+  const owners = new Set(jobs.map(job => job.leaseOwner));
+  const attached = jobs.filter(job => job.attachedTo).length;
+  const shared = rows.filter(row => row.shared?.execution).length;
+
+  console.log(`[harness] Identical runs: ${count}, processes started: ${processes}, workers: ${owners.size}, attached jobs: ${attached}, shared rows: ${shared}`);
+
+  const failures = [];
+  if (open) failures.push(`${open} identical job(s) still open`);
+  if (rows.some(row => row.status !== 'completed')) failures.push('identical run rows not all completed');
+  if (processes !== 1) failures.push(`${processes} processes started for ${count} identical runs`);
+  if (owners.size !== 1) failures.push(`identical runs served by ${owners.size} workers`);
+  if (attached !== count - 1 || shared !== count - 1) failures.push(`expected ${count - 1} attached/shared run(s), got ${attached}/${shared}`);
+
+  const cleanup = () => Promise.all([
+    Job.deleteMany({ execution: { $in: executionIds } }),
+    Execution.deleteMany({ _id: { $in: executionIds } }),
+    Script.deleteOne({ _id: script._id })
+  ]);
+  return [failures, cleanup];
+};
+
+const main = async () => {
+  await mongoose.connect(process.env.MONGODB_URL);
+
+  const script = await Script.create({
+    name: `worker-harness-${process.pid}`,
+    description: 'Throwaway script for tools/workerHarness.js',
+    challenge: new mongoose.Types.ObjectId(),
+    filePath: scriptPath,
+    language: 'Bash'
+  });
+
+  const ips = Array.from({ length: targetCount }, (_, i) => `10.${Math.floor(i / 65536) % 256}.${Math.floor(i / 256) % 256}.${i % 256}`);
+  const execution = await Execution.create({
+    script: script._id,
+    scriptName: script.name,
+    status: 'running',
+    targets: buildTargetRows(script, [{ ips, description: 'harness' }])
+  });
+  await Job.insertMany(execution.targets.map(row => ({
+    execution: execution._id,
+    script: script._id,
+    target: row._id,
+    ip: row.ip,
+    args: row.ips,
+    timeoutMs: 60000
+  })));
+  console.log(`[harness] Queued ${targetCount} target(s); starting ${workerCount} worker(s)`);
+
+  let nextIndex = 0;
+  for (let i = 0; i < workerCount; i++) startWorker(nextIndex++);
+
+  await sleep(Number(options['kill-after-ms']));
+  const victims = [...workers].slice(0, killCount);
+  for (const victim of victims) {
+    console.log(`[harness] SIGKILL worker pid ${victim.pid}`);
+    victim.kill('SIGKILL');
+    startWorker(nextIndex++);
+  }
+
+  const open = await waitForJobs({ execution: execution._id });
+
+  // Verify
+  const jobs = await Job.find({ execution: execution._id }).lean();
+  const finished = await Execution.findById(execution._id).lean();
+  const starts = new Map();
+  for (const line of fs.readFileSync(runLog, 'utf8').split('\n').filter(Boolean)) {
+    const [ip] = line.split(' ');
+    starts.set(ip, (starts.get(ip) || 0) + 1);
+  }
+
+  const lost = finished.targets.filter(target => target.status !== 'completed');
+  const unfinishedJobs = jobs.filter(job => job.status !== 'completed');
+  const overRun = jobs.filter(job => (starts.get(job.ip) || 0) > job.attempts);
+  const neverRun = jobs.filter(job => !starts.get(job.ip));
+  const reclaimed = jobs.filter(job => job.attempts > 1);
+  const owners = new Set(jobs.map(job => job.leaseOwner));
+
+  console.log(`[harness] Jobs: ${jobs.length}, completed: ${jobs.length - unfinishedJobs.length}, still open: ${open}`);
+  console.log(`[harness] Runs started: ${[...starts.values()].reduce((a, b) => a + b, 0)} across ${owners.size} worker(s)`);
+  console.log(`[harness] Re-run after a killed worker's lease expired: ${reclaimed.length}`);
+  console.log(`[harness] Execution status: ${finished.status}`);
+
+  const failures = [];
+  if (lost.length) failures.push(`${lost.length} target row(s) not completed`);
+  if (unfinishedJobs.length) failures.push(`${unfinishedJobs.length} job(s) not completed`);
+  if (neverRun.length) failures.push(`${neverRun.length} target(s) never ran`);
+  if (overRun.length) failures.push(`${overRun.length} target(s) started more often than claimed: ${overRun.slice(0, 5).map(job => job.ip).join(', ')}`);
+  if (finished.status !== 'completed') failures.push(`execution finished as ${finished.status}`);
+
+  let cleanupShared = async () => {};
+  if (identicalCount > 1) {
+    const [sharedFailures, cleanup] = await checkSharedRuns(identicalCount);
+    failures.push(...sharedFailures);
+    cleanupShared = cleanup;
+  }
+
+  if (!options.keep) {
+    await cleanupShared();
+    await Promise.all([
+      Job.deleteMany({ execution: execution._id }),
+      Execution.deleteOne({ _id: execution._id }),
+      Script.deleteOne({ _id: script._id })
+    ]);
+    fs.rmSync(workDir, { recursive: true, force: true });
+  }
+
+  if (failures.length) {
+    console.error(`[harness] FAILED: ${failures.join('; ')}`);
+    return 1;
+  }
+  console.log(`[harness] OK: no run lost or duplicated${identicalCount > 1 ? '; identical runs shared one process' : ''}`);
+  return 0;
+};
+
+main()
+  .catch((err) => {
+    console.error('[harness] Error:', err);
+    return 1;
+  })
+  .then(async (code) => {
+    workers.forEach(worker => worker.kill('SIGKILL'));
+    await mongoose.disconnect();
+    process.exit(code);
+  });
@@ -8,26 +8,28 @@ Exit Code 0: Success, Exit Code 1: Failure
 """
 
 import sys
-import time
 import subprocess
 import argparse
 import socket
 import os
 import re
 import tempfile
-from impacket.smbconnection import SMBConnection
-try:
-    from ldap3 import Server, Connection, ALL, SUBTREE
-    LDAP3_AVAILABLE = True
-except ImportError:
-    LDAP3_AVAILABLE = False
+from automation_deadline import Deadline
+from automation_lazy import available, lazy_import
+
+# Imported on first use, so an unreachable target doesn't pay for them
+smbconnection = lazy_import("impacket.smbconnection")
+ldap3 = lazy_import("ldap3")
+LDAP3_AVAILABLE = available("ldap3")
 import warnings
 warnings.filterwarnings('ignore')
 
 class Phase1Reconnaissance:
-    def __init__(self, target_ip, domain="cybersuraksha.local"):
+    def __init__(self, target_ip, domain="cybersuraksha.local", deadline=None):
         self.target_ip = target_ip
         self.domain = domain
+        # Every network timeout below is cut to what is left of the run's budget
+        self.deadline = deadline or Deadline.from_env()
         self.success_count = 0
         self.total_attempts = 0
         self.discovered_services = []
@@ -50,7 +52,7 @@ class Phase1Reconnaissance:
 
             # Simple socket connection test
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
+            sock.settimeout(self.deadline.timeout(5))
             result = sock.connect_ex((self.target_ip, 445))  # SMB port
             sock.close()
 
@@ -77,7 +79,7 @@ class Phase1Reconnaissance:
             for port in smb_ports:
                 try:
                     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(3)
+                    sock.settimeout(self.deadline.timeout(3))
                     result = sock.connect_ex((self.target_ip, port))
                     sock.close()
 
@@ -105,7 +107,7 @@ class Phase1Reconnaissance:
             print("[*] Testing SMB guest access...")
 
             # Try anonymous connection
-            conn = SMBConnection(self.target_ip, self.target_ip)
+            conn = smbconnection.SMBConnection(self.target_ip, self.target_ip, timeout=self.deadline.timeout(10))
 
             # Test guest login
             try:
@@ -320,7 +322,7 @@ class Phase1Reconnaissance:
             # Simple port check for RPC
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
+                sock.settimeout(self.deadline.timeout(5))
                 result = sock.connect_ex((self.target_ip, 135))  # RPC endpoint mapper
                 sock.close()
 
@@ -361,15 +363,16 @@ class Phase1Reconnaissance:
                     print(f"[*] Trying {config['name']} on port {config['port']}...")
 
                     # Create server connection
-                    server = Server(
+                    server = ldap3.Server(
                         host=config['host'],
                         port=config['port'],
                         use_ssl=config['use_ssl'],
-                        get_info=ALL
+                        get_info=ldap3.ALL,
+                        connect_timeout=self.deadline.timeout(5)
                     )
 
                     # Try anonymous bind
-                    conn = Connection(server, auto_bind=True)
+                    conn = ldap3.Connection(server, auto_bind=True, receive_timeout=self.deadline.timeout(10))
 
                     if conn.bound:
                         self.log_attempt("LDAP Access", True, f"{config['name']} port {config['port']} accessible")
@@ -400,7 +403,7 @@ class Phase1Reconnaissance:
             for port in ldap_ports:
                 try:
                     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(5)
+                    sock.settimeout(self.deadline.timeout(5))
                     result = sock.connect_ex((self.target_ip, port))
                     sock.close()
 
@@ -440,7 +443,7 @@ class Phase1Reconnaissance:
             conn.search(
                 search_base=base_dn,
                 search_filter=search_filter,
-                search_scope=SUBTREE,
+                search_scope=ldap3.SUBTREE,
                 attributes=attributes,
                 size_limit=1000  # Limit to prevent overwhelming
             )
@@ -534,12 +537,20 @@ class Phase1Reconnaissance:
             ]
 
             for technique in techniques:
+                if self.deadline.expired:
+                    print("[-] Deadline reached; skipping remaining checks")
+                    break
                 try:
                     technique()
-                    time.sleep(1)  # Brief pause between checks
                 except Exception as e:
                     print(f"[-] Technique failed with error: {str(e)}")
 
+                # Success only needs extracted files/data; stop once we have some
+                if self.extracted_credentials:
+                    print("[+] Success criteria met; skipping remaining checks")
+                    break
+                self.deadline.pace()
+
             # Calculate success rate
             success_rate = (self.success_count / self.total_attempts * 100) if self.total_attempts > 0 else 0
 
@@ -0,0 +1,44 @@
+// Executor worker: claims queued target-runs from Mongo and runs them,
+// without serving HTTP. Start as many as needed, on any host that can reach
+// the database and the uploaded scripts:
+//
+//   node worker.js
+//
+// Set EXECUTOR_EMBEDDED_WORKER=false on the API to leave all runs to workers.
+import dotenv from 'dotenv';
+import connectToMongo from './db.js';
+import { workerPool } from './services/executionService.js';
+import { startPythonRunner, stopPythonRunner } from './services/pythonRunner.js';
+import { startOutputPublisher } from './services/outputRelay.js';
+import { startMetricsServer } from './services/metrics.js';
+
+dotenv.config();
+
+await connectToMongo();
+
+// Live output reaches API processes through the capped output relay
+startOutputPublisher(workerPool.workerId);
+
+const runnerSocket = `${process.env.PYTHON_RUNNER_SOCKET || '/tmp/automation-runner.sock'}.${process.pid}`;
+await startPythonRunner({ socket: runnerSocket });
+await workerPool.start();
+
+// Prometheus metrics of this worker's runs
+if (process.env.METRICS_PORT) {
+  startMetricsServer(parseInt(process.env.METRICS_PORT, 10));
+}
+
+// First signal: finish running jobs, then exit. Second signal: exit now and
+// let the leases expire so another worker picks the jobs up.
+let stopping = false;
+const shutdown = async (signal) => {
+  if (stopping) process.exit(1);
+  stopping = true;
+  console.log(`[worker] ${signal} received; draining ${workerPool.running.size} running job(s)`);
+  await workerPool.drain();
+  stopPythonRunner();
+  process.exit(0);
+};
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { Users, FileCode, Terminal, Check, AlertCircle, Clock } from 'lucide-react';
+import { Users, FileCode, Terminal, Check, AlertCircle, Clock, Timer, Target } from 'lucide-react';
 import axios from 'axios';
 // Create axios instance with default headers
 
@@ -29,7 +29,7 @@ const ExecutionCard = ({ execution }) => {
     pending: Clock,
   };
 
-  const StatusIcon = statusIcons[execution.status];
+  const StatusIcon = statusIcons[execution.status] || Clock;
 
   return (
     <div className="card overflow-hidden transition-transform duration-300 transform hover:scale-[1.02]">
@@ -54,6 +54,60 @@ const ExecutionCard = ({ execution }) => {
   );
 };
 
+// Import cost against the rest of the run, from each script's latest
+// profiled run (python -X importtime)
+const StartupRow = ({ profile, slowImportMs }) => {
+  const total = profile.importMs + profile.checkMs || 1;
+  const importShare = Math.round((profile.importMs / total) * 100);
+
+  return (
+    <div className="py-2">
+      <div className="flex justify-between text-sm">
+        <span className="font-medium text-gray-900 dark:text-white flex items-center">
+          {profile.name}
+          {profile.slow && (
+            <span
+              className="ml-2 inline-flex items-center px-2 py-0.5 rounded-full text-xs font-medium bg-yellow-100 text-yellow-800 dark:bg-yellow-900/30 dark:text-yellow-300"
+              title={`Imports take over ${slowImportMs} ms`}
+            >
+              slow start-up
+            </span>
+          )}
+        </span>
+        <span
+          className="text-gray-500 dark:text-gray-400"
+          title={profile.modules?.map(m => `${m.name}: ${m.ms} ms`).join('\n')}
+        >
+          imports {Math.round(profile.importMs)} ms · check {profile.checkMs} ms
+        </span>
+      </div>
+      <div className="mt-1 h-2 w-full rounded-full bg-gray-200 dark:bg-gray-700 overflow-hidden flex">
+        <div className={profile.slow ? 'bg-yellow-500' : 'bg-blue-500'} style={{ width: `${importShare}%` }}></div>
+        <div className="bg-green-500" style={{ width: `${100 - importShare}%` }}></div>
+      </div>
+    </div>
+  );
+};
+
+// Share of finished target runs that completed, for one challenge or team
+const SuccessRow = ({ label, entry }) => {
+  const percent = Math.round(entry.successRate * 100);
+
+  return (
+    <div className="py-2">
+      <div className="flex justify-between text-sm">
+        <span className="font-medium text-gray-900 dark:text-white truncate mr-2">{label}</span>
+        <span className="text-gray-500 dark:text-gray-400 whitespace-nowrap">
+          {percent}% · {entry.succeeded}/{entry.runs}
+        </span>
+      </div>
+      <div className="mt-1 h-2 w-full rounded-full bg-gray-200 dark:bg-gray-700 overflow-hidden">
+        <div className="h-2 bg-green-500" style={{ width: `${percent}%` }}></div>
+      </div>
+    </div>
+  );
+};
+
 const Dashboard = () => {
   const [stats, setStats] = useState([
     { title: 'Total Users', value: '0', icon: Users, color: 'bg-blue-500' },
@@ -61,6 +115,8 @@ const Dashboard = () => {
     { title: 'Executions', value: '0', icon: Terminal, color: 'bg-indigo-500' },
   ]);
   const [recentExecutions, setRecentExecutions] = useState([]);
+  const [successRates, setSuccessRates] = useState({ challenges: [], teams: [] });
+  const [importProfiles, setImportProfiles] = useState({ scripts: [], slowImportMs: 0 });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -82,33 +138,29 @@ const Dashboard = () => {
           }
         };
 
-        // Fetch counts in parallel
-        const [usersCountRes, scriptsCountRes, executionsCountRes, recentExecutionsRes] = await Promise.all([
-          axios.get(`${import.meta.env.VITE_Backend_URL}/api/auth/count/users`, config),
-          axios.get(`${import.meta.env.VITE_Backend_URL}/api/scripts/count/scripts`, config),
-          axios.get(`${import.meta.env.VITE_Backend_URL}/api/executions/count/executions`, config),
-          axios.get(`${import.meta.env.VITE_Backend_URL}/api/executions/recent`, config)
-        ]);
+        // Counts, success rates, recent runs and start-up times in one round trip
+        const { data } = await axios.get(`${import.meta.env.VITE_Backend_URL}/api/dashboard/summary`, config);
 
-        // Update stats with counts directly from backend
         setStats([
-          { title: 'Total Users', value: usersCountRes.data.count.toString(), icon: Users, color: 'bg-blue-500' },
-          { title: 'Scripts Uploaded', value: scriptsCountRes.data.count.toString(), icon: FileCode, color: 'bg-purple-500' },
-          { title: 'Executions', value: executionsCountRes.data.count.toString(), icon: Terminal, color: 'bg-indigo-500' },
+          { title: 'Total Users', value: data.counts.users.toString(), icon: Users, color: 'bg-blue-500' },
+          { title: 'Scripts Uploaded', value: data.counts.scripts.toString(), icon: FileCode, color: 'bg-purple-500' },
+          { title: 'Executions', value: data.counts.executions.toString(), icon: Terminal, color: 'bg-indigo-500' },
         ]);
 
         // Format recent executions
-        const formattedExecutions = recentExecutionsRes.data.executions
+        const formattedExecutions = data.recentExecutions
           .map(exec => ({
-            id: exec._id,
-            scriptName: exec.script?.name || 'Unknown Script',
-            user: exec.targets[0]?.user?.email || 'Unknown',
-            ip: exec.targets[0]?.ip || 'N/A',
+            id: exec.id,
+            scriptName: exec.scriptName || 'Unknown Script',
+            user: exec.email || 'Unknown',
+            ip: exec.ip || 'N/A',
             status: exec.status,
             timestamp: new Date(exec.startedAt).toLocaleString()
           }));
 
         setRecentExecutions(formattedExecutions);
+        setSuccessRates({ challenges: data.challenges, teams: data.teams });
+        setImportProfiles(data.importProfiles);
 
       } catch (err) {
         console.error('Failed to fetch dashboard data:', err);
@@ -157,8 +209,41 @@ const Dashboard = () => {
           ))}
         </div>
       </div>
-      
-     
+
+      {(successRates.challenges.length > 0 || successRates.teams.length > 0) && (
+        <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+          {[
+            { title: 'Success by Challenge', rows: successRates.challenges, label: entry => entry.name },
+            { title: 'Success by Team', rows: successRates.teams, label: entry => entry.email || entry.name || 'Unknown' }
+          ].map(panel => (
+            <div key={panel.title} className="card">
+              <div className="p-4 border-b border-gray-200 dark:border-gray-700 flex items-center">
+                <Target className="h-5 w-5 mr-2 text-gray-500 dark:text-gray-400" />
+                <h2 className="text-lg font-medium text-gray-900 dark:text-white">{panel.title}</h2>
+              </div>
+              <div className="p-4 divide-y divide-gray-200 dark:divide-gray-700">
+                {panel.rows.map(entry => (
+                  <SuccessRow key={entry.id || 'none'} label={panel.label(entry)} entry={entry} />
+                ))}
+              </div>
+            </div>
+          ))}
+        </div>
+      )}
+
+      {importProfiles.scripts.length > 0 && (
+        <div className="card">
+          <div className="p-4 border-b border-gray-200 dark:border-gray-700 flex items-center">
+            <Timer className="h-5 w-5 mr-2 text-gray-500 dark:text-gray-400" />
+            <h2 className="text-lg font-medium text-gray-900 dark:text-white">Script Start-up</h2>
+          </div>
+          <div className="p-4 divide-y divide-gray-200 dark:divide-gray-700">
+            {importProfiles.scripts.map((profile) => (
+              <StartupRow key={profile.id} profile={profile} slowImportMs={importProfiles.slowImportMs} />
+            ))}
+          </div>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Play, X, Plus, ChevronDown, CheckCircle2, XCircle, Clock, Search, Filter, Info, Upload } from 'lucide-react';
 import { toast } from 'react-hot-toast';
 import { ErrorBoundary } from 'react-error-boundary';
@@ -20,6 +20,39 @@ function ErrorFallback({ error, resetErrorBoundary }) {
   );
 }
 
+// Read a Server-Sent Events response with fetch so the Auth-token header can
+// be sent (EventSource cannot set headers). Resolves when the stream ends.
+const streamExecution = async (url, token, onEvent, signal) => {
+  const response = await fetch(url, { headers: { 'Auth-token': token }, signal });
+  if (!response.ok || !response.body) {
+    throw new Error(`Stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      frame.split('\n').forEach(line => {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      });
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
+
 const Executions = () => {
   const navigate = useNavigate();
   const backendURL = import.meta.env.VITE_Backend_URL;
@@ -40,6 +73,8 @@ const Executions = () => {
   const [scripts, setScripts] = useState([]);
   const [userIpMappings, setUserIpMappings] = useState([]);
   const [executions, setExecutions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState({
     scripts: true,
     userIpMappings: true,
@@ -59,6 +94,9 @@ const Executions = () => {
   const [statusFilter, setStatusFilter] = useState('all');
   const [showOutputModal, setShowOutputModal] = useState(false);
   const [currentOutput, setCurrentOutput] = useState('');
+  const [liveTarget, setLiveTarget] = useState(null);
+  const [outputSource, setOutputSource] = useState(null);
+  const outputRef = useRef(null);
   const [showErrorModal, setShowErrorModal] = useState(false);
   const [currentError, setCurrentError] = useState('');
 
@@ -70,6 +108,8 @@ const Executions = () => {
 
   // Execution state
   const [isExecuting, setIsExecuting] = useState(false);
+  // Run every target even if the script has a cached result for it
+  const [forceRun, setForceRun] = useState(false);
 
   useEffect(() => {
     if (!token) return;
@@ -92,44 +132,211 @@ const Executions = () => {
         });
         const userIpData = await userIpResponse.json();
         setUserIpMappings(userIpData || []);
-
-        // Fetch executions
-        const executionsResponse = await fetch(`${backendURL}/api/executions/`, {
-          headers
-        });
-        const executionsData = await executionsResponse.json();
-        if (executionsData.success) {
-          setExecutions(executionsData.executions || []);
-        } else {
-          setError(prev => ({ ...prev, executions: 'Failed to load executions' }));
-        }
       } catch (err) {
         console.error('Fetch error:', err);
-        setError({
+        setError(prev => ({
+          ...prev,
           scripts: err.message,
-          userIpMappings: err.message,
-          executions: err.message
-        });
+          userIpMappings: err.message
+        }));
       } finally {
-        setLoading({
+        setLoading(prev => ({
+          ...prev,
           scripts: false,
-          userIpMappings: false,
-          executions: false
-        });
+          userIpMappings: false
+        }));
       }
     };
 
     fetchData();
   }, []);
 
-  const handleShowError = (error) => {
-    setCurrentError(error);
+  // Executions are paginated server-side (newest first, cursor based)
+  const fetchExecutionsPage = async (cursor) => {
+    const params = new URLSearchParams({ limit: '25' });
+    if (statusFilter !== 'all') params.set('status', statusFilter);
+    if (cursor) params.set('cursor', cursor);
+
+    const executionsResponse = await fetch(`${backendURL}/api/executions/?${params}`, {
+      headers
+    });
+    return executionsResponse.json();
+  };
+
+  const refreshExecutions = async () => {
+    try {
+      const executionsData = await fetchExecutionsPage();
+      if (executionsData.success) {
+        setExecutions(executionsData.executions || []);
+        setNextCursor(executionsData.nextCursor);
+      } else {
+        setError(prev => ({ ...prev, executions: 'Failed to load executions' }));
+      }
+    } catch (err) {
+      console.error('Refresh error:', err);
+      setError(prev => ({ ...prev, executions: err.message }));
+    } finally {
+      setLoading(prev => ({ ...prev, executions: false }));
+    }
+  };
+
+  useEffect(() => {
+    if (!token) return;
+    refreshExecutions();
+  }, [statusFilter]);
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const executionsData = await fetchExecutionsPage(nextCursor);
+      if (executionsData.success) {
+        setExecutions(prev => [...prev, ...executionsData.executions]);
+        setNextCursor(executionsData.nextCursor);
+      }
+    } catch (err) {
+      console.error('Load more error:', err);
+      toast.error('Failed to load more executions');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Follow running executions over SSE instead of polling the whole list.
+  // Capped so we stay well under the browser's per-host connection limit.
+  const runningIds = executions
+    .filter(e => e.status === 'running' && !e._id.startsWith('temp-'))
+    .slice(0, 4)
+    .map(e => e._id)
+    .join(',');
+
+  useEffect(() => {
+    if (!token || !runningIds) return;
+    const controller = new AbortController();
+
+    runningIds.split(',').forEach(executionId => {
+      streamExecution(`${backendURL}/api/executions/${executionId}/stream`, token, (event, data) => {
+        if (event === 'target') {
+          setExecutions(prev => prev.map(exec => exec._id !== executionId ? exec : {
+            ...exec,
+            targets: exec.targets.map(target =>
+              target._id === data.target ? { ...target, status: data.status } : target
+            )
+          }));
+        } else if (event === 'done') {
+          refreshExecutions();
+        }
+      }, controller.signal).catch(err => {
+        if (err.name !== 'AbortError') console.error('Execution stream error:', err);
+      });
+    });
+
+    return () => controller.abort();
+  }, [runningIds]);
+
+  // Live tail for the output modal while its target is still running
+  useEffect(() => {
+    if (!liveTarget) return;
+    const controller = new AbortController();
+    const url = `${backendURL}/api/executions/${liveTarget.executionId}/stream?target=${liveTarget.targetId}`;
+
+    streamExecution(url, token, (event, data) => {
+      if (event === 'snapshot') {
+        const snapshot = data.targets.find(target => target.target === liveTarget.targetId);
+        if (snapshot?.stdout) setCurrentOutput(snapshot.stdout);
+      } else if (event === 'chunk' && data.stream === 'stdout') {
+        setCurrentOutput(prev => prev + data.data);
+      } else if (event === 'dropped') {
+        setCurrentOutput(prev => `${prev}\n[... ${data.bytes} bytes skipped ...]\n`);
+      } else if (event === 'target' && data.target === liveTarget.targetId) {
+        setLiveTarget(null);
+        refreshExecutions();
+      }
+    }, controller.signal).catch(err => {
+      if (err.name !== 'AbortError') console.error('Output stream error:', err);
+    });
+
+    return () => controller.abort();
+  }, [liveTarget]);
+
+  // Keep the live tail scrolled to the newest output
+  useEffect(() => {
+    if (liveTarget && outputRef.current) {
+      outputRef.current.scrollTop = outputRef.current.scrollHeight;
+    }
+  }, [currentOutput, liveTarget]);
+
+  // The list carries no output text; load the first part of a log on demand
+  const LOG_PREVIEW_BYTES = 256 * 1024;
+  const fetchLog = async (executionId, targetId, stream) => {
+    const response = await fetch(
+      `${backendURL}/api/executions/${executionId}/targets/${targetId}/log?stream=${stream}`,
+      { headers: { 'Auth-token': token, Range: `bytes=0-${LOG_PREVIEW_BYTES - 1}` } }
+    );
+    if (!response.ok) {
+      throw new Error('Failed to load log');
+    }
+    const total = parseInt(response.headers.get('Content-Range')?.split('/')[1], 10);
+    return {
+      text: await response.text(),
+      truncated: response.status === 206 && total > LOG_PREVIEW_BYTES
+    };
+  };
+
+  const handleShowError = async (execution, target) => {
+    setCurrentError('Loading...');
     setShowErrorModal(true);
+    try {
+      const { text } = await fetchLog(execution.id, target.id, 'stderr');
+      setCurrentError(text);
+    } catch (err) {
+      setCurrentError(err.message);
+    }
   };
 
-  const handleShowOutput = (output) => {
-    setCurrentOutput(output);
+  const handleShowOutput = async (execution, target) => {
+    const isLive = target.status === 'pending' || target.status === 'running';
+    setLiveTarget(isLive ? { executionId: execution.id, targetId: target.id } : null);
+    setOutputSource({ executionId: execution.id, targetId: target.id, truncated: target.outputLog?.truncated });
+    setCurrentOutput(isLive ? '' : 'Loading...');
     setShowOutputModal(true);
+
+    if (isLive) return;
+    try {
+      const { text, truncated } = await fetchLog(execution.id, target.id, 'stdout');
+      setCurrentOutput(text);
+      if (truncated) {
+        setOutputSource(prev => ({ ...prev, truncated: true }));
+      }
+    } catch (err) {
+      setCurrentOutput(err.message);
+    }
+  };
+
+  // Full logs may be spilled server-side; fetch with the auth header and save
+  const handleDownloadLog = async () => {
+    try {
+      const response = await fetch(
+        `${backendURL}/api/executions/${outputSource.executionId}/targets/${outputSource.targetId}/log`,
+        { headers: { 'Auth-token': token } }
+      );
+      if (!response.ok) {
+        throw new Error('Failed to download log');
+      }
+      const url = URL.createObjectURL(await response.blob());
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${outputSource.targetId}-stdout.log`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Log download error:', error);
+      toast.error(error.message || 'Failed to download log');
+    }
+  };
+
+  const handleCloseOutput = () => {
+    setLiveTarget(null);
+    setShowOutputModal(false);
   };
 
   const handleAddUserIP = () => {
@@ -214,6 +421,7 @@ const Executions = () => {
       // Prepare the actual execution data
       const executionData = {
         scriptId: selectedScript,
+        force: forceRun,
         targets: selectedUserIPs.map(item => {
           const user = usersWithIPs.find(u => u._id === item.userId);
           return {
@@ -245,20 +453,18 @@ const Executions = () => {
       }
 
       // Show success message
-      toast.success('Script execution started successfully', { id: toastId });
+      toast.success(
+        data.details?.cachedTargets
+          ? `Script execution queued (${data.details.cachedTargets} cached result(s) reused)`
+          : 'Script execution queued',
+        { id: toastId }
+      );
 
       // Close the modal immediately after successful API call
       setShowExecuteModal(false);
 
       // Refetch executions to get complete data
-      const executionsResponse = await fetch(`${backendURL}/api/executions/`, {
-        headers
-      });
-      const executionsData = await executionsResponse.json();
-
-      if (executionsData.success) {
-        setExecutions(executionsData.executions || []);
-      }
+      await refreshExecutions();
 
       // Reset form
       setSelectedScript('');
@@ -274,6 +480,24 @@ const Executions = () => {
     }
   };
 
+  const handleCancel = async (executionId) => {
+    try {
+      const response = await fetch(`${backendURL}/api/executions/${executionId}/cancel`, {
+        method: 'POST',
+        headers
+      });
+      const data = await response.json();
+      if (!response.ok) {
+        throw new Error(data.message || 'Failed to cancel execution');
+      }
+      toast.success('Execution cancelled');
+      refreshExecutions();
+    } catch (error) {
+      console.error('Cancel error:', error);
+      toast.error(error.message || 'Failed to cancel execution');
+    }
+  };
+
   const handleFileChange = (e) => {
     const file = e.target.files[0];
     if (file) {
@@ -299,6 +523,7 @@ const Executions = () => {
     const formData = new FormData();
     formData.append('excelFile', excelFile);
     formData.append('scriptId', excelScript);
+    formData.append('force', forceRun);
 
     try {
       const response = await fetch(`${backendURL}/api/executions/execute-from-excel`, {
@@ -322,13 +547,7 @@ const Executions = () => {
       setExcelScript('');
 
       // Refresh executions
-      const executionsResponse = await fetch(`${backendURL}/api/executions/`, {
-        headers
-      });
-      const executionsData = await executionsResponse.json();
-      if (executionsData.success) {
-        setExecutions(executionsData.executions || []);
-      }
+      await refreshExecutions();
 
     } catch (error) {
       console.error('Excel upload error:', error);
@@ -346,6 +565,9 @@ const Executions = () => {
         return <XCircle className="h-5 w-5 text-red-500" />;
       case 'running':
         return <Clock className="h-5 w-5 text-blue-500" />;
+      case 'cancelled':
+      case 'timeout':
+        return <XCircle className="h-5 w-5 text-yellow-500" />;
       default:
         return null;
     }
@@ -359,6 +581,9 @@ const Executions = () => {
         return 'bg-red-500/20 text-red-500';
       case 'running':
         return 'bg-blue-500/20 text-blue-500';
+      case 'cancelled':
+      case 'timeout':
+        return 'bg-yellow-500/20 text-yellow-500';
       default:
         return 'bg-gray-500/20 text-gray-500';
     }
@@ -378,14 +603,18 @@ const Executions = () => {
       timestamp: execution.createdAt || new Date().toISOString(),
       duration: execution.duration || 'N/A',
       targets: (execution.targets || []).map(target => ({
+        id: target._id,
         userId: target.user?._id || 'unknown-user',
         user: target.user?.email || 'Unknown User',
         ips: target.ips || [],
         status: target.status || 'unknown',
-        error: target.error || 'No error',
-        output: target.output || 'No output available',
+        errorLog: target.errorLog || null,
         description: target.description || 'No description',
-        challengeResponse: target.challengeResponse || null
+        outputLog: target.outputLog || null,
+        challengeResponse: target.challengeResponse || null,
+        result: target.result || null,
+        cached: target.cached || null,
+        shared: target.shared || null
       }))
     };
   };
@@ -506,6 +735,7 @@ const Executions = () => {
             <option value="completed">Completed</option>
             <option value="failed">Failed</option>
             <option value="running">Running</option>
+            <option value="cancelled">Cancelled</option>
           </select>
         </div>
       </div>
@@ -524,9 +754,19 @@ const Executions = () => {
                     </span>
                   </div>
                 </div>
-                <span className={`badge ${getStatusClass(execution.status)}`}>
-                  {execution.status}
-                </span>
+                <div className="flex items-center gap-2">
+                  {execution.status === 'running' && !execution.id.startsWith('temp-') && (
+                    <button
+                      onClick={() => handleCancel(execution.id)}
+                      className="btn btn-secondary text-sm"
+                    >
+                      Cancel
+                    </button>
+                  )}
+                  <span className={`badge ${getStatusClass(execution.status)}`}>
+                    {execution.status}
+                  </span>
+                </div>
               </div>
 
               <div className="grid grid-cols-5 gap-4 mb-4">
@@ -556,13 +796,23 @@ const Executions = () => {
                   <div className="space-y-1">
                     {execution.targets.map((target, index) => (
                       <div key={index} className="flex items-center gap-2">
-                        <p className="font-medium truncate flex-1" title={target.output}>
-                          {target.output}
+                        <p
+                          className="font-medium truncate flex-1"
+                          title={[
+                            target.result?.message,
+                            target.cached && `Cached result from ${new Date(target.cached.finishedAt).toLocaleString()}`,
+                            target.shared && 'Attached to an identical run already in progress'
+                          ].filter(Boolean).join('\n')}
+                        >
+                          {[target.result?.status, target.cached && 'cached', target.shared && 'shared run', target.outputLog && `${target.outputLog.bytes} bytes`]
+                            .filter(Boolean)
+                            .join(' · ') || target.status}
                         </p>
                         <button
-                          onClick={() => handleShowOutput(target.output)}
+                          onClick={() => handleShowOutput(execution, target)}
                           className="text-[var(--text-secondary)] hover:text-[var(--text-primary)]"
                           aria-label="View full output"
+                          disabled={!target.id}
                         >
                           <Info className="h-4 w-4" />
                         </button>
@@ -573,22 +823,25 @@ const Executions = () => {
                 <div>
                   <span className="text-sm text-[var(--text-secondary)]">Error</span>
                   <div className="space-y-1">
-                    {execution.targets.map((target, index) => (
-                      <div key={index} className="flex items-center gap-2">
-                        <p className="font-medium truncate flex-1" title={target.error}>
-                          {target.error}
-                        </p>
-                        {target.error && target.error !== 'No error' && (
-                          <button
-                            onClick={() => handleShowError(target.error)}
-                            className="text-[var(--text-secondary)] hover:text-[var(--text-primary)]"
-                            aria-label="View full error"
-                          >
-                            <Info className="h-4 w-4" />
-                          </button>
-                        )}
-                      </div>
-                    ))}
+                    {execution.targets.map((target, index) => {
+                      const hasError = target.errorLog?.bytes > 0 || ['failed', 'timeout', 'cancelled'].includes(target.status);
+                      return (
+                        <div key={index} className="flex items-center gap-2">
+                          <p className="font-medium truncate flex-1">
+                            {hasError ? target.status : 'No error'}
+                          </p>
+                          {hasError && (
+                            <button
+                              onClick={() => handleShowError(execution, target)}
+                              className="text-[var(--text-secondary)] hover:text-[var(--text-primary)]"
+                              aria-label="View full error"
+                            >
+                              <Info className="h-4 w-4" />
+                            </button>
+                          )}
+                        </div>
+                      );
+                    })}
                   </div>
                 </div>
                 <div>
@@ -617,6 +870,18 @@ const Executions = () => {
           </div>
         ))}
 
+        {nextCursor && (
+          <div className="flex justify-center">
+            <button
+              onClick={handleLoadMore}
+              className="btn btn-secondary"
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
+
         {filteredExecutions.length === 0 && (
           <div className="text-center py-12">
             <Clock className="h-12 w-12 text-[var(--text-secondary)] mx-auto mb-4" />
@@ -635,22 +900,35 @@ const Executions = () => {
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center z-50">
           <div className="bg-[var(--background)] rounded-lg p-6 w-full max-w-3xl max-h-[80vh] flex flex-col">
             <div className="flex justify-between items-center mb-4">
-              <h3 className="text-lg font-medium">Full Output</h3>
+              <h3 className="text-lg font-medium flex items-center">
+                {liveTarget ? 'Live Output' : 'Full Output'}
+                {liveTarget && (
+                  <span className="ml-2 h-2 w-2 rounded-full bg-green-500 animate-pulse"></span>
+                )}
+              </h3>
               <button
-                onClick={() => setShowOutputModal(false)}
+                onClick={handleCloseOutput}
                 className="text-[var(--text-secondary)] hover:text-[var(--text-primary)]"
               >
                 <X className="h-5 w-5" />
               </button>
             </div>
-            <div className="bg-[var(--background-secondary)] p-4 rounded flex-1 overflow-auto">
+            <div ref={outputRef} className="bg-[var(--background-secondary)] p-4 rounded flex-1 overflow-auto">
               <pre className="whitespace-pre-wrap break-words text-sm">
-                {currentOutput || 'No output available'}
+                {currentOutput || (liveTarget ? 'Waiting for output...' : 'No output available')}
               </pre>
             </div>
-            <div className="mt-4 flex justify-end">
+            <div className="mt-4 flex justify-end gap-3">
+              {!liveTarget && outputSource?.truncated && (
+                <button
+                  onClick={handleDownloadLog}
+                  className="btn btn-secondary"
+                >
+                  Download full log
+                </button>
+              )}
               <button
-                onClick={() => setShowOutputModal(false)}
+                onClick={handleCloseOutput}
                 className="btn btn-primary"
               >
                 Close
@@ -730,6 +1008,16 @@ const Executions = () => {
                 )}
               </div>
 
+              <label className="flex items-center gap-2 text-sm">
+                <input
+                  type="checkbox"
+                  checked={forceRun}
+                  onChange={(e) => setForceRun(e.target.checked)}
+                  disabled={isExecuting}
+                />
+                Run again even if a cached result exists
+              </label>
+
               <div>
                 <div className="flex justify-between items-center mb-2">
                   <label className="block text-sm font-medium">Selected Users & IPs</label>
@@ -890,6 +1178,16 @@ const Executions = () => {
                   </select>
                   <ChevronDown className="absolute right-3 top-1/2 transform -translate-y-1/2 h-5 w-5 text-[var(--text-secondary)]" />
                 </div>
+
+              <label className="flex items-center gap-2 text-sm">
+                <input
+                  type="checkbox"
+                  checked={forceRun}
+                  onChange={(e) => setForceRun(e.target.checked)}
+                  disabled={isExecuting}
+                />
+                Run again even if a cached result exists
+              </label>
               </div>
 
               <div>
@@ -905,14 +1203,14 @@ const Executions = () => {
                     <input
                       type="file"
                       className="hidden"
-                      accept=".xlsx,.xls"
+                      accept=".xlsx,.xls,.csv"
                       onChange={handleFileChange}
                       disabled={isExecuting}
                     />
                   </label>
                 </div>
                 <p className="mt-2 text-sm text-[var(--text-secondary)]">
-                  File format: Excel with IP, UserEmail, and Description columns
+                  File format: Excel or CSV with UserEmail, IP (IP1, IP2, ...) and Description columns
                 </p>
                 <a
                   href="/sample-execution-template.xlsx"
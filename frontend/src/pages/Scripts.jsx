@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { Upload, Trash2, Link2, Info } from 'lucide-react';
+import { Upload, Trash2, Link2, Info, Timer } from 'lucide-react';
 import { toast } from 'react-hot-toast';
 import axios from 'axios';
 
@@ -45,6 +45,11 @@ const Scripts = () => {
     description: '',
     challenge: '',
     language: 'Python',
+    argMode: 'per-ip',
+    timeoutSeconds: '',
+    maxConcurrency: '',
+    resultCacheSeconds: '',
+    dependencies: '',
     file: null
   });
   const [searchTerm, setSearchTerm] = useState('');
@@ -101,6 +106,33 @@ const Scripts = () => {
     fetchData();
   }, []);
 
+  // Preflight runs in the background after an upload or re-check; refresh
+  // the list until no script is waiting on it
+  const preflightPending = scripts.some(script => script.preflight?.status === 'pending');
+  useEffect(() => {
+    if (!preflightPending) return undefined;
+    const timer = setInterval(async () => {
+      try {
+        const response = await api.get(`${import.meta.env.VITE_Backend_URL}/api/scripts`);
+        if (Array.isArray(response.data?.scripts)) {
+          setScripts((previous) => {
+            const waiting = new Set(previous.filter(script => script.preflight?.status === 'pending').map(script => script.id));
+            response.data.scripts
+              .filter(script => waiting.has(script.id) && script.preflight?.status === 'failed')
+              .forEach(script => toast.error(
+                `${script.name} will not run: ${script.preflight.problems.join('; ')}`,
+                { id: `preflight-${script.id}` }
+              ));
+            return response.data.scripts;
+          });
+        }
+      } catch (error) {
+        console.error('Error refreshing scripts:', error);
+      }
+    }, 3000);
+    return () => clearInterval(timer);
+  }, [preflightPending]);
+
   const handleUpload = async () => {
     if (!uploadForm.name || !uploadForm.challenge || !uploadForm.description || !uploadForm.file) {
       toast.error('Please fill all required fields');
@@ -113,6 +145,19 @@ const Scripts = () => {
       formData.append('description', uploadForm.description);
       formData.append('challenge', uploadForm.challenge);
       formData.append('language', uploadForm.language);
+      formData.append('argMode', uploadForm.argMode);
+      if (uploadForm.timeoutSeconds) {
+        formData.append('timeoutSeconds', uploadForm.timeoutSeconds);
+      }
+      if (uploadForm.maxConcurrency) {
+        formData.append('maxConcurrency', uploadForm.maxConcurrency);
+      }
+      if (uploadForm.resultCacheSeconds) {
+        formData.append('resultCacheSeconds', uploadForm.resultCacheSeconds);
+      }
+      if (uploadForm.dependencies.trim()) {
+        formData.append('dependencies', uploadForm.dependencies);
+      }
       formData.append('file', uploadForm.file);
 
       setIsUploading(true); // Show loading state during upload
@@ -134,9 +179,18 @@ const Scripts = () => {
           description: '',
           challenge: '',
           language: 'Python',
+          argMode: 'per-ip',
+          timeoutSeconds: '',
+          maxConcurrency: '',
+          resultCacheSeconds: '',
+          dependencies: '',
           file: null
         });
-        toast.success('Script uploaded successfully');
+        toast.success(
+          response.data.script.preflight?.status === 'pending'
+            ? 'Script uploaded; checking it in the background'
+            : 'Script uploaded successfully'
+        );
       } else {
         console.error('Unexpected response format:', response.data);
         toast.error('Received unexpected response from server');
@@ -208,6 +262,22 @@ const Scripts = () => {
     return extensionMap[ext] || 'Python';
   };
 
+  const handleToggleImportProfile = async (script) => {
+    try {
+      const response = await api.post(
+        `${import.meta.env.VITE_Backend_URL}/api/scripts/${script.id}/import-profile`,
+        { enabled: !script.profileImports }
+      );
+      if (response.data?.success) {
+        setScripts(scripts.map(s => (s.id === script.id ? { ...s, profileImports: response.data.profileImports } : s)));
+        toast.success(response.data.profileImports ? 'Import profiling on; runs start cold' : 'Import profiling off');
+      }
+    } catch (error) {
+      console.error('Error updating import profiling:', error);
+      toast.error(error.response?.data?.message || 'Failed to update import profiling');
+    }
+  };
+
   const handleDeleteScript = async (id) => {
     try {
       const response = await api.delete(`${import.meta.env.VITE_Backend_URL}/api/scripts/delete-script/${id}`);
@@ -380,6 +450,60 @@ const Scripts = () => {
                 <option value="PHP">PHP</option>
               </select>
             </div>
+            <div>
+              <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">
+                Target Arguments
+              </label>
+              <select
+                value={uploadForm.argMode}
+                onChange={(e) => setUploadForm({ ...uploadForm, argMode: e.target.value })}
+                className="input"
+              >
+                <option value="per-ip">One IP per run</option>
+                <option value="all-ips">All team IPs in one run</option>
+                <option value="batch">Team IPs batched, result per IP (harness)</option>
+              </select>
+            </div>
+            <div>
+              <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">
+                Timeout (seconds)
+              </label>
+              <input
+                type="number"
+                min="1"
+                value={uploadForm.timeoutSeconds}
+                onChange={(e) => setUploadForm({ ...uploadForm, timeoutSeconds: e.target.value })}
+                className="input"
+                placeholder="Server default"
+              />
+            </div>
+            <div>
+              <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">
+                Max concurrent runs
+              </label>
+              <input
+                type="number"
+                min="1"
+                step="1"
+                value={uploadForm.maxConcurrency}
+                onChange={(e) => setUploadForm({ ...uploadForm, maxConcurrency: e.target.value })}
+                className="input"
+                placeholder="Server default"
+              />
+            </div>
+            <div>
+              <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">
+                Reuse results for (seconds)
+              </label>
+              <input
+                type="number"
+                min="1"
+                value={uploadForm.resultCacheSeconds}
+                onChange={(e) => setUploadForm({ ...uploadForm, resultCacheSeconds: e.target.value })}
+                className="input"
+                placeholder="Always run"
+              />
+            </div>
           </div>
 
           <div className="mb-4">
@@ -394,6 +518,20 @@ const Scripts = () => {
             ></textarea>
           </div>
 
+          {uploadForm.language === 'Python' && (
+            <div className="mb-4">
+              <label className="block text-sm font-medium text-gray-700 dark:text-gray-300 mb-1">
+                Dependencies
+              </label>
+              <textarea
+                value={uploadForm.dependencies}
+                onChange={(e) => setUploadForm({ ...uploadForm, dependencies: e.target.value })}
+                className="input min-h-[60px] font-mono text-sm"
+                placeholder={'One requirement per line, e.g. impacket==0.11.0\nLeave empty to infer them from the imports'}
+              ></textarea>
+            </div>
+          )}
+
           <div className="flex justify-end space-x-2">
             <button
               onClick={() => setIsUploading(false)}
@@ -421,6 +559,15 @@ const Scripts = () => {
               <div className="p-4 border-b border-gray-200 dark:border-gray-700 flex items-center justify-between">
                 <h3 className="font-medium text-gray-900 dark:text-white truncate">{script.name}</h3>
                 <div className="flex space-x-1">
+                  {script.language === 'Python' && (
+                    <button
+                      className={`p-1 ${script.profileImports ? 'text-blue-500 hover:text-blue-700' : 'text-gray-500 hover:text-gray-700 dark:hover:text-gray-300'}`}
+                      title={script.profileImports ? 'Stop profiling imports' : 'Profile imports (python -X importtime)'}
+                      onClick={() => handleToggleImportProfile(script)}
+                    >
+                      <Timer className="h-4 w-4" />
+                    </button>
+                  )}
                   <button
                     className="p-1 text-gray-500 hover:text-gray-700 dark:hover:text-gray-300"
                     title="View details"
@@ -444,9 +591,33 @@ const Scripts = () => {
                   <span className="inline-flex items-center px-2 py-1 rounded-full text-xs font-medium bg-gray-100 text-gray-800 dark:bg-gray-700 dark:text-gray-200 mr-2">
                     {script.language}
                   </span>
-                  <span className="text-gray-500 dark:text-gray-400 mr-2">
-                    {script.filePath?.split('/').pop()}
+                  <span className="text-gray-500 dark:text-gray-400 mr-2" title={script.filePath}>
+                    {script.contentHash ? script.contentHash.slice(0, 12) : script.filePath?.split('/').pop()}
                   </span>
+                  {script.preflight?.status === 'failed' && (
+                    <span
+                      className="inline-flex items-center px-2 py-1 rounded-full text-xs font-medium bg-red-100 text-red-800 dark:bg-red-900/30 dark:text-red-300"
+                      title={script.preflight.problems.join('\n')}
+                    >
+                      Preflight failed
+                    </span>
+                  )}
+                  {script.preflight?.status === 'pending' && (
+                    <span
+                      className="inline-flex items-center px-2 py-1 rounded-full text-xs font-medium bg-yellow-100 text-yellow-800 dark:bg-yellow-900/30 dark:text-yellow-300"
+                      title="Checking the script and building its environment"
+                    >
+                      Preflight running
+                    </span>
+                  )}
+                  {script.preflight?.status === 'passed' && (
+                    <span
+                      className="inline-flex items-center px-2 py-1 rounded-full text-xs font-medium bg-green-100 text-green-800 dark:bg-green-900/30 dark:text-green-300"
+                      title={`Python ${script.preflight.python}, ${script.preflight.argv?.convention} arguments`}
+                    >
+                      Preflight passed
+                    </span>
+                  )}
                 </div>
                 {challenge && (
                   <div className="flex items-center mt-3 text-xs text-gray-500 dark:text-gray-400">
@@ -455,8 +626,13 @@ const Scripts = () => {
                   </div>
                 )}
               </div>
-              <div className="px-4 py-2 bg-gray-50 dark:bg-gray-800/50 text-xs text-gray-500 dark:text-gray-400">
-                Uploaded on {uploadedDate}
+              <div className="px-4 py-2 bg-gray-50 dark:bg-gray-800/50 text-xs text-gray-500 dark:text-gray-400 flex justify-between">
+                <span>Uploaded on {uploadedDate}</span>
+                {script.importProfile?.samples > 0 && (
+                  <span title={script.importProfile.modules?.map(m => `${m.name}: ${m.ms} ms`).join('\n')}>
+                    Imports {Math.round(script.importProfile.importMs)} ms · check {script.importProfile.checkMs} ms
+                  </span>
+                )}
               </div>
             </div>
           );